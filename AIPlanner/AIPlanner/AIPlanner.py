@@ -5,15 +5,16 @@ import reflex as rx
 from AIPlanner.pages.signup import signup # Sign up page
 from AIPlanner.pages.success import success # Success page shown after successful sign up
 from AIPlanner.classes.database import * # Database
+from AIPlanner.classes.todo_state import TodoState # To-do list page
 from AIPlanner.pages.userlist import userlist # Userlist debugging page
 from AIPlanner.pages.login import login # Log in page for existing users
 from AIPlanner.classes.taskform import task_input_form
 from AIPlanner.pages.login import LoginState # Login State used to get the user's username
 from AIPlanner.pages.signup import SignupState # Sign up state used to redirect the user to the signup page
 from AIPlanner.pages.canvas_connect import canvas_connect # Canvas connect page used to connect user's Canvas tasks
+from AIPlanner.pages.canvas_connect import CanvasConnectState # Shows background Canvas sync progress
 from AIPlanner.classes. todo_list import todo_component
 from AIPlanner.classes.ai import *
-from AIPlanner.classes.database import UserManagementState as state
 from AIPlanner.classes.CreateCal import GenCalendar
 from AIPlanner.classes.WeeklyCal import GenWeeklyCal
 from AIPlanner.classes.cal_comps import *
@@ -24,7 +25,7 @@ class State(rx.State):
     """The app state."""
 
 
-@rx.page(on_load=[GenCalendar.init_calendar,GenWeeklyCal.init_week])
+@rx.page(on_load=[GenCalendar.init_calendar,GenWeeklyCal.init_week,GenCalendar.load_visible_tasks,TodoState.load_todo_page])
 def index() -> rx.Component:
     """Reflex component for base index page
     
@@ -43,6 +44,7 @@ def index() -> rx.Component:
                 is_external=False,
             ),
             show_login_signup(),
+            rx.text(CanvasConnectState.canvas_progress), # Background Canvas sync progress
             spacing="5",
             justify="start",
             min_height="10vh",
@@ -64,7 +66,13 @@ def index() -> rx.Component:
 
         ),
         rx.hstack(
-            rx.button("Generate AI Schedule", on_click=lambda: AIState.send_request(state.tasks)),
+            rx.select(SCHEDULER_MODES, value=AIState.scheduler_mode, on_change=AIState.set_scheduler_mode),
+            rx.checkbox("Only new or changed tasks", checked=AIState.incremental, on_change=AIState.set_incremental),
+            rx.cond(
+                AIState.generating,
+                rx.button("Cancel", on_click=AIState.cancel_request, color_scheme="red"),
+                rx.button("Generate AI Schedule", on_click=AIState.send_request),
+            ),
             rx.text(f"{AIState.messageText}"),
             spacing="5",
             justify="center",
@@ -1,6 +1,8 @@
-import calendar
 from datetime import datetime
 import reflex as rx
+from AIPlanner.classes.calendar_grid import month_layout, shift_month
+from AIPlanner.classes.database import UserManagementState, fetch_day_summary
+from AIPlanner.pages.login import LoginState
 
 
 class GenCalendar(rx.State):
@@ -14,68 +16,54 @@ class GenCalendar(rx.State):
     current_year:
         current year to start at
     dates: list
-        list of weeks of dates of the year
+        list of weeks of day numbers of the month, 0 for cells outside it
     label: string
         Title of the calendar
+    day_counts: list
+        number of tasks due on each day of the month (index 0 is the 1st)
+    day_priority: list
+        most urgent priority_level due on each day of the month, 0 for days with no tasks
     """
     now = datetime.now()
     current_month: int = now.month
     current_year: int = now.year
-    dates: list[list[str]] = []
+    dates: list[list[int]] = []
     label = ""
-
-    def days_in_month(self):
-        """
-        Function to get the number of days in a month and when the month starts
-
-         Returns: 
-         int: first weekday of the month
-         int: number of days in the month
-         
-        """
-        return calendar.monthrange(self.current_year, self.current_month)
-
-    def get_month_year_label(self):
-        """Function to set the label variable to a string of the month and year for Title of calendar"""
-        month_name = calendar.month_name[self.current_month]
-        month_year_string = str(month_name + " " + str(self.current_year))
-        self.label = month_year_string
+    day_counts: list[int] = []
+    day_priority: list[int] = []
 
     def next_month(self):
         """Function to increment month and reinitialize calendar"""
-        if self.current_month == 12:
-            self.current_month = 1
-            self.current_year += 1
-        else:
-            self.current_month += 1
+        self.current_year, self.current_month = shift_month(self.current_year, self.current_month, 1)
         self.init_calendar()
+        return self.load_visible_tasks()
 
     def prev_month(self):
         """Function to decrement month and reinitialize calendar"""
-        if self.current_month == 1:
-            self.current_month = 12
-            self.current_year -= 1
-        else:
-            self.current_month -= 1
+        self.current_year, self.current_month = shift_month(self.current_year, self.current_month, -1)
         self.init_calendar()
-
-    def make_dates(self):
-        """Function to set dates list as list of numbers of days to iterate through"""
-        self.dates = []
-        first_day, days = self.days_in_month()
-        days_in_month = [datetime(self.current_year, self.current_month, day)
-                         for day in range(1, days + 1)]
-        week = [0] * first_day
-        for day in days_in_month:
-            week.append(day.day)
-            if len(week) == 7:
-                self.dates.append(week)
-                week = []
-        if week:
-            week.extend([0] * (7 - len(week)))
-            self.dates.append(week)
+        return self.load_visible_tasks()
 
     def init_calendar(self):
-        """Function that runs the initialization of variables"""
-        self.make_dates()
-        self.get_month_year_label()
+        """Function that swaps in the cached layout and label of the current month
+        (see calendar_grid.py; the neighbouring months are prefetched)"""
+        grid = month_layout(self.current_year, self.current_month)
+        self.dates = grid.dates
+        self.label = grid.label
+
+    async def load_visible_tasks(self):
+        """Function that loads only the tasks inside the visible month, and the per-day counts"""
+        grid = month_layout(self.current_year, self.current_month)
+        login_state = await self.get_state(LoginState)
+        self.load_day_summary(login_state.user_id, grid)
+        return UserManagementState.load_task_window(grid.first_day.isoformat(), grid.last_day.isoformat())
+
+    def load_day_summary(self, user_id: int, grid):
+        """Function that fills day_counts and day_priority from one aggregate query over the month"""
+        summary = fetch_day_summary(user_id, grid.first_day, grid.last_day)
+        days = grid.last_day.day
+        self.day_counts = [0] * days
+        self.day_priority = [0] * days
+        for due_date, (count, priority) in summary.items():
+            self.day_counts[due_date.day - 1] = count
+            self.day_priority[due_date.day - 1] = priority
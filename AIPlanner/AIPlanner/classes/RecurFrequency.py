@@ -1,3 +1,4 @@
+import calendar
 from datetime import date, timedelta
 
 class RecurFrequency:
@@ -19,7 +20,7 @@ class RecurFrequency:
     # List of days of the week
     DAY_NAMES = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
 
-    def __init__(self, frequency, end_date=None, days_of_week=None):
+    def __init__(self, frequency, end_date=None, days_of_week=None, day_of_month=None):
         """
         Initializes a new instance of the RecurFrequency class.
 
@@ -27,6 +28,8 @@ class RecurFrequency:
         frequency (str): The recurrence frequency ('DAILY', 'WEEKLY', or 'MONTHLY').
         end_date (date, optional): The end date of the recurrence. Defaults to None.
         days_of_week (list, optional): List of days (0-6, where 0 is Sunday) for weekly recurrence. Defaults to None.
+        day_of_month (int, optional): Day (1-31) monthly occurrences fall on, clamped to shorter months. Defaults to None,
+            meaning the day of the date the occurrences are counted from.
 
         Raises:
         ValueError: If the frequency is invalid.
@@ -36,6 +39,7 @@ class RecurFrequency:
         self.frequency = frequency
         self.end_date = end_date
         self.days_of_week = days_of_week
+        self.day_of_month = day_of_month
 
     def get_next_occurrence(self, start_date):
         """
@@ -54,22 +58,9 @@ class RecurFrequency:
             return start_date + timedelta(days=1)
 
         elif self.frequency == self.WEEKLY:
+            # Days ahead to each listed weekday, counting today's weekday as a week away
             current_day = start_date.weekday()
-            days = []
-
-            # Collect days that are greater than the current day
-            for d in self.days_of_week:
-                if d > current_day:
-                    days.append(d)
-
-            # Append all days of the week to complete the cycle
-            days.extend(self.days_of_week)
-
-            # Calculate days ahead for the next occurrence
-            days_ahead = days[0] - current_day
-            if days_ahead <= 0:
-                days_ahead += 7
-
+            days_ahead = min((d - current_day - 1) % 7 + 1 for d in self.days_of_week)
             return start_date + timedelta(days=days_ahead)
 
         elif self.frequency == self.MONTHLY:
@@ -81,10 +72,54 @@ class RecurFrequency:
                 next_year += 1
 
             # Determine the valid day for the next month
-            next_day = min(start_date.day,
-                           (date(next_year, next_month + 1, 1) - timedelta(days=1)).day)
+            next_day = min(self.day_of_month or start_date.day, calendar.monthrange(next_year, next_month)[1])
             return date(next_year, next_month, next_day)
 
+    def occurrences_between(self, start, end, anchor=None):
+        """
+        Computes every occurrence between start and end (inclusive) in one pass, with day
+        offset arithmetic instead of one get_next_occurrence call per date.
+
+        Parameters:
+        start (date): The first day of the range.
+        end (date): The last day of the range.
+        anchor (date, optional): The first occurrence of the series; monthly occurrences
+            fall on its day of the month (unless day_of_month is set) and weekly ones default
+            to its weekday. Defaults to start.
+
+        Returns:
+        list: The occurrence dates in order, none after end_date.
+        """
+        anchor = anchor or start
+        first = max(start, anchor)
+        last = min(end, self.end_date) if self.end_date else end
+        if first > last:
+            return []
+
+        if self.frequency == self.DAILY:
+            return [date.fromordinal(day) for day in range(first.toordinal(), last.toordinal() + 1)]
+
+        if self.frequency == self.WEEKLY:
+            ordinals = {anchor.toordinal()} if first == anchor else set()
+            for d in set(self.days_of_week or [anchor.weekday()]):
+                offset = (d - first.weekday()) % 7  # Days from first to the next such weekday
+                ordinals.update(range(first.toordinal() + offset, last.toordinal() + 1, 7))
+            return [date.fromordinal(day) for day in sorted(ordinals)]
+
+        # Monthly: count months from the anchor and clamp its day to each month's length
+        day = self.day_of_month or anchor.day
+        occurrences = []
+        month = (first.year - anchor.year) * 12 + first.month - anchor.month
+        while True:
+            year, month_index = divmod(anchor.month - 1 + month, 12)
+            year += anchor.year
+            occurrence = date(year, month_index + 1, min(day, calendar.monthrange(year, month_index + 1)[1]))
+            if occurrence > last:
+                return occurrences
+            if occurrence >= first:
+                occurrences.append(occurrence)
+            month += 1
+
     def __str__(self):
         """
         Returns a string representation of the recurrence pattern.
@@ -127,6 +162,7 @@ if __name__ == "__main__":
     print(f"\nMonthly recurrence: {monthly_recur}")
     start = date(2024, 1, 15)
     print(f"Next occurrence after {start}: {monthly_recur.get_next_occurrence(start)}")
+    print(f"Occurrences in 2024: {monthly_recur.occurrences_between(date(2024, 1, 1), date(2024, 12, 31), anchor=start)}")
 
     # Limited weekly recurrence with an end date
     end_date = date(2024, 1, 31)  # End of January
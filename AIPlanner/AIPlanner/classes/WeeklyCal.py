@@ -1,7 +1,8 @@
 """Weekly Calendar file."""
-import calendar
 from datetime import datetime, timedelta
 import reflex as rx
+from AIPlanner.classes.calendar_grid import week_layout
+from AIPlanner.classes.database import UserManagementState
 
 
 class GenWeeklyCal(rx.State):
@@ -30,12 +31,6 @@ class GenWeeklyCal(rx.State):
         """Initialize the list of days in the current week"""
         self.update_month_and_week()
         self.make_dates()  # Generate dates for the week
-        self.get_week_label()
-
-    def get_week_label(self):
-        """Set the label variable to a string of the week for Title of calendar"""
-        month_name = calendar.month_name[self.current_month]
-        self.label = "Week of "+ month_name + " "+str(self.current_week_start.day)
 
 
     def next_month(self):
@@ -61,6 +56,7 @@ class GenWeeklyCal(rx.State):
             self.next_month()  # Call to update the month when crossing boundaries
         self.week_number = self.current_week_start.isocalendar().week
         self.init_week()
+        return self.load_visible_tasks()
 
     def prev_week(self):
         """Decrement week and reinitialize calendar"""
@@ -69,12 +65,22 @@ class GenWeeklyCal(rx.State):
             self.prev_month()  # Call to update the month when crossing boundaries
         self.week_number = self.current_week_start.isocalendar().week
         self.init_week()
+        return self.load_visible_tasks()
+
+    def load_visible_tasks(self):
+        """Load only the tasks inside the visible week"""
+        week_start = self.current_week_start.date()
+        return UserManagementState.load_task_window(
+            week_start.isoformat(),
+            (week_start + timedelta(days=6)).isoformat(),
+        )
 
     def make_dates(self):
-        """Set dates list as list of numbers of days to iterate through"""
+        """Swap in the shared layout and label of the current week"""
+        grid = week_layout(self.current_week_start.date())
         self.days = [self.current_week_start + timedelta(days=i) for i in range(7)]
-        self.dates = [[day.strftime(" %d") for day in self.days]]  # Format dates for display
-        self.get_week_label()
+        self.dates = grid.dates
+        self.label = grid.label
 
     def update_month_and_week(self):
         """Update the month and week number based on the current week start date"""
@@ -1,162 +1,201 @@
 """Testing file and page for OpenAI integration. Must have OpenAI API key set as an environment variable OPENAI_API_KEY to use."""
-import os
-import re
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime
 import time
+import openai
 import reflex as rx
-from openai import OpenAI
+from AIPlanner.classes.ai_schedule import merged_results, plan_runs, schedule_client, stream_schedule
 from AIPlanner.classes.database import UserManagementState
-from AIPlanner.classes.database import Task
+from AIPlanner.classes.batch_schedule import task_dict
+from AIPlanner.classes.database import assign_blocks, fetch_schedulable_tasks, fetch_scheduled_tasks
+from AIPlanner.classes.jobs import JOBS
+from AIPlanner.classes.schedule_cache import SCHEDULE_CACHE
+from AIPlanner.classes.scheduler import schedule_tasks, split_incremental
 from AIPlanner.pages.login import LoginState
 
+# Ways a schedule can be generated: OpenAI round trip or the local scheduler engine
+SCHEDULER_MODES = ["AI", "Local"]
+# Seconds between writes of streamed AI assignments while the model is still answering
+PARTIAL_APPLY_INTERVAL = 0.5
+
+def schedule_message(applied: int, cancelled: bool, pending: int, kept: int) -> str:
+    """Builds the status message shown after a schedule generation
+
+    Parameters:
+    applied: Number of tasks that got a block
+    cancelled: Whether the user stopped the generation early
+    pending: Number of tasks the scheduler was asked to place
+    kept: Number of tasks that kept their still-valid block
+
+    Returns:
+    The message
+    """
+    if cancelled:
+        message = f"Schedule generation cancelled after {applied} tasks."
+    else:
+        message = f"Schedule generated for {applied} tasks."
+        if applied < pending:
+            message += f" {pending - applied} could not be scheduled."
+    if kept:
+        message += f" {kept} already scheduled tasks kept their blocks."
+    return message
+
 class AIState(UserManagementState):
     """State that holds variables related to AI generation and functions that use those variables
     
     Attributes:
     processed_output: String state variable to hold final output of processing
     message: String state variable to hold success or failure messages
+    scheduler_mode: String state variable, one of SCHEDULER_MODES, picking how schedules are generated
+    generating: Boolean state variable, True while a schedule generation is running
+    incremental: Boolean state variable, when True tasks with a still-valid block keep it and only the rest are scheduled
     """
 
     processed_output = ""
     messageText = ""
+    scheduler_mode: str = "AI"
+    generating: bool = False
+    incremental: bool = True
+
+    def set_scheduler_mode(self, mode: str):
+        """Selects the scheduler used by send_request ("AI" or "Local")."""
+        if mode in SCHEDULER_MODES:
+            self.scheduler_mode = mode
+
+    @rx.background
+    async def send_request(self):
+        '''Background job that generates task date/time/duration assignments with the selected scheduler
+
+        AI schedules are streamed: accepted assignments are written and shown on the calendar
+        every PARTIAL_APPLY_INTERVAL seconds while the model is still answering. Only one
+        generation per user runs at a time, and cancel_request stops it early. The tasks are
+        all of the user's live, non-recurring tasks due from today on, read from the database
+        rather than the calendar's visible window. If the model or its reply fails, the blocks
+        applied so far are kept and the error is shown.
+        '''
+        async with self:
+            self.messageText = ""
+            login_state = await self.get_state(LoginState)
+            user_id = login_state.user_id
+            scheduler_mode = self.scheduler_mode
+            incremental = self.incremental
+
+        now = datetime.now()
+        rows = await asyncio.to_thread(fetch_schedulable_tasks, [user_id], now.date())
+        if not rows:
+            async with self:
+                self.messageText = "No tasks available to generate a schedule. Please add some and try again."
+            return
+
+        job_key = ("ai_schedule", user_id)
+        if not JOBS.claim(job_key):
+            async with self:
+                self.messageText = "A schedule is already being generated."
+            return
+        try:
+            async with self:
+                self.generating = True
+                self.processed_output = ""
+                self.messageText = "Tasks retrieved successfully."
+
+            schedulable = [task_dict(task) for task in rows]
+            busy = []
+            kept = 0
+            if incremental:
+                # Keep still-valid blocks and schedule only new, edited or missed tasks around them
+                scheduled = await asyncio.to_thread(fetch_scheduled_tasks, user_id, now.date())
+                pending, busy = split_incremental(schedulable, scheduled, now)
+                kept = len(schedulable) - len(pending)
+                schedulable = pending
+
+            if not schedulable:
+                applied, cancelled = 0, False
+            elif scheduler_mode == "Local":
+                applied = await self._apply_partial(user_id, schedule_tasks(schedulable, now, busy))
+                cancelled = False
+            else:
+                applied, cancelled = await self._stream_ai_schedule(user_id, schedulable, job_key, now, busy)
+
+            async with self:
+                self.messageText = schedule_message(applied, cancelled, len(schedulable), kept)
+        except (openai.OpenAIError, ValueError, KeyError) as error:
+            # Model or network errors, unreadable replies or recordings, or a missing OPENAI_API_KEY
+            print(f"AI schedule generation failed for user {user_id}: {error!r}")
+            async with self:
+                self.messageText = f"Schedule generation failed: {error!r}"
+        finally:
+            JOBS.release(job_key)
+            async with self:
+                self.generating = False
+
+    async def _stream_ai_schedule(self, user_id: int, tasks: list[dict], job_key: tuple, now: datetime, busy: list) -> tuple[int, bool]:
+        '''Streams an AI schedule, applying accepted assignments in batches as they arrive
+
+        A schedule generated earlier today for the same task set is served from SCHEDULE_CACHE
+        without calling the model.
+
+        Parameters:
+        user_id: Integer id of the logged-in user
+        tasks: List of task dictionaries to schedule
+        job_key: JOBS key of this generation, checked for cancellation
+        now: Datetime blocks must start after
+        busy: List of (start, end) datetimes of blocks the schedule must avoid
 
-    def send_request(self, tasks):
-        '''Function to send an OpenAI API request to generate task date/time/duration assignments, currently prints to console
-        
         Returns:
-        task_string: String that contains the result of processing the completion of the API request
+        tuple: (number of tasks scheduled, whether the run was cancelled)
         '''
+        cached = await asyncio.to_thread(SCHEDULE_CACHE.get, tasks, now, busy)
+        if cached is not None:
+            print(f"Schedule cache hit: {SCHEDULE_CACHE.stats()}")
+            return await self._apply_partial(user_id, [assignment.to_block() for assignment in cached]), False
+
+        # Large backlogs are split into due-date chunks that are requested in parallel
+        runs = plan_runs(tasks, now, busy)
+        batch = []
+        applied = 0
+        last_apply = time.monotonic()
+        assignments = stream_schedule(schedule_client(asynchronous=True), runs)
+        try:
+            async for assignment in assignments:
+                if JOBS.is_cancelled(job_key):
+                    break
+                batch.append(assignment.to_block())
+                if time.monotonic() - last_apply >= PARTIAL_APPLY_INTERVAL:
+                    applied += await self._apply_partial(user_id, batch)
+                    batch = []
+                    last_apply = time.monotonic()
+                    async with self:
+                        self.messageText = f"Scheduling... {applied} of {len(tasks)} tasks placed."
+        finally:
+            await assignments.aclose()
+        cancelled = JOBS.is_cancelled(job_key)
+        applied += await self._apply_partial(user_id, batch)
+        if not cancelled:
+            await asyncio.to_thread(SCHEDULE_CACHE.put, tasks, merged_results(runs)[0], now, busy)
+        return applied, cancelled
+
+    async def _apply_partial(self, user_id: int, blocks: list[dict]) -> int:
+        '''Writes a batch of blocks from a background job and shows them on the calendar
 
-        inputMessage = ""
-        self.messageText = ""
-        for task in tasks:
-            print(task)
-            if task['is_deleted'] is False:
-                if task['recur_frequency'] == 0:
-                    inputMessage = inputMessage + f"task_id = {task['id']}\ntask_name = '{task['task_name']}\npriority_level = {task['priority_level']}\ndue_date = {task['due_date']}\n\n"
-                    print(task['id'])
-
-        if not tasks:
-            self.messageText = "No tasks available to generate a schedule. Please add some and try again."
-            return "No tasks available to generate a schedule. Please add some and try again."
-        else:
-            self.messageText = "Tasks retrieved successfully."
-
-        currentTime = time.ctime()
-        print("Tasks retrieved successfully.")
-        OpenAI.api_key = os.environ["OPENAI_API_KEY"]
-
-        client = OpenAI()
-
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": f"""
-                You are a bot that takes user tasks and assigns them to slots on a calendar. Tasks can have a priority level with (1) being the highest and (3) being the lowest. 
-                Higher priority tasks should be assigned to blocks before lower priority tasks. Do not make any changes or return anything other than the following format for each task. 
-                Do not include anything like "Here's the output" or "Let me know if you'd like any adjustments". The current date is {currentTime}, only schedule tasks after this time.
-                Do not include the word hours in the response. Give output in the format as follows:  
-                task_id = Integer from prompt
-                task_name = String from prompt
-                assigned_block_date = Generated date before task due date
-                assigned_block_start_time = Choose a time between 09:00:00 and 17:00:00 to start the task
-                assigned_block_duration = How long the task should be worked on"""},
-                {
-                    "role": "user",
-                    "content": f"""
-                {inputMessage}
-                """
-                }
-            ]
-        )
-
-        print(completion.choices[0].message.content)
-        self.processed_output = self.process_output(completion.choices[0].message.content)
-
-    def process_output(self, content):
-        '''Processes the output of an OpenAI API call using regular expressions 
-        and prints the string result to the console
-        
         Parameters:
-        completion: String that contains the raw completion returned by the OpenAI API
+        user_id: Integer id of the logged-in user
+        blocks: List of block dictionaries to write
 
         Returns:
-        task_string: String that contains the processed completion resuts
+        applied: Number of tasks updated
         '''
-        # Regular expression to extract task details
-        regex = re.compile(
-            r"task_id\s*=\s*(\d+).*?"
-            r"assigned_block_date\s*=\s*(\d{4}-\d{2}-\d{2}).*?"
-            r"assigned_block_start_time\s*=\s*(\d{2}:\d{2}).*?"
-            r"assigned_block_duration\s*=\s*(\d+)",
-            re.DOTALL
-        )
-
-        # Extract matches and build dictionaries
-        matches = regex.findall(content)
-        print(f"Matches: {matches}")
-        if matches:
-            self.messageText = "Matching successful."
-        tasks = [
-            {
-                "task_id": int(match[0]),
-                "assigned_block_date": match[1],
-                "assigned_block_start_time": match[2],
-                "assigned_block_duration": int(match[3]),
-            }
-            for match in matches
-            ]
-        print(f"Tasks: {tasks}")
-        task_string = ""
-        for task in tasks:
-            for key, value in task.items():
-                task_string = task_string + f'{key}: {value}\n'
-        print("Task string constructed")
-        for task in tasks:
-            print("in task loop")
-            task_id = None
-            task_date = None
-            task_start = None
-            task_duration = None
-            for key, value in task.items():
-                print(key,value)
-                if key == "task_id":
-                    task_id = int(value)
-                elif key == "assigned_block_date":
-                    try:
-                        task_date = datetime.strptime(value, "%Y-%m-%d").date()
-                    except ValueError:
-                        print(f"Invalid date format for task_id {task_id}: {value}")
-                elif key == "assigned_block_start_time":
-                    try:
-                        value = value + ":00"
-                        task_start = datetime.strptime(value, "%H:%M:%S").time()
-                    except ValueError:
-                        print(f"Invalid time format for task_id {task_id}: {value}")
-                elif key == "assigned_block_duration":
-                    try:
-                        task_duration = timedelta(hours=int(value))
-                    except ValueError:
-                        print(f"Invalid duration format for task_id {task_id}: {value}")
-            self.assign_block(task_id=task_id, task_date=task_date, task_start=task_start, task_duration=task_duration)
-            self.messageText = "Schedule generated successfully."
-        return task_string
-
-    def assign_block(self, task_id: int, task_date: datetime, task_start: datetime, task_duration: timedelta):
-        """Edits tasks to match AI-assigned date, time, and duration values"""
-        print(task_id, task_date, task_start, task_duration)
-        with rx.session() as session:
-            # Try to get the task with the specified ID
-            task = session.exec(
-                Task.select().where(Task.id == task_id)
-            ).first()
-            if task:
-                # Set block assignment values and commit to database
-                task.assigned_block_date = task_date
-                task.assigned_block_start_time = task_start
-                task.assigned_block_duration = task_duration
-                session.commit()
-                print(f"Task {task_id} block attributes edited successfully.")
-            else:
-                print(f"No task found with ID: {task_id}")
-        UserManagementState.get_user_tasks(LoginState.user_id)
+        if not blocks:
+            return 0
+        applied = await asyncio.to_thread(assign_blocks, user_id, blocks)
+        async with self:
+            self.processed_output += "".join(
+                f"{key}: {value}\n" for block in blocks if block["task_id"] in applied for key, value in block.items()
+            )
+            self._refresh_tasks(applied)
+        return len(applied)
+
+    async def cancel_request(self):
+        '''Asks the logged-in user's running schedule generation to stop'''
+        login_state = await self.get_state(LoginState)
+        if JOBS.cancel(("ai_schedule", login_state.user_id)):
+            self.messageText = "Cancelling schedule generation..."
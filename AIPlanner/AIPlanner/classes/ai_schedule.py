@@ -0,0 +1,539 @@
+"""Structured-output schedule generation with OpenAI.
+
+The model is asked for JSON matching SCHEDULE_SCHEMA (OpenAI structured outputs) instead of
+free text. The reply is streamed and parsed incrementally: every complete entry of the
+"assignments" array is validated as soon as its closing brace arrives. Entries that fail
+validation (bad dates, blocks outside 09:00-17:00, past the due date, unknown task ids) or
+tasks the model left out are sent back for one more try with the reasons, without
+regenerating the tasks that were already fine. Large backlogs are split into token-budgeted
+due-date chunks (see schedule_prompt). generate_schedule drives this with the blocking
+client; stream_schedule does the same with AsyncOpenAI, requesting the chunks in parallel
+and yielding assignments as they are accepted.
+
+Setting the AIPLANNER_SCHEDULE_RECORDING environment variable to a JSON file of recorded
+replies (a list of strings, one per request) swaps OpenAI for RecordedScheduleClient, so
+the whole flow runs offline.
+"""
+import asyncio
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+from typing import NamedTuple, Optional
+from openai import AsyncOpenAI, OpenAI
+from pydantic import BaseModel, ValidationError
+from AIPlanner.classes.schedule_prompt import DEFAULT_TOKEN_BUDGET, plan_chunks, task_table
+from AIPlanner.classes.block_index import BlockIndex
+from AIPlanner.classes.scheduler import format_busy
+
+MODEL = "gpt-4o-mini"
+MAX_ATTEMPTS = 3  # First request plus retries for the failing tasks
+WORK_DAY_START = time(9, 0)
+WORK_DAY_END = time(17, 0)
+MIN_DURATION_MINUTES = 15
+RECORDING_ENV = "AIPLANNER_SCHEDULE_RECORDING"
+
+SYSTEM_PROMPT = """You are a bot that takes user tasks and assigns them to blocks on a calendar.
+Tasks are given as a table with the columns id|priority|due|name. Priority (1) is the highest and
+(3) the lowest. Higher priority tasks should be assigned to blocks before lower priority tasks.
+The current time is {now}; only schedule blocks after it. Every block must start and end between
+09:00 and 17:00 on a date on or before the task's due date, and blocks must not overlap. Return one
+assignment per task: task_id is the id column, assigned_block_date is YYYY-MM-DD,
+assigned_block_start_time is HH:MM (24 hour) and assigned_block_duration is the number of minutes
+to work on the task."""
+
+# JSON schema for OpenAI structured outputs (strict mode: every field required, no extras)
+SCHEDULE_SCHEMA = {
+    "name": "schedule",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "assignments": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "task_id": {"type": "integer"},
+                        "assigned_block_date": {"type": "string", "description": "YYYY-MM-DD"},
+                        "assigned_block_start_time": {"type": "string", "description": "HH:MM, 24 hour"},
+                        "assigned_block_duration": {"type": "integer", "description": "minutes"},
+                    },
+                    "required": ["task_id", "assigned_block_date", "assigned_block_start_time", "assigned_block_duration"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["assignments"],
+        "additionalProperties": False,
+    },
+}
+
+
+class BlockAssignment(BaseModel):
+    """
+    One block assignment returned by the model; field types are enforced by pydantic.
+
+    Attributes:
+    task_id (int): id of the task the block is for.
+    assigned_block_date (date): day of the block.
+    assigned_block_start_time (time): when the block starts.
+    assigned_block_duration (int): length of the block in minutes.
+    """
+    task_id: int
+    assigned_block_date: date
+    assigned_block_start_time: time
+    assigned_block_duration: int
+
+    @classmethod
+    def parse(cls, raw):
+        """Validates a raw dictionary (pydantic v2 and v1)."""
+        if hasattr(cls, "model_validate"):
+            return cls.model_validate(raw)
+        return cls.parse_obj(raw)
+
+    def duration(self) -> timedelta:
+        """Returns the block length as stored on Task.assigned_block_duration."""
+        return timedelta(minutes=self.assigned_block_duration)
+
+    def interval(self):
+        """Returns the (start, end) datetimes of the block."""
+        start = datetime.combine(self.assigned_block_date, self.assigned_block_start_time)
+        return start, start + self.duration()
+
+    def to_block(self) -> dict:
+        """Returns the assignment as a block dictionary, the format the local scheduler produces."""
+        return {
+            "task_id": self.task_id,
+            "assigned_block_date": self.assigned_block_date,
+            "assigned_block_start_time": self.assigned_block_start_time,
+            "assigned_block_duration": self.duration(),
+        }
+
+    def check(self, task, now):
+        """
+        Checks the assignment against the scheduling rules.
+
+        Parameters:
+        task (dict): the task being scheduled (needs due_date).
+        now (datetime): blocks must start after this time.
+
+        Returns:
+        str: why the assignment is invalid, or None if it is valid.
+        """
+        start = datetime.combine(self.assigned_block_date, self.assigned_block_start_time)
+        end = start + self.duration()
+        due_date = date.fromisoformat(str(task['due_date'])[:10])
+        if self.assigned_block_duration < MIN_DURATION_MINUTES:
+            return f"duration must be at least {MIN_DURATION_MINUTES} minutes"
+        if start < now:
+            return f"block starts in the past (current time is {now:%Y-%m-%d %H:%M})"
+        if self.assigned_block_start_time < WORK_DAY_START or end > datetime.combine(self.assigned_block_date, WORK_DAY_END):
+            return "block must start and end between 09:00 and 17:00"
+        if self.assigned_block_date > due_date:
+            return f"block is after the due date {due_date}"
+        return None
+
+
+class ScheduleStreamParser:
+    """
+    Incremental parser for a streamed {"assignments": [...]} reply.
+
+    feed() takes the text as it arrives and returns the raw assignment dictionaries completed
+    by that chunk, so entries can be validated and applied before the reply is finished.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = None  # Index just inside the assignments array, once found
+
+    def feed(self, text):
+        """
+        Parameters:
+        text (str): next chunk of the reply.
+
+        Returns:
+        list: assignment dictionaries (or malformed non-dict entries) completed by this chunk.
+        """
+        self._buffer += text
+        if self._position is None:
+            key = self._buffer.find('"assignments"')
+            bracket = self._buffer.find("[", key) if key != -1 else -1
+            if bracket == -1:
+                return []
+            self._position = bracket + 1
+
+        entries = []
+        while True:
+            # Skip separators between entries
+            while self._position < len(self._buffer) and self._buffer[self._position] in " \t\r\n,":
+                self._position += 1
+            if self._position >= len(self._buffer) or self._buffer[self._position] == "]":
+                return entries
+            try:
+                entry, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                return entries  # Entry not complete yet
+            entries.append(entry)
+            self._position = end
+
+
+def schedule_messages(rows, now, failures=None, busy=(), window=None):
+    """
+    Builds the chat messages for one scheduling request.
+
+    Parameters:
+    rows (list): (short id, task dictionary) pairs to schedule.
+    now (datetime): the current time.
+    failures (dict, optional): short id -> reason its previous assignment was rejected.
+    busy (list, optional): (start, end) datetimes of blocks that are already taken.
+    window (tuple, optional): (first day, last day) the blocks must fall in.
+
+    Returns:
+    list: chat messages.
+    """
+    content = task_table(rows)
+    if window:
+        content += f"\n\nOnly use dates from {window[0]} to {window[1]}."
+    if busy:
+        content += f"\n\nThese blocks are already taken, do not overlap them:\n{format_busy(busy)}"
+    if failures:
+        reasons = "\n".join(f"{short_id}: {reason}" for short_id, reason in failures.items())
+        content += f"\n\nThe previous assignments for these ids were rejected, fix them:\n{reasons}"
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT.format(now=now.strftime("%a %Y-%m-%d %H:%M"))},
+        {"role": "user", "content": content},
+    ]
+
+
+def validate_entry(entry, tasks_by_id, now):
+    """
+    Validates one raw assignment from the reply.
+
+    Returns:
+    tuple: (task id or None, BlockAssignment or None, rejection reason or None)
+    """
+    task_id = entry.get("task_id") if isinstance(entry, dict) else None
+    try:
+        assignment = BlockAssignment.parse(entry)
+    except ValidationError as error:
+        return task_id, None, f"malformed assignment ({error.errors()[0]['msg']})"
+    if assignment.task_id not in tasks_by_id:
+        return None, None, None  # Not a task we asked about; ignore it
+    reason = assignment.check(tasks_by_id[assignment.task_id], now)
+    if reason:
+        return assignment.task_id, None, reason
+    return assignment.task_id, assignment, None
+
+
+class ScheduleRun:
+    """
+    Retry bookkeeping for one schedule generation (or one chunk of it), shared by the sync and
+    async drivers.
+
+    Each attempt requests the pending tasks; entries are fed in as they are parsed, and
+    finish_attempt() turns rejected or missing tasks into the next attempt's pending list.
+    Tasks are numbered 1, 2, 3... in the prompt; entries are mapped back to task ids here.
+
+    Attributes:
+    now (datetime): blocks must start after this time.
+    accepted (dict): task id -> valid BlockAssignment.
+    failures (dict): task id -> reason, for tasks still without a valid assignment.
+    pending (list): task dictionaries to request in the next attempt.
+    attempts (int): requests made so far.
+    busy (list): (start, end) datetimes of blocks that were already taken before the run.
+    window (tuple): (first day, last day) the run's blocks must fall in, or None.
+    taken (BlockIndex): the busy blocks plus every accepted block, shared between the chunks of a schedule.
+    """
+
+    def __init__(self, tasks, now=None, busy=(), window=None, taken=None):
+        self.now = now or datetime.now()
+        self.busy = list(busy)
+        self.window = window
+        if taken is None:
+            taken = BlockIndex()
+            for start, end in busy:
+                taken.add(start, end)
+        self.taken = taken
+        self.accepted = {}
+        self.failures = {}
+        self.pending = list(tasks)
+        self.attempts = 0
+        self._short_ids = {task['id']: short_id for short_id, task in enumerate(tasks, start=1)}
+        self._task_ids = {short_id: task_id for task_id, short_id in self._short_ids.items()}
+        self._tasks_by_id = {}
+        self._attempt_failures = {}
+
+    def has_attempts_left(self, max_attempts=MAX_ATTEMPTS):
+        """Returns whether another request should be made."""
+        return bool(self.pending) and self.attempts < max_attempts
+
+    def start_attempt(self):
+        """
+        Returns:
+        dict: keyword arguments for client.chat.completions.create.
+        """
+        self.attempts += 1
+        self._tasks_by_id = {task['id']: task for task in self.pending}
+        self._attempt_failures = {}
+        rows = [(self._short_ids[task['id']], task) for task in self.pending]
+        failures = {self._short_ids[task_id]: reason for task_id, reason in self.failures.items()}
+        return {
+            "model": MODEL,
+            "messages": schedule_messages(rows, self.now, failures or None, self.busy, self.window),
+            "response_format": {"type": "json_schema", "json_schema": SCHEDULE_SCHEMA},
+            "stream": True,
+        }
+
+    def add_entry(self, entry):
+        """
+        Validates one parsed entry of the current attempt.
+
+        Returns:
+        BlockAssignment: the assignment if it was newly accepted, otherwise None.
+        """
+        if isinstance(entry, dict) and entry.get("task_id") in self._task_ids:
+            entry = dict(entry, task_id=self._task_ids[entry["task_id"]])
+        elif isinstance(entry, dict):
+            return None  # Not a task we asked about; ignore it
+        task_id, assignment, reason = validate_entry(entry, self._tasks_by_id, self.now)
+        if assignment is not None and task_id not in self.accepted:
+            start, end = assignment.interval()
+            if self.window and not self.window[0] <= start.date() <= self.window[1]:
+                reason = f"block must be between {self.window[0]} and {self.window[1]}"
+            elif not self.taken.add(start, end, key=task_id):
+                reason = "block overlaps another block"
+            else:
+                self.accepted[task_id] = assignment
+                return assignment
+        if reason:
+            self._attempt_failures[task_id] = reason
+        return None
+
+    def finish_attempt(self):
+        """Works out which tasks the next attempt has to retry."""
+        for task in self.pending:
+            if task['id'] not in self.accepted and task['id'] not in self._attempt_failures:
+                self._attempt_failures[task['id']] = "no assignment was returned for this task"
+        self.failures = {
+            task_id: reason for task_id, reason in self._attempt_failures.items()
+            if task_id not in self.accepted and task_id in self._short_ids
+        }
+        self.pending = [task for task in self.pending if task['id'] in self.failures]
+        print(f"Schedule attempt {self.attempts}: {len(self.accepted)} accepted, {len(self.failures)} to retry")
+
+
+def plan_runs(tasks, now=None, busy=(), token_budget=DEFAULT_TOKEN_BUDGET):
+    """
+    Splits a schedule into ScheduleRuns whose prompts fit the token budget.
+
+    Parameters:
+    tasks (list): task dictionaries to schedule.
+    now (datetime, optional): the current time. Defaults to datetime.now().
+    busy (list, optional): (start, end) datetimes of blocks already taken.
+    token_budget (int): maximum task table tokens per request.
+
+    Returns:
+    list: ScheduleRuns, one per due-date chunk, sharing one index of taken blocks.
+    """
+    now = now or datetime.now()
+    taken = BlockIndex()
+    for start, end in busy:
+        taken.add(start, end)
+    return [
+        ScheduleRun(chunk, now, busy, window, taken)
+        for chunk, window in plan_chunks(tasks, now.date(), token_budget)
+    ]
+
+
+def merged_results(runs):
+    """
+    Returns:
+    tuple: (list of accepted BlockAssignments, dict of task id -> reason) over all runs.
+    """
+    accepted = [assignment for run in runs for assignment in run.accepted.values()]
+    failures = {task_id: reason for run in runs for task_id, reason in run.failures.items()}
+    return accepted, failures
+
+
+def chunk_text(chunk):
+    """Returns the text carried by one streamed completion chunk."""
+    return chunk.choices[0].delta.content or "" if chunk.choices else ""
+
+
+class ScheduleLimits(NamedTuple):
+    """
+    Request limits of a schedule generation.
+
+    Attributes:
+    max_attempts (int): total requests allowed per chunk.
+    token_budget (int): maximum task table tokens per request.
+    """
+    max_attempts: int = MAX_ATTEMPTS
+    token_budget: int = DEFAULT_TOKEN_BUDGET
+
+
+def generate_schedule(client, tasks, now=None, busy=(), limits=ScheduleLimits()):
+    """
+    Schedules tasks with the model, retrying only the tasks whose assignments were rejected
+    or missing. Large backlogs are scheduled chunk by chunk (see plan_runs).
+
+    Parameters:
+    client: an OpenAI client (or RecordedScheduleClient).
+    tasks (list): task dictionaries with id, task_name, priority_level and due_date.
+    now (datetime, optional): the current time. Defaults to datetime.now().
+    busy (list, optional): (start, end) datetimes of blocks already taken.
+    limits (ScheduleLimits, optional): attempts per chunk and token budget per request.
+
+    Returns:
+    tuple: (list of valid BlockAssignments, dict of task id -> reason for tasks left unscheduled)
+    """
+    runs = plan_runs(tasks, now, busy, limits.token_budget)
+    for run in runs:
+        while run.has_attempts_left(limits.max_attempts):
+            parser = ScheduleStreamParser()
+            for chunk in client.chat.completions.create(**run.start_attempt()):
+                for entry in parser.feed(chunk_text(chunk)):
+                    run.add_entry(entry)
+            run.finish_attempt()
+    return merged_results(runs)
+
+
+async def stream_schedule(client, runs, max_attempts=MAX_ATTEMPTS):
+    """
+    Async version of generate_schedule for an AsyncOpenAI client. The runs (chunks) are
+    requested in parallel and every assignment is yielded as soon as it is accepted, so
+    callers can show partial results and stop early (closing the generator cancels the
+    requests still in flight). The unscheduled tasks are left in each run's failures.
+
+    Parameters:
+    client: an AsyncOpenAI client (or RecordedScheduleClient(asynchronous=True)).
+    runs (list): ScheduleRuns from plan_runs.
+    max_attempts (int): total requests allowed per run.
+
+    Yields:
+    BlockAssignment: each newly accepted assignment.
+    """
+    queue = asyncio.Queue()
+
+    async def drive(run):
+        try:
+            while run.has_attempts_left(max_attempts):
+                parser = ScheduleStreamParser()
+                stream = await client.chat.completions.create(**run.start_attempt())
+                async for chunk in stream:
+                    for entry in parser.feed(chunk_text(chunk)):
+                        assignment = run.add_entry(entry)
+                        if assignment is not None:
+                            await queue.put(assignment)
+                run.finish_attempt()
+        finally:
+            await queue.put(None)  # This run is done
+
+    workers = [asyncio.create_task(drive(run)) for run in runs]
+    try:
+        finished = 0
+        while finished < len(workers):
+            assignment = await queue.get()
+            if assignment is None:
+                finished += 1
+            else:
+                yield assignment
+        for worker in workers:
+            worker.result()  # Re-raise request errors
+    finally:
+        for worker in workers:
+            worker.cancel()
+
+
+class RecordedScheduleClient:
+    """
+    Offline stand-in for the OpenAI client that replays recorded replies.
+
+    Only implements client.chat.completions.create(..., stream=True); a non-streamed request
+    raises ValueError. Each call returns the next recorded reply split into small chunks, like
+    a real stream. With asynchronous=True, create() is a coroutine returning an async
+    iterator, like AsyncOpenAI.
+
+    Attributes:
+    replies (list): recorded reply strings, used in order.
+    requests (list): message lists received, for inspection.
+    options (list): the model and other keyword arguments of each request, for inspection.
+    """
+
+    def __init__(self, replies, chunk_size=16, asynchronous=False):
+        self.replies = list(replies)
+        self.requests = []
+        self.options = []
+        self.chunk_size = chunk_size
+        create = self.acreate if asynchronous else self.create
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    @classmethod
+    def from_file(cls, path, asynchronous=False):
+        """Loads recorded replies from a JSON file holding a list of strings."""
+        with open(path, encoding="utf-8") as recording:
+            return cls(json.load(recording), asynchronous=asynchronous)
+
+    def create(self, model, messages, stream=False, **kwargs):
+        if not stream:
+            raise ValueError("RecordedScheduleClient only replays streamed completions (stream=True)")
+        self.requests.append(messages)
+        self.options.append(dict(kwargs, model=model))
+        reply = self.replies.pop(0) if self.replies else '{"assignments": []}'
+        return [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=reply[i:i + self.chunk_size]))])
+            for i in range(0, len(reply), self.chunk_size)
+        ]
+
+    async def acreate(self, model, messages, stream=False, **kwargs):
+        chunks = self.create(model, messages, stream, **kwargs)
+
+        async def replay():
+            for chunk in chunks:
+                await asyncio.sleep(0)
+                yield chunk
+        return replay()
+
+
+def schedule_client(api_key: Optional[str] = None, asynchronous=False):
+    """
+    Parameters:
+    api_key (str, optional): OpenAI key. Defaults to the OPENAI_API_KEY environment variable.
+    asynchronous (bool): return an AsyncOpenAI client instead of an OpenAI one.
+
+    Returns:
+    the client to schedule with: a RecordedScheduleClient when AIPLANNER_SCHEDULE_RECORDING is set,
+    otherwise an OpenAI client (OPENAI_API_KEY must be set).
+    """
+    recording = os.environ.get(RECORDING_ENV)
+    if recording:
+        return RecordedScheduleClient.from_file(recording, asynchronous=asynchronous)
+    client_class = AsyncOpenAI if asynchronous else OpenAI
+    return client_class(api_key=api_key or os.environ["OPENAI_API_KEY"])
+
+
+if __name__ == "__main__":
+    # Offline example: the first reply has one bad entry and misses a task, the retry fixes both
+    now = datetime(2024, 12, 2, 8, 0)
+    tasks = [
+        {"id": 1, "task_name": "Essay", "priority_level": 1, "due_date": "2024-12-04"},
+        {"id": 2, "task_name": "Lab report", "priority_level": 2, "due_date": "2024-12-05"},
+        {"id": 3, "task_name": "Reading", "priority_level": 3, "due_date": "2024-12-06"},
+    ]
+    client = RecordedScheduleClient([
+        json.dumps({"assignments": [
+            {"task_id": 1, "assigned_block_date": "2024-12-02", "assigned_block_start_time": "09:00", "assigned_block_duration": 90},
+            {"task_id": 2, "assigned_block_date": "2024-12-03", "assigned_block_start_time": "16:30", "assigned_block_duration": 120},
+        ]}),
+        json.dumps({"assignments": [
+            {"task_id": 2, "assigned_block_date": "2024-12-03", "assigned_block_start_time": "13:00", "assigned_block_duration": 120},
+            {"task_id": 3, "assigned_block_date": "2024-12-04", "assigned_block_start_time": "10:00", "assigned_block_duration": 60},
+        ]}),
+    ])
+    assignments, failures = generate_schedule(client, tasks, now)
+    for assignment in assignments:
+        print(assignment)
+    print(f"Unscheduled: {failures}")
+    print(f"Retry request:\n{client.requests[1][1]['content']}")
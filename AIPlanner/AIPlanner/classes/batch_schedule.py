@@ -0,0 +1,199 @@
+"""Batch re-planning of every user's schedule, e.g. from a nightly cron job.
+
+Users are read from the User table in pages of --batch-size ids. Each page's tasks come from
+one query, each user is scheduled on a bounded worker pool (local engine or the OpenAI
+model), and the page's blocks are written back with one executemany UPDATE. Run from the
+directory holding rxconfig.py so the app database is used:
+
+    cd AIPlanner
+    python -m AIPlanner.classes.batch_schedule --mode local --batch-size 200 --workers 8
+
+By default only new, edited or missed tasks are scheduled (see scheduler.split_incremental);
+--full reschedules everything. New blocks are checked against the user's kept blocks with
+validate_blocks before they are written, and a user whose scheduling fails is logged and
+skipped without stopping the batch.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import NamedTuple, Optional
+from AIPlanner.classes.ai_schedule import generate_schedule, schedule_client
+from AIPlanner.classes.block_index import BlockIndex, validate_blocks
+from AIPlanner.classes.database import fetch_schedulable_tasks, fetch_user_ids_after, write_blocks
+from AIPlanner.classes.scheduler import block_inputs, schedule_tasks, split_incremental
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_WORKERS = 4
+
+
+class BatchOptions(NamedTuple):
+    """
+    Settings shared by every user of a batch.
+
+    Attributes:
+    now (datetime): blocks start after this time.
+    mode (str): "Local" or "AI".
+    client: OpenAI client for AI mode, shared by the workers.
+    incremental (bool): keep still-valid blocks and schedule only the other tasks.
+    """
+    now: datetime
+    mode: str = "Local"
+    client: object = None
+    incremental: bool = True
+
+
+class UserSchedule(NamedTuple):
+    """
+    Outcome of scheduling one user.
+
+    Attributes:
+    user_id (int): the user.
+    blocks (list): block dictionaries with user_id, to be written.
+    task_count (int): number of tasks considered.
+    error (str, optional): why scheduling failed; blocks is empty then.
+    """
+    user_id: int
+    blocks: list
+    task_count: int
+    error: Optional[str] = None
+
+
+def task_dict(task):
+    """Converts a Task row into the task dictionary the schedulers take."""
+    return {
+        "id": task.id,
+        "task_name": task.task_name,
+        "priority_level": task.priority_level,
+        "due_date": task.due_date.isoformat(),
+    }
+
+
+def schedule_user(user_id, tasks, options):
+    """
+    Schedules one user's tasks and validates the new blocks against the blocks kept.
+
+    Parameters:
+    user_id (int): the user.
+    tasks (list): the user's schedulable Task rows.
+    options (BatchOptions): settings of the batch.
+
+    Returns:
+    UserSchedule: the user's blocks and number of tasks considered.
+    """
+    busy = []
+    pending = [task_dict(task) for task in tasks]
+    if options.incremental:
+        scheduled = [task for task in tasks if task.assigned_block_date is not None]
+        pending, busy = split_incremental(pending, scheduled, options.now)
+    if not pending:
+        return UserSchedule(user_id, [], len(tasks))
+
+    if options.mode == "AI":
+        assignments, _ = generate_schedule(options.client, pending, options.now, busy)
+        blocks = [assignment.to_block() for assignment in assignments]
+    else:
+        blocks = schedule_tasks(pending, options.now, busy)
+    pending_ids = {task["id"] for task in pending}
+    kept = BlockIndex.from_tasks(task for task in tasks if task.id not in pending_ids)
+    blocks, _, _ = validate_blocks(kept, blocks, {task.id: task.due_date for task in tasks}, options.now)
+    tasks_by_id = {task.id: task for task in tasks}
+    for block in blocks:
+        block["user_id"] = user_id
+        block["block_inputs"] = block_inputs(tasks_by_id[block["task_id"]])
+    return UserSchedule(user_id, blocks, len(tasks))
+
+
+def schedule_user_or_error(user_id, tasks, options):
+    """
+    Runs schedule_user for one worker, turning a failure into an error result so one user
+    can't abort the batch.
+
+    Returns:
+    UserSchedule: the user's result, with error set and no blocks if scheduling failed.
+    """
+    try:
+        return schedule_user(user_id, tasks, options)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        # Any failure (model, network, bad data) only skips this user
+        print(f"Scheduling failed for user {user_id}: {error!r}")
+        return UserSchedule(user_id, [], len(tasks), repr(error))
+
+
+def run_batch(mode="Local", batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS, incremental=True, now=None):
+    """
+    Re-plans every user's schedule.
+
+    Parameters:
+    mode (str): "Local" or "AI".
+    batch_size (int): users per task query and per bulk write.
+    workers (int): users scheduled concurrently.
+    incremental (bool): keep still-valid blocks.
+    now (datetime, optional): blocks start after this time. Defaults to datetime.now().
+
+    Returns:
+    dict: users, tasks, blocks, failed (ids of the users whose scheduling failed), seconds,
+        users_per_second and tasks_per_second.
+    """
+    options = BatchOptions(
+        now=now or datetime.now(),
+        mode=mode,
+        client=schedule_client() if mode == "AI" else None,
+        incremental=incremental,
+    )
+
+    users = tasks_seen = blocks_written = 0
+    failed = []
+    started = time.perf_counter()
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            user_ids = fetch_user_ids_after(last_id, batch_size)
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+
+            # One query for the whole batch, grouped per user in memory
+            tasks_by_user = {user_id: [] for user_id in user_ids}
+            for task in fetch_schedulable_tasks(user_ids, options.now.date()):
+                tasks_by_user[task.user_id].append(task)
+
+            results = pool.map(
+                lambda item: schedule_user_or_error(item[0], item[1], options),
+                tasks_by_user.items(),
+            )
+            batch_blocks = []
+            for result in results:
+                batch_blocks.extend(result.blocks)
+                tasks_seen += result.task_count
+                if result.error is not None:
+                    failed.append(result.user_id)
+            blocks_written += write_blocks(batch_blocks)
+            users += len(user_ids)
+            elapsed = time.perf_counter() - started
+            print(f"{users} users, {tasks_seen} tasks, {blocks_written} blocks written ({elapsed:.1f}s)")
+
+    seconds = time.perf_counter() - started
+    return {
+        "users": users,
+        "tasks": tasks_seen,
+        "blocks": blocks_written,
+        "failed": failed,
+        "seconds": seconds,
+        "users_per_second": users / seconds if seconds else 0.0,
+        "tasks_per_second": tasks_seen / seconds if seconds else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-plan every user's schedule.")
+    parser.add_argument("--mode", choices=["local", "ai"], default="local")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--full", action="store_true", help="reschedule every task, not just new or changed ones")
+    args = parser.parse_args()
+
+    report = run_batch({"local": "Local", "ai": "AI"}[args.mode], args.batch_size, args.workers, incremental=not args.full)
+    print(f"Scheduled {report['users']} users / {report['tasks']} tasks in {report['seconds']:.2f}s: "
+          f"{report['users_per_second']:.1f} users/sec, {report['tasks_per_second']:.1f} tasks/sec, "
+          f"{report['blocks']} blocks written, {len(report['failed'])} users failed")
@@ -0,0 +1,199 @@
+"""Interval index over a user's assigned time blocks, for conflict detection and repair.
+
+Blocks are kept per day in lists sorted by start time (bisect). The index never holds two
+overlapping blocks, so the blocks' end times are sorted too, and an overlap query only has
+to look at the block starting just before the queried end: O(log n) per query. Free-slot
+search walks the gaps between a day's blocks.
+
+validate_blocks runs scheduler output (AI or local) through an index of the blocks already
+on the calendar before anything is committed: blocks that overlap, fall outside 09:00-17:00,
+lie in the past or land after the task's due date are moved to the earliest free slot of the
+same length, or rejected if there is none. Free slots start on the hourly slot grid the
+local scheduler uses, and a task's previous block is taken out of the index before its new
+one is placed, so a rescheduled task never collides with itself. If the new block is
+rejected, the previous one goes back into the index.
+"""
+from bisect import bisect_left, insort
+from datetime import datetime, time, timedelta
+from AIPlanner.classes.scheduler import BLOCK_DURATION, WORK_DAY_END, WORK_DAY_START, block_interval, block_still_valid
+
+SLOT_LENGTH = timedelta(hours=1)  # Free slots start on whole hours, like the local scheduler's
+
+
+def slot_ceiling(moment):
+    """
+    Returns:
+    datetime: moment rounded up to the next slot boundary (unchanged if it is on one).
+    """
+    midnight = datetime.combine(moment.date(), time())
+    return midnight + -(-(moment - midnight) // SLOT_LENGTH) * SLOT_LENGTH
+
+
+class BlockIndex:
+    """
+    Non-overlapping blocks of one user, indexed per day.
+
+    Attributes:
+    _days (dict): date -> sorted list of (start, end, key) tuples.
+    _keys (dict): key -> (start, end) for removal.
+    """
+
+    def __init__(self):
+        self._days = {}
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        """
+        Builds an index from Task rows with blocks; a block overlapping an earlier one is skipped.
+
+        Returns:
+        BlockIndex: the index, keyed by task id.
+        """
+        index = cls()
+        for task in tasks:
+            interval = block_interval(task)
+            if interval is not None:
+                index.add(*interval, key=task.id)
+        return index
+
+    def overlapping(self, start, end):
+        """
+        Returns:
+        list: the (start, end, key) blocks overlapping [start, end), in start order.
+        """
+        blocks = self._days.get(start.date(), [])
+        position = bisect_left(blocks, (end,))  # First block starting at or after end
+        found = []
+        # Ends are sorted too, so walk back only while blocks still reach past start
+        while position > 0 and blocks[position - 1][1] > start:
+            position -= 1
+            found.append(blocks[position])
+        return found[::-1]
+
+    def overlaps(self, start, end):
+        """Returns whether [start, end) overlaps a block in the index (O(log n))."""
+        blocks = self._days.get(start.date(), [])
+        position = bisect_left(blocks, (end,))
+        return position > 0 and blocks[position - 1][1] > start
+
+    def add(self, start, end, key=None):
+        """
+        Adds a block unless it overlaps one already in the index. Adding under an existing
+        key moves that block.
+
+        Returns:
+        bool: True if the block was added.
+        """
+        previous = self._keys.get(key) if key is not None else None
+        if previous:
+            self.remove(key)
+        if end <= start or self.overlaps(start, end):
+            if previous:
+                self.add(*previous, key=key)
+            return False
+        if key is not None:
+            self._keys[key] = (start, end)
+        insort(self._days.setdefault(start.date(), []), (start, end, key))
+        return True
+
+    def remove(self, key):
+        """
+        Removes the block stored under key, if any.
+
+        Returns:
+        tuple: the removed (start, end), or None if key had no block.
+        """
+        interval = self._keys.pop(key, None)
+        if interval is None:
+            return None
+        blocks = self._days[interval[0].date()]
+        blocks.remove((interval[0], interval[1], key))
+        return interval
+
+    def blocks_on(self, day):
+        """
+        Returns:
+        list: the (start, end, key) blocks on day, in start order.
+        """
+        return list(self._days.get(day, []))
+
+    def find_free_slot(self, duration, earliest, last_day):
+        """
+        Finds the earliest gap of at least duration inside working hours, starting on a slot
+        boundary.
+
+        Parameters:
+        duration (timedelta): length of the block needed.
+        earliest (datetime): the block can't start before this; rounded up to the next slot.
+        last_day (date): the last day the block may be on.
+
+        Returns:
+        datetime: start of the free slot, or None if there is none up to last_day.
+        """
+        earliest = slot_ceiling(earliest)
+        day = earliest.date()
+        while day <= last_day:
+            cursor = max(datetime.combine(day, time(WORK_DAY_START)), earliest)
+            day_end = datetime.combine(day, time(WORK_DAY_END))
+            blocks = self._days.get(day, [])
+            # Skip blocks that end before the cursor
+            for start, end, _ in blocks[max(0, bisect_left(blocks, (cursor,)) - 1):]:
+                if start - cursor >= duration:
+                    break
+                cursor = max(cursor, slot_ceiling(end))
+            if day_end - cursor >= duration:
+                return cursor
+            day += timedelta(days=1)
+        return None
+
+
+def validate_blocks(index, blocks, due_dates, now=None):
+    """
+    Checks proposed blocks against the index and each other, repairing what it can.
+
+    Parameters:
+    index (BlockIndex): blocks already on the calendar; accepted blocks are added to it and
+        replace any block the index held for the same task. A rejected task keeps its block.
+    blocks (list): block dictionaries with task_id, assigned_block_date, assigned_block_start_time
+        and assigned_block_duration, in priority order (earlier blocks win conflicts).
+    due_dates (dict): task id -> due date.
+    now (datetime, optional): blocks must start after this time. Defaults to datetime.now().
+
+    Returns:
+    tuple: (list of accepted block dictionaries, number repaired, list of rejected task ids)
+    """
+    now = now or datetime.now()
+    accepted = []
+    repaired = 0
+    rejected = []
+    for block in blocks:
+        task_id = block["task_id"]
+        previous = index.remove(task_id)  # The task's old block must not block its new one
+        duration = block["assigned_block_duration"] or BLOCK_DURATION
+        start = datetime.combine(block["assigned_block_date"], block["assigned_block_start_time"])
+        end = start + duration
+        if block_still_valid(start, end, due_dates[task_id], now) and index.add(start, end, key=task_id):
+            accepted.append(block)
+            continue
+
+        slot = index.find_free_slot(duration, now, due_dates[task_id])
+        if slot is None:
+            print(f"Rejected block for task {task_id}: no free slot before its due date")
+            rejected.append(task_id)
+            if previous is not None:
+                index.add(*previous, key=task_id)
+            continue
+        index.add(slot, slot + duration, key=task_id)
+        print(f"Moved block for task {task_id} from {start:%Y-%m-%d %H:%M} to {slot:%Y-%m-%d %H:%M}")
+        accepted.append(dict(
+            block,
+            assigned_block_date=slot.date(),
+            assigned_block_start_time=slot.time(),
+            assigned_block_duration=duration,
+        ))
+        repaired += 1
+    return accepted, repaired, rejected
@@ -4,6 +4,30 @@ from AIPlanner.classes.WeeklyCal import GenWeeklyCal
 from AIPlanner.classes.daily_cal import daily_cal
 
 
+def day_summary_badge(day):
+    """
+    Number of tasks due on a day of the visible month, coloured by the most urgent one
+
+    Returns:
+    prints a badge, or nothing if no tasks are due
+    """
+    count = GenCalendar.day_counts[day - 1]
+    return rx.cond(
+        count > 0,
+        rx.badge(
+            count,
+            color_scheme=rx.match(
+                GenCalendar.day_priority[day - 1],
+                (1, "red"),
+                (2, "blue"),
+                (3, "green"),
+                "gray",
+            ),
+            variant="solid",
+            radius="full",
+        ),
+    )
+
 def calendar_component():
     """
     Monthly calendar initializer and caller
@@ -53,7 +77,8 @@ def calendar_component():
                                         GenCalendar.current_year, day),
                                     text_align="center",
                                     padding="10px"
-                                )
+                                ),
+                                day_summary_badge(day),
                             ),
                             rx.table.cell()  # Render an empty cell for 0
                         )
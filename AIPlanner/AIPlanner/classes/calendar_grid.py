@@ -0,0 +1,121 @@
+"""Shared, cached calendar layouts for the monthly and weekly views.
+
+A month or week layout depends only on its (year, month) or ISO (year, week), so it is
+built once per process and shared by every user's state through an LRU cache. Layouts are
+immutable (tuples), so states can hold the cached object itself: navigating swaps in a
+ready-made layout instead of rebuilding it. Each lookup also warms the neighbouring
+periods, so the next "Previous" or "Next" click is a cache hit.
+"""
+import calendar
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import NamedTuple
+
+GRID_CACHE_SIZE = 128
+
+
+class MonthGrid(NamedTuple):
+    """
+    Layout of one month.
+
+    Attributes:
+    year (int): the year.
+    month (int): the month, 1-12.
+    dates (tuple): weeks of seven day numbers, 0 for cells outside the month.
+    label (str): title of the calendar, e.g. "March 2025".
+    first_day (date): the first day of the month.
+    last_day (date): the last day of the month.
+    """
+    year: int
+    month: int
+    dates: tuple
+    label: str
+    first_day: date
+    last_day: date
+
+
+class WeekGrid(NamedTuple):
+    """
+    Layout of one ISO week.
+
+    Attributes:
+    start (date): the Monday the week starts on.
+    dates (tuple): a single row of the seven formatted day numbers.
+    label (str): title of the calendar, e.g. "Week of March 3".
+    """
+    start: date
+    dates: tuple
+    label: str
+
+
+def shift_month(year, month, delta):
+    """
+    Returns:
+    tuple: (year, month) delta months after the given month.
+    """
+    year_offset, month_index = divmod(month - 1 + delta, 12)
+    return year + year_offset, month_index + 1
+
+
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def month_grid(year, month):
+    """
+    Builds the layout of a month, with leading and trailing 0 cells to fill whole weeks.
+
+    Returns:
+    MonthGrid: the cached layout.
+    """
+    first_weekday, days = calendar.monthrange(year, month)
+    cells = [0] * first_weekday + list(range(1, days + 1))
+    cells.extend([0] * (-len(cells) % 7))
+    dates = tuple(tuple(cells[index:index + 7]) for index in range(0, len(cells), 7))
+    return MonthGrid(
+        year=year,
+        month=month,
+        dates=dates,
+        label=f"{calendar.month_name[month]} {year}",
+        first_day=date(year, month, 1),
+        last_day=date(year, month, days),
+    )
+
+
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def week_grid(iso_year, iso_week):
+    """
+    Builds the layout of an ISO week.
+
+    Returns:
+    WeekGrid: the cached layout.
+    """
+    start = date.fromisocalendar(iso_year, iso_week, 1)
+    days = [start + timedelta(days=offset) for offset in range(7)]
+    return WeekGrid(
+        start=start,
+        dates=(tuple(day.strftime(" %d") for day in days),),
+        label=f"Week of {calendar.month_name[start.month]} {start.day}",
+    )
+
+
+def month_layout(year, month):
+    """
+    Looks up a month's layout and warms the cache for the months before and after it.
+
+    Returns:
+    MonthGrid: the layout of the requested month.
+    """
+    for delta in (-1, 1):
+        month_grid(*shift_month(year, month, delta))
+    return month_grid(year, month)
+
+
+def week_layout(day):
+    """
+    Looks up the layout of the ISO week holding day and warms the cache for the weeks
+    before and after it.
+
+    Returns:
+    WeekGrid: the layout of the requested week.
+    """
+    for delta in (-7, 7):
+        week_grid(*(day + timedelta(days=delta)).isocalendar()[:2])
+    return week_grid(*day.isocalendar()[:2])
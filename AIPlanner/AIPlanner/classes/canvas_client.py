@@ -0,0 +1,448 @@
+"""Canvas REST API client used to grab courses and assignments from a user's Canvas account.
+
+Keeps one pooled keep-alive session per client so every page of every request reuses
+the same connections, and fetches the assignments of several courses in parallel.
+Concurrency follows Canvas' per-token rate limit bucket (X-Rate-Limit-Remaining), and
+throttled (403 Rate Limit Exceeded / 429) or 5xx responses are retried with jittered
+exponential backoff. Only depends on requests, so it can be pointed at a local stub
+Canvas server.
+"""
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+
+# Canvas caps page sizes at 100; the default of 10 costs ten times the round trips
+MAX_PER_PAGE = 100
+
+# The only assignment fields the planner reads
+ASSIGNMENT_FIELDS = ('id', 'name', 'due_at', 'updated_at', 'course_id')
+
+# Canvas' rate limit bucket for a token holds 700 units when idle
+FULL_BUCKET = 700.0
+
+# Below this many units left, requests are paced to let the bucket refill
+LOW_WATER = 150.0
+MAX_PACE_SECONDS = 1.0
+
+# Statuses worth retrying besides Canvas' 403 throttling response
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Most tokens whose rate limit trackers are kept; the least recently used is dropped first
+MAX_TRACKERS = 256
+
+
+class RateLimitTracker:
+    """
+    Tracks Canvas' rate limit bucket for one API token and sizes concurrency to match.
+    Two limits apply and the lower one wins:
+    - the bucket: full concurrency while at least half the bucket is left, then
+      proportionally fewer requests in flight;
+    - a congestion window: halved on every throttled response and grown by about one
+      request per window of successful responses (additive increase, multiplicative decrease),
+      so the client settles just under the rate Canvas accepts instead of oscillating.
+    Below LOW_WATER units left, each request also waits up to MAX_PACE_SECONDS so the
+    bucket can refill before it is spent.
+    Shared by every CanvasClient using the same token (see tracker_for); each client also
+    caps its own requests in flight at its max_concurrency.
+
+    Attributes:
+    max_concurrency (int): most requests in flight for the token when the bucket is healthy,
+        the highest max_concurrency of the clients sharing it.
+    remaining (float): last X-Rate-Limit-Remaining reported by Canvas.
+    window (float): congestion window, the most requests in flight Canvas currently tolerates.
+    in_flight (int): requests currently being sent with the token.
+    metrics (dict): counters for requests, retries, throttled and server error responses,
+        summed X-Request-Cost and seconds spent backing off.
+    """
+
+    def __init__(self, max_concurrency):
+        self.max_concurrency = max_concurrency
+        self.remaining = FULL_BUCKET
+        self.window = float(max_concurrency)
+        self.in_flight = 0
+        self.metrics = {
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "server_errors": 0,
+            "request_cost": 0.0,
+            "backoff_seconds": 0.0,
+        }
+        self._condition = threading.Condition()
+
+    def allowed_concurrency(self):
+        """
+        Returns:
+        int: how many requests may be in flight given the remaining bucket.
+        """
+        share = self.remaining / (FULL_BUCKET / 2)
+        by_bucket = math.ceil(self.max_concurrency * share)
+        return max(1, min(self.max_concurrency, by_bucket, int(self.window)))
+
+    def raise_ceiling(self, max_concurrency):
+        """
+        Raises max_concurrency for a client of the token that allows more requests in flight.
+        A window held at the old ceiling (rather than cut by throttling) is raised with it.
+        """
+        with self._condition:
+            if max_concurrency > self.max_concurrency:
+                if self.window >= self.max_concurrency:
+                    self.window = float(max_concurrency)
+                self.max_concurrency = max_concurrency
+                self._condition.notify_all()
+
+    def acquire(self):
+        """Blocks until another request may be sent with the token."""
+        with self._condition:
+            while self.in_flight >= self.allowed_concurrency():
+                self._condition.wait()
+            self.in_flight += 1
+            self.metrics["requests"] += 1
+            pace = max(0.0, LOW_WATER - self.remaining) / LOW_WATER * MAX_PACE_SECONDS
+        if pace:
+            time.sleep(pace)
+
+    def release(self, response):
+        """
+        Frees the request's slot and learns the bucket state from the response headers.
+
+        Parameters:
+        response (requests.Response or None): the response, or None if the request failed to send.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if response is not None:
+                remaining = response.headers.get('X-Rate-Limit-Remaining')
+                cost = response.headers.get('X-Request-Cost')
+                if remaining is not None:
+                    self.remaining = float(remaining)
+                if cost is not None:
+                    self.metrics["request_cost"] += float(cost)
+                if is_throttled(response):
+                    self.remaining = 0.0
+                    self.window = max(1.0, self.window / 2)
+                    self.metrics["throttled"] += 1
+                else:
+                    self.window = min(float(self.max_concurrency), self.window + 1 / self.window)
+                    if response.status_code >= 500:
+                        self.metrics["server_errors"] += 1
+            self._condition.notify_all()
+
+    def record_backoff(self, seconds):
+        """Counts a retry and the time spent waiting before it."""
+        with self._condition:
+            self.metrics["retries"] += 1
+            self.metrics["backoff_seconds"] += seconds
+
+    def snapshot(self):
+        """
+        Returns:
+        dict: a copy of the metrics plus the current bucket and concurrency.
+        """
+        with self._condition:
+            return dict(self.metrics, remaining=self.remaining, window=round(self.window, 2),
+                        allowed_concurrency=self.allowed_concurrency())
+
+
+_trackers = OrderedDict()
+_trackers_lock = threading.Lock()
+
+
+def tracker_for(api_token, max_concurrency):
+    """
+    Returns the process-wide RateLimitTracker for a token, creating it on first use, so every
+    client of the token shares one view of its rate limit bucket. The tracker's ceiling is
+    raised to max_concurrency if it was created by a client with a lower one; each client
+    enforces its own ceiling. Tokens are only kept as SHA-256 digests, and only the
+    MAX_TRACKERS most recently used tokens are kept.
+    """
+    key = hashlib.sha256(api_token.encode()).hexdigest()
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = _trackers[key] = RateLimitTracker(max_concurrency)
+            while len(_trackers) > MAX_TRACKERS:
+                _trackers.popitem(last=False)
+        else:
+            _trackers.move_to_end(key)
+    tracker.raise_ceiling(max_concurrency)
+    return tracker
+
+
+def is_throttled(response):
+    """
+    Canvas answers throttled requests with 403 Forbidden (Rate Limit Exceeded);
+    429 is treated the same way.
+    """
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and 'Rate Limit Exceeded' in response.text
+
+
+def backoff_delay(attempt, response=None, base=0.5, cap=30.0):
+    """
+    Full-jitter exponential backoff: a random wait between 0 and base * 2**attempt
+    (capped), or the server's Retry-After if it asked for longer.
+
+    Returns:
+    float: seconds to wait before the next attempt.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if response is not None:
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, min(cap, float(retry_after)))
+    return delay
+
+
+class CanvasClient:
+    """
+    Canvas API client with a shared connection pool and bounded concurrency.
+
+    Attributes:
+    base_url (str): the Canvas instance url, e.g. 'https://uncw.instructure.com'.
+    max_concurrency (int): most requests this client has in flight to the Canvas host at once.
+    timeout (int): seconds before a single request times out.
+    max_retries (int): retries for throttled, 5xx or connection-failed requests.
+    session (requests.Session): keep-alive session shared by every request and thread.
+    rate_limit (RateLimitTracker): bucket tracker shared by every client with the same token.
+    """
+
+    def __init__(self, base_url, api_token, max_concurrency=4, timeout=20, max_retries=5):
+        """
+        Parameters:
+        base_url (str): the Canvas instance url.
+        api_token (str): the user's Canvas API token.
+        max_concurrency (int): most requests in flight to the Canvas host at once.
+        timeout (int): seconds before a single request times out.
+        max_retries (int): retries for throttled, 5xx or connection-failed requests.
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limit = tracker_for(api_token, max_concurrency)
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {api_token}'
+        # One pool for the single Canvas host, sized so no worker waits on a connection
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._host_slots = threading.BoundedSemaphore(max_concurrency)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes the pooled connections."""
+        self.session.close()
+
+    @property
+    def metrics(self):
+        """
+        Returns:
+        dict: rate limit and retry metrics for this client's token.
+        """
+        return self.rate_limit.snapshot()
+
+    def get(self, url, params=None, headers=None):
+        """
+        Sends one GET request through the shared session, waiting for a free host slot and
+        for the token's rate limit bucket, and retries throttled, 5xx and failed requests.
+
+        Parameters:
+        url (str): absolute url, or a path starting with /api/v1.
+        params (dict, optional): query parameters.
+        headers (dict, optional): extra request headers, e.g. conditional request validators.
+
+        Returns:
+        requests.Response: the successful (or 304 Not Modified) response.
+
+        Raises:
+        requests.exceptions.HTTPError: if Canvas answers with an error status (after retries).
+        requests.exceptions.ConnectionError: if Canvas can't be reached (after retries).
+        """
+        if url.startswith('/'):
+            url = self.base_url + url
+        for attempt in range(self.max_retries + 1):
+            response = None
+            with self._host_slots:
+                self.rate_limit.acquire()
+                try:
+                    response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    if attempt == self.max_retries:
+                        raise
+                finally:
+                    self.rate_limit.release(response)
+
+            retryable = response is None or is_throttled(response) or response.status_code in RETRY_STATUSES
+            if not retryable or attempt == self.max_retries:
+                break
+            delay = backoff_delay(attempt, response)
+            self.rate_limit.record_backoff(delay)
+            time.sleep(delay)
+
+        response.raise_for_status()
+        return response
+
+    def get_paginated(self, path, params=None):
+        """
+        Follows Canvas 'next' Link headers and collects every page of a list endpoint.
+
+        Parameters:
+        path (str): path of the list endpoint, e.g. /api/v1/users/self/favorites/courses.
+        params (dict, optional): query parameters for the first page
+            (Canvas repeats them in the 'next' links).
+
+        Returns:
+        list: the items of every page.
+        """
+        return self.collect_pages(self.get(path, params=params))
+
+    def collect_pages(self, response):
+        """
+        Collects the items of a first page response and every page after it.
+
+        Parameters:
+        response (requests.Response): the first page.
+
+        Returns:
+        list: the items of every page.
+        """
+        items = list(response.json())
+        # Check for pagination
+        url = response.links.get('next', {}).get('url')
+        while url:
+            response = self.get(url)
+            items.extend(response.json())
+            url = response.links.get('next', {}).get('url')
+        return items
+
+    def get_favorite_courses(self):
+        """
+        Gets favorited courses from Canvas.
+
+        Returns:
+        list: course dictionaries.
+        """
+        return self.get_paginated('/api/v1/users/self/favorites/courses', params={'per_page': MAX_PER_PAGE})
+
+    def get_assignments_for_course(self, course_id, upcoming_only=True):
+        """
+        Gets the assignments of a Canvas course.
+        By default Canvas filters to assignments due in the future (bucket=future) and sorts
+        them by due date, so past assignments are never downloaded. Each assignment is
+        trimmed to ASSIGNMENT_FIELDS since the list endpoint has no field selection.
+
+        Parameters:
+        course_id (int): Canvas course id used to identify course.
+        upcoming_only (bool): False downloads every assignment, past ones included.
+
+        Returns:
+        list: assignment dictionaries.
+        """
+        assignments, _, _ = self.get_assignments_if_changed(course_id, upcoming_only=upcoming_only)
+        return assignments
+
+    def get_assignments_if_changed(self, course_id, etag=None, last_modified=None, upcoming_only=True):
+        """
+        Conditional version of get_assignments_for_course.
+        Sends the validators stored by the last sync as If-None-Match / If-Modified-Since;
+        if Canvas answers 304 Not Modified for the first page the course is unchanged and
+        nothing else is downloaded.
+
+        Parameters:
+        course_id (int): Canvas course id used to identify course.
+        etag (str, optional): ETag returned by the last sync of this course.
+        last_modified (str, optional): Last-Modified returned by the last sync of this course.
+        upcoming_only (bool): False downloads every assignment, past ones included.
+
+        Returns:
+        tuple: (list of assignment dictionaries, or None if unchanged, new ETag, new Last-Modified)
+        """
+        params = {'per_page': MAX_PER_PAGE}
+        if upcoming_only:
+            params.update(bucket='future', order_by='due_at')
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        response = self.get(f'/api/v1/courses/{course_id}/assignments', params=params, headers=headers)
+        if response.status_code == 304:
+            return None, etag, last_modified
+        assignments = [
+            {field: assignment.get(field) for field in ASSIGNMENT_FIELDS}
+            for assignment in self.collect_pages(response)
+        ]
+        return assignments, response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+    def iter_changed_course_assignments(self, courses, validators):
+        """
+        Like iter_course_assignments, but sends conditional requests so unchanged courses
+        cost one empty 304 response.
+
+        Parameters:
+        courses (list): course dictionaries (each needs an 'id').
+        validators (dict): course id -> (ETag, Last-Modified) from the last sync.
+
+        Yields:
+        tuple: (course dictionary, assignments or None if unchanged, new ETag, new Last-Modified)
+        """
+        if not courses:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = {
+                pool.submit(self.get_assignments_if_changed, course['id'],
+                            *validators.get(course['id'], (None, None))): course
+                for course in courses
+            }
+            for future in as_completed(futures):
+                course = futures[future]
+                try:
+                    assignments, etag, last_modified = future.result()
+                except requests.exceptions.HTTPError as e:
+                    print(f"Error in getting course info for course id {course['id']}: {e}")
+                    # Treat as unchanged so the stored cursor is kept for the next sync
+                    assignments, etag, last_modified = None, *validators.get(course['id'], (None, None))
+                yield course, assignments, etag, last_modified
+
+    def iter_course_assignments(self, courses, upcoming_only=True):
+        """
+        Fetches the assignments of every course in parallel and yields each course as soon
+        as all of its pages are in, so callers can report progress while the rest load.
+        A course that fails is reported and yielded with no assignments.
+
+        Parameters:
+        courses (list): course dictionaries (each needs an 'id').
+        upcoming_only (bool): False downloads every assignment, past ones included.
+
+        Yields:
+        tuple: (course dictionary, list of its assignment dictionaries)
+        """
+        if not courses:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = {
+                pool.submit(self.get_assignments_for_course, course['id'], upcoming_only): course
+                for course in courses
+            }
+            for future in as_completed(futures):
+                course = futures[future]
+                try:
+                    assignments = future.result()
+                except requests.exceptions.HTTPError as e:
+                    print(f"Error in getting course info for course id {course['id']}: {e}")
+                    assignments = []
+                yield course, assignments
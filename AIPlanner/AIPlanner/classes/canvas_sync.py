@@ -0,0 +1,240 @@
+"""Incremental Canvas sync: turns a user's upcoming Canvas assignments into tasks.
+
+Each (user, course) pair has a CanvasCourseSync cursor holding the ETag / Last-Modified
+of the course's assignment list and the Canvas assignment ids already imported. A sync
+sends conditional requests with those validators, skips courses Canvas reports as
+unchanged, and updates renamed or rescheduled assignments in place by Canvas id instead
+of inserting duplicates.
+"""
+import asyncio
+from datetime import datetime, date
+import reflex as rx
+import sqlalchemy
+from AIPlanner.classes.canvas_client import CanvasClient
+from AIPlanner.classes.database import CanvasCourseSync, Task
+from AIPlanner.classes.jobs import JOBS
+
+
+def canvas_due_date(assignment):
+    """
+    Converts a Canvas 'due_at' timestamp into the date stored on a task.
+
+    Parameters:
+    assignment (dict): Canvas assignment dictionary.
+
+    Returns:
+    date: the assignment's due date.
+    """
+    due_at = datetime.strptime(assignment['due_at'], "%Y-%m-%dT%H:%M:%SZ")
+    return date(due_at.year, due_at.month, due_at.day)
+
+
+class CanvasSync:
+    """
+    Incremental sync of one user's favorited Canvas courses.
+
+    Call fetch() (a generator that yields as each course completes, for progress
+    reporting), then apply() to write every change in one transaction.
+
+    Attributes:
+    user_id (int): id of the user the tasks belong to.
+    client (CanvasClient): client used to talk to Canvas.
+    inserted (int): tasks created by apply().
+    updated (int): tasks renamed or rescheduled in place by apply().
+    changed_ids (list): ids of the tasks apply() inserted or updated.
+    skipped (int): assignments already up to date.
+    unchanged_courses (int): courses Canvas answered 304 Not Modified for.
+    """
+
+    def __init__(self, user_id, client):
+        self.user_id = user_id
+        self.client = client
+        self.inserted = 0
+        self.updated = 0
+        self.changed_ids = []
+        self.skipped = 0
+        self.unchanged_courses = 0
+        self._cursors = {}
+        self._changed_courses = {}
+
+    def fetch(self):
+        """
+        Loads the user's sync cursors, then fetches every favorited course conditionally.
+
+        Yields:
+        tuple: (course name, courses done, total courses)
+        """
+        with rx.session() as session:
+            cursors = session.exec(
+                CanvasCourseSync.select().where(CanvasCourseSync.user_id == self.user_id)
+            ).all()
+        self._cursors = {cursor.course_id: cursor for cursor in cursors}
+        validators = {
+            course_id: (cursor.etag, cursor.last_modified)
+            for course_id, cursor in self._cursors.items()
+        }
+
+        courses = self.client.get_favorite_courses()
+        changed = self.client.iter_changed_course_assignments(courses, validators)
+        for done, (course, assignments, etag, last_modified) in enumerate(changed, start=1):
+            if assignments is None:
+                self.unchanged_courses += 1
+            else:
+                # Only assignments with a due date can become tasks
+                assignments = [assignment for assignment in assignments if assignment['due_at'] is not None]
+                self._changed_courses[course['id']] = (assignments, etag, last_modified)
+            yield course.get('name', f"course id {course['id']}"), done, len(courses)
+
+    def apply(self):
+        """
+        Writes the fetched changes in one transaction: updates tasks already linked to a
+        Canvas assignment, links legacy imports matched by (task_name, due_date), inserts the
+        rest, and stores the new cursors.
+
+        Returns:
+        tuple: (tasks inserted, tasks updated, assignments skipped)
+        """
+        if not self._changed_courses:
+            self._touch_cursors()
+            return self.inserted, self.updated, self.skipped
+
+        assignment_ids = [
+            assignment['id']
+            for assignments, _, _ in self._changed_courses.values()
+            for assignment in assignments
+        ]
+        with rx.session() as session:
+            # One query for every task already linked to one of the fetched assignments
+            linked = {
+                task.canvas_assignment_id: task for task in session.exec(
+                    Task.select().where(
+                        Task.user_id == self.user_id,
+                        Task.canvas_assignment_id.in_(assignment_ids),
+                    )
+                ).all()
+            }
+            # One query for imports made before tasks carried their Canvas id, restricted to the
+            # names and due dates of the fetched assignments that aren't linked yet
+            # (served by ix_task_user_id_task_name_due_date)
+            unlinked = {
+                (assignment['name'], canvas_due_date(assignment))
+                for assignments, _, _ in self._changed_courses.values()
+                for assignment in assignments
+                if assignment['id'] not in linked
+            }
+            legacy = {}
+            if unlinked:
+                legacy = {
+                    (task.task_name, task.due_date): task for task in session.exec(
+                        Task.select().where(
+                            Task.user_id == self.user_id,
+                            Task.task_name.in_({name for name, _ in unlinked}),
+                            Task.due_date.in_({due_date for _, due_date in unlinked}),
+                            Task.canvas_assignment_id.is_(None),
+                        )
+                    ).all()
+                    if (task.task_name, task.due_date) in unlinked
+                }
+
+            new_tasks = []
+            changed_tasks = []
+            for course_id, (assignments, etag, last_modified) in self._changed_courses.items():
+                cursor = self._cursors.get(course_id) or CanvasCourseSync(course_id=course_id, user_id=self.user_id)
+                seen_ids = cursor.get_seen_ids()
+                for assignment in assignments:
+                    due_date = canvas_due_date(assignment)
+                    task = linked.get(assignment['id']) or legacy.pop((assignment['name'], due_date), None)
+
+                    if task is None and assignment['id'] in seen_ids:
+                        # Imported before but no longer linked (e.g. the task row was removed); don't re-add
+                        self.skipped += 1
+                    elif task is None:
+                        print(f"Adding task {assignment['name']} to database.")
+                        new_tasks.append(Task(
+                            recur_frequency=0,  # Canvas assignments don't recur
+                            due_date=due_date,
+                            is_deleted=False,
+                            task_name=assignment['name'],
+                            description="Task imported from Canvas",
+                            task_id=100,  # Example for unique task_id
+                            priority_level={"Low": 1, "Medium": 2, "High": 3}["Low"],
+                            canvas_assignment_id=assignment['id'],
+                            user_id=self.user_id,
+                        ))
+                    elif (task.task_name, task.due_date, task.canvas_assignment_id) != (assignment['name'], due_date, assignment['id']):
+                        # Renamed or rescheduled in Canvas (or a legacy import being linked)
+                        task.task_name = assignment['name']
+                        task.due_date = due_date
+                        task.canvas_assignment_id = assignment['id']
+                        session.add(task)
+                        changed_tasks.append(task)
+                        self.updated += 1
+                    else:
+                        self.skipped += 1
+
+                cursor.etag = etag
+                cursor.last_modified = last_modified
+                cursor.last_synced_at = datetime.now()
+                cursor.set_seen_ids(seen_ids | {assignment['id'] for assignment in assignments})
+                session.add(cursor)
+
+            session.add_all(new_tasks)
+            self.inserted = len(new_tasks)
+            for course_id, cursor in self._cursors.items():
+                if course_id not in self._changed_courses:
+                    cursor.last_synced_at = datetime.now()
+                    session.add(cursor)
+            session.commit()
+            self.changed_ids = [task.id for task in changed_tasks + new_tasks]
+        return self.inserted, self.updated, self.skipped
+
+    def _touch_cursors(self):
+        """Records the check time on every cursor when nothing changed."""
+        if not self._cursors:
+            return
+        with rx.session() as session:
+            session.execute(
+                sqlalchemy.update(CanvasCourseSync)
+                .where(CanvasCourseSync.user_id == self.user_id)
+                .values(last_synced_at=datetime.now())
+            )
+            session.commit()
+
+
+async def run_sync(user_id, canvas_url, api_token, report_progress):
+    """
+    Runs a full CanvasSync for a user without blocking the event loop: the blocking
+    requests and database work happen in a worker thread, and progress messages are
+    handed back to the caller between courses. Refuses to start if a sync for the same
+    user is already in flight anywhere in the process.
+
+    Parameters:
+    user_id (int): id of the user the tasks belong to.
+    canvas_url (str): the Canvas instance url.
+    api_token (str): the user's Canvas API token.
+    report_progress (coroutine function): awaited with a progress message string.
+
+    Returns:
+    CanvasSync: the finished sync (with its counts), or None if one was already running.
+
+    Raises:
+    requests.exceptions.HTTPError: if Canvas rejects the token.
+    requests.RequestException: if Canvas can't be reached.
+    """
+    job_key = ("canvas_sync", user_id)
+    if not JOBS.claim(job_key):
+        return None
+    try:
+        with CanvasClient(canvas_url, api_token) as client:
+            sync = CanvasSync(user_id, client)
+            progress = sync.fetch()
+            while True:
+                step = await asyncio.to_thread(next, progress, None)
+                if step is None:
+                    break
+                course_name, done, total = step
+                await report_progress(f"Checked {done} of {total} Canvas courses ({course_name})")
+            await asyncio.to_thread(sync.apply)
+        return sync
+    finally:
+        JOBS.release(job_key)
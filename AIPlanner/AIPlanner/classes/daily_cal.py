@@ -10,12 +10,14 @@ class daily_cal(rx.State):
     Class to set the variables for the daily calendar
 
     Attributes:
-    (str) selected_date: date to show on the page
-    (list[Task]) tasks_for_day: tasks from the date
+    (str) selected_date: ISO date to show on the page
+    (list[Task]) tasks_for_day: tasks due on the date
+    (list[Task]) blocks_for_day: tasks with a block assigned on the date
     (str) title: title of page
     """
     selected_date: str = ""
     tasks_for_day: list[Task] = []
+    blocks_for_day: list[Task] = []
     title: str = ""
     month: int
     day: int
@@ -27,8 +29,19 @@ class daily_cal(rx.State):
         self.month = month
         day = int(day)
         self.day = day
-        self.selected_date = datetime.date(year, month, day)
+        self.selected_date = datetime.date(year, month, day).isoformat()
         self.title = str(calendar.month_name[int(self.month)]) + " " + str(self.day)
+        # Only the selected day's tasks are needed on the daily page
+        return [
+            UserManagementState.load_task_window(self.selected_date, self.selected_date),
+            daily_cal.show_selected_day,
+        ]
+
+    async def show_selected_day(self):
+        """Copies the selected day's buckets out of the server-side date index."""
+        user_state = await self.get_state(UserManagementState)
+        self.tasks_for_day = user_state.due_tasks_on(self.selected_date)
+        self.blocks_for_day = user_state.block_tasks_on(self.selected_date)
 
 
 def daily() -> rx.Component:
@@ -56,40 +69,30 @@ def daily() -> rx.Component:
                 # Tasks list
                 rx.text("Tasks Due:"),
                 rx.foreach(
-                    UserManagementState.tasks,  # Iterate through all tasks
-                    lambda task: rx.cond(
-                        # Filter tasks where the due date matches the selected date
-                        task.due_date == daily_cal.selected_date,
-                        rx.text(
-                            f"- {task.task_name}: {task.description}",
-                            style={
-                                "color":
-                                Task.get_priority_color(task),
-                                "wordWrap": "break-word",
-                                "maxWidth": "800px",
-                            },
-                        ),
-                        None,  # Otherwise, do not display anything
+                    daily_cal.tasks_for_day,  # Only the tasks due on the selected date
+                    lambda task: rx.text(
+                        f"- {task.task_name}: {task.description}",
+                        style={
+                            "color":
+                            Task.get_priority_color(task),
+                            "wordWrap": "break-word",
+                            "maxWidth": "800px",
+                        },
                     ),
                 ),
                 rx.text("Tasks assigned on this day:"),
                 rx.foreach(
-                    UserManagementState.tasks,  # Iterate through all tasks
-                    lambda task: rx.cond(
-                        # Filter tasks where the due date matches the selected date
-                        task.assigned_block_date == daily_cal.selected_date,
-                        rx.vstack(
-                            rx.text(f"- {task.task_name}: {task.description}"),
-                            rx.text(f" Assigned start time: {task.assigned_block_start_time}"),
-                            rx.text(f"Assigned block duration: {task.assigned_block_duration}"),
-                            style={
-                                "color": Task.get_priority_color(task),
-                                "wordWrap": "break-word",
-                                "maxWidth": "800px",
+                    daily_cal.blocks_for_day,  # Only the tasks assigned to the selected date
+                    lambda task: rx.vstack(
+                        rx.text(f"- {task.task_name}: {task.description}"),
+                        rx.text(f" Assigned start time: {task.assigned_block_start_time}"),
+                        rx.text(f"Assigned block duration: {task.assigned_block_duration}"),
+                        style={
+                            "color": Task.get_priority_color(task),
+                            "wordWrap": "break-word",
+                            "maxWidth": "800px",
 
-                            },
-                        ),
-                        None,  # Otherwise, do not display anything
+                        },
                     ),
                 ),
             ),
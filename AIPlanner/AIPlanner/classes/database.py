@@ -1,12 +1,36 @@
 """Module containing classes and methods pertaining to the SQLite database built into Reflex"""
-from datetime import date, time, timedelta
+import calendar
+import heapq
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from operator import attrgetter
 from typing import List, Optional
 import random
 from AIPlanner.pages.login import LoginState
+from AIPlanner.classes.block_index import BlockIndex, validate_blocks
+from AIPlanner.classes.recurrence import EXCEPTION_FIELDS, RECURRENCE_HORIZON_DAYS, expand_tasks
+from AIPlanner.classes.scheduler import block_inputs
 
 import reflex as rx
+import sqlalchemy
 import sqlmodel
 
+# Which occurrences of a recurring task an edit or delete applies to
+SCOPE_THIS = "This occurrence"
+SCOPE_FOLLOWING = "This and following"
+SCOPE_ALL = "All occurrences"
+SERIES_SCOPES = [SCOPE_THIS, SCOPE_FOLLOWING, SCOPE_ALL]
+
+# To-do list ordering and page size
+TODO_SORT_DUE = "Due date"
+TODO_SORT_PRIORITY = "Priority"
+TODO_SORTS = [TODO_SORT_DUE, TODO_SORT_PRIORITY]
+TODO_SORT_COLUMNS = {
+    TODO_SORT_DUE: ("due_date", "priority_level", "id"),
+    TODO_SORT_PRIORITY: ("priority_level", "due_date", "id"),
+}
+TODO_PAGE_SIZE = 25
+
 class User(rx.Model, table=True):
     """Class that defines the User table in the SQLite database
     
@@ -26,8 +50,11 @@ class Task(rx.Model, table=True):
     """Class that defines the Task table in the SQLite database
     
     Attributes:
-    recur_frequency: Integer that determines how frequently a task recurs
-    due_date: Date that the task must be completed by
+    recur_frequency: Integer that determines how frequently a task recurs (0 none, 1 daily, 7 weekly, 30 monthly)
+    recur_end_date: Last day a recurring task can occur on, None for no end
+    recur_month_day: Day of the month a monthly rule falls on, None for the due date's day
+    series_id: Id of the first rule row of a recurring series, shared by the rules it is split into; None for non-recurring tasks
+    due_date: Date that the task must be completed by, the first occurrence for a recurring task
     is_deleted: Boolean that determines whether the task is deleted or not
     task_name: String name of the task
     description: String description of the task
@@ -36,9 +63,39 @@ class Task(rx.Model, table=True):
     assigned_block_date: Date that the task is assigned to
     assigned_block_start_time: Time that the task should be started on the assigned date
     assigned_block_duration: Timedelta for how long after start time the task should be worked on
+    block_inputs: Priority, due date and name the assigned block was scheduled with (scheduler.block_inputs), None if unknown
+    canvas_assignment_id: Canvas id of the assignment the task was imported from, None for user-created tasks
     user_id: Integer foreign key reference to the user whose task this is
     user: Populates the tasks field of the User table
+
+    Indexes:
+    ix_task_user_id_is_deleted: Serves get_user_tasks (user_id + is_deleted filter)
+    ix_task_user_id_task_name_due_date: Serves the Canvas import duplicate check
+    ix_task_live_user_id_due_date: Partial index over live (not deleted) tasks ordered by due date
+    ix_task_live_user_id_assigned_block_date: Partial index over live tasks ordered by assigned block date
+    ix_task_user_id_canvas_assignment_id: Serves the incremental Canvas sync lookup
+    ix_task_series_id_due_date: Serves the set-based series edits ("this and following", "all")
+
+    A recurring task is a single row (the rule); its occurrences are expanded on demand
+    (see recurrence.py) and per-occurrence changes live in TaskException.
     """
+    __table_args__ = (
+        sqlalchemy.Index("ix_task_user_id_is_deleted", "user_id", "is_deleted"),
+        sqlalchemy.Index("ix_task_user_id_task_name_due_date", "user_id", "task_name", "due_date"),
+        sqlalchemy.Index(
+            "ix_task_live_user_id_due_date", "user_id", "due_date",
+            sqlite_where=sqlalchemy.text("is_deleted = 0"),
+            postgresql_where=sqlalchemy.text("is_deleted = false"),
+        ),
+        sqlalchemy.Index(
+            "ix_task_live_user_id_assigned_block_date", "user_id", "assigned_block_date",
+            sqlite_where=sqlalchemy.text("is_deleted = 0"),
+            postgresql_where=sqlalchemy.text("is_deleted = false"),
+        ),
+        sqlalchemy.Index("ix_task_user_id_canvas_assignment_id", "user_id", "canvas_assignment_id"),
+        sqlalchemy.Index("ix_task_series_id_due_date", "series_id", "due_date"),
+    )
+
     recur_frequency: int
     due_date: date
     is_deleted: bool
@@ -49,6 +106,11 @@ class Task(rx.Model, table=True):
     assigned_block_date: Optional[date]
     assigned_block_start_time: Optional[time]
     assigned_block_duration: Optional[timedelta]
+    canvas_assignment_id: Optional[int] = None
+    block_inputs: Optional[str] = None
+    recur_end_date: Optional[date] = None
+    recur_month_day: Optional[int] = None
+    series_id: Optional[int] = None
     user_id: int = sqlmodel.Field(foreign_key="user.id")
     user: Optional[User] = sqlmodel.Relationship(back_populates="tasks")
 
@@ -63,6 +125,60 @@ class Task(rx.Model, table=True):
             "gray"         # Default
         )
 
+class TaskException(rx.Model, table=True):
+    """Class that defines the TaskException table, one changed occurrence of a recurring task
+
+    Attributes:
+    task_id: Integer foreign key reference to the recurring task (the rule row)
+    occurrence_date: Date of the occurrence that differs from the rule
+    is_deleted: Boolean that hides the occurrence
+    is_done: Boolean that marks the occurrence completed, which also hides it
+    task_name: Name override for the occurrence, None to keep the rule's
+    description: Description override for the occurrence, None to keep the rule's
+    priority_level: Priority override for the occurrence, None to keep the rule's
+    """
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint("task_id", "occurrence_date", name="uq_taskexception_task_id_occurrence_date"),
+    )
+
+    task_id: int = sqlmodel.Field(foreign_key="task.id")
+    occurrence_date: date
+    is_deleted: bool = False
+    is_done: bool = False
+    task_name: Optional[str] = None
+    description: Optional[str] = None
+    priority_level: Optional[int] = None
+
+class CanvasCourseSync(rx.Model, table=True):
+    """Class that defines the CanvasCourseSync table, the per-user, per-course Canvas sync cursor
+
+    Attributes:
+    course_id: Canvas id of the course
+    etag: ETag Canvas returned for the course's assignment list on the last sync
+    last_modified: Last-Modified Canvas returned for the course's assignment list on the last sync
+    last_synced_at: When the course was last checked
+    seen_assignment_ids: Comma-separated Canvas ids of the assignments already imported
+    user_id: Integer foreign key reference to the user whose cursor this is
+    """
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint("user_id", "course_id", name="uq_canvascoursesync_user_id_course_id"),
+    )
+
+    course_id: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    last_synced_at: Optional[datetime] = None
+    seen_assignment_ids: str = ""
+    user_id: int = sqlmodel.Field(foreign_key="user.id")
+
+    def get_seen_ids(self) -> set:
+        """Return seen_assignment_ids as a set of integers."""
+        return {int(assignment_id) for assignment_id in self.seen_assignment_ids.split(",") if assignment_id}
+
+    def set_seen_ids(self, assignment_ids):
+        """Store a collection of Canvas assignment ids in seen_assignment_ids."""
+        self.seen_assignment_ids = ",".join(str(assignment_id) for assignment_id in sorted(assignment_ids))
+
 class UserManagementState(rx.State):
     """Class that defines the state in which variables and 
     functions are held relating to user management
@@ -70,17 +186,40 @@ class UserManagementState(rx.State):
     Attributes:
     users: List of users to hold the result of retrieving all users from the database
     message: String to hold success and error messages for functions in the state
-    tasks: List of tasks to hold the result of retrieving tasks from users
     user_id: Integer holding the user.id of the currently logged-in user
+    window_start: ISO date string of the first day of the visible calendar window
+    window_end: ISO date string of the last day (inclusive) of the visible calendar window
+    _prefetch_start: First day of the backend-only prefetched range (previous window)
+    _prefetch_end: Last day of the backend-only prefetched range (next window)
+    _prefetch_user_id: User the prefetched range was loaded for
+    _task_store: Backend-only store of the previous, visible and next windows' tasks keyed by
+        task id (a recurring task's id maps to its occurrences), patched in place after edits
+    _tasks: Backend-only list of the tasks inside the visible window
+    _tasks_by_due_date: Backend-only index of the visible tasks keyed by ISO due date
+    _tasks_by_block_date: Backend-only index of the visible tasks keyed by ISO assigned block date
+    editing_task_id_name: Id of the task whose name is being edited
+    editing_task_id_description: Id of the task whose description is being edited
+    editing_occurrence: ISO due date of the occurrence being edited, so only that row of a series opens its input
+    series_scope: Which occurrences of a recurring task edits and deletes apply to (SERIES_SCOPES)
     """
     users: list[User] = []  # To hold the list of users
     message: str = ""        # To display success or error messages
-    tasks: list[Task] = []
     user_id: int = 1
+    window_start: str = ""
+    window_end: str = ""
+    _prefetch_start: Optional[date] = None
+    _prefetch_end: Optional[date] = None
+    _prefetch_user_id: int = 0
+    _task_store: dict[int, list[Task]] = {}
+    _tasks: list[Task] = []
+    _tasks_by_due_date: dict[str, list[Task]] = {}
+    _tasks_by_block_date: dict[str, list[Task]] = {}
     editing_task_id_name: Optional[int] = None  # ID of the task currently being edited
     editing_task_id_description: Optional[int] = None
+    editing_occurrence: str = ""
     new_task_name: str = ""  # Temporary storage for the new task name
     new_task_description: str = ""
+    series_scope: str = SCOPE_THIS  # Occurrences of a recurring task the next edit or delete applies to
 
     def set_user_id(self, user_id: int):
         """Setter method for user ID"""
@@ -97,13 +236,114 @@ class UserManagementState(rx.State):
         return f"{self.user_id}"
 
     def get_user_tasks(self, user_id: int):
-        """Method to retrieve all tasks for a given user"""
-        with rx.session() as session:
-            self.tasks = session.exec(
-                Task.select().where(Task.user_id == user_id).where(Task.is_deleted.is_(False))
-            ).all()
-        print("calling")
-        print(self.tasks)
+        """Method to reload a given user's tasks inside the visible window from the database
+
+        Defaults the window to the current month if no calendar view has set one yet.
+        """
+        if not self.window_start or not self.window_end:
+            today = date.today()
+            self.window_start = today.replace(day=1).isoformat()
+            self.window_end = today.replace(day=calendar.monthrange(today.year, today.month)[1]).isoformat()
+        self.load_window(user_id, refresh=True)
+
+    async def load_task_window(self, start: str, end: str):
+        """Method to show the logged-in user's tasks for the window [start, end]
+
+        Called by the monthly, weekly and daily calendars whenever the visible period changes.
+
+        Parameters:
+        start: ISO date string of the first visible day
+        end: ISO date string of the last visible day
+        """
+        login_state = await self.get_state(LoginState)
+        self.window_start = start
+        self.window_end = end
+        self.load_window(login_state.user_id, refresh=False)
+
+    def load_window(self, user_id: int, refresh: bool):
+        """Method to show the tasks inside the current window
+
+        Tasks for the previous, visible and next windows are fetched in one query and kept in a
+        backend-only store, so stepping to a neighbouring window is served from memory.
+
+        Parameters:
+        user_id: Integer id of the user whose tasks are loaded
+        refresh: Boolean that forces a database reload even if the window was prefetched
+        """
+        start = date.fromisoformat(self.window_start)
+        end = date.fromisoformat(self.window_end)
+        prefetched = (
+            not refresh
+            and self._prefetch_user_id == user_id
+            and self._prefetch_start is not None
+            and self._prefetch_start <= start
+            and end <= self._prefetch_end
+        )
+        if not prefetched:
+            span = end - start + timedelta(days=1)
+            self._prefetch_start = start - span
+            self._prefetch_end = end + span
+            self._prefetch_user_id = user_id
+            self._task_store = {}
+            for task in fetch_tasks_between(user_id, self._prefetch_start, self._prefetch_end):
+                self._task_store.setdefault(task.id, []).append(task)
+        self._show_window()
+
+    def _show_window(self):
+        """Method to derive the visible tasks and their date indexes from the store
+
+        The store and the visible tasks stay on the server; views read them through the indexes.
+        """
+        start = date.fromisoformat(self.window_start)
+        end = date.fromisoformat(self.window_end)
+        self._tasks = [
+            task for tasks in self._task_store.values() for task in tasks if task_in_window(task, start, end)
+        ]
+        self._tasks_by_due_date, self._tasks_by_block_date = index_tasks_by_date(self._tasks)
+
+    def _upsert_tasks(self, tasks: List[Task]):
+        """Method to put fresh rows (or a recurring task's fresh occurrences) into the store by id"""
+        fresh = {}
+        for task in tasks:
+            fresh.setdefault(task.id, []).append(task)
+        self._task_store.update(fresh)
+        self._show_window()
+
+    def _remove_tasks(self, task_ids):
+        """Method to drop tasks (or a recurring task's occurrences) from the store by id"""
+        for task_id in task_ids:
+            self._task_store.pop(task_id, None)
+        self._show_window()
+
+    def _refresh_tasks(self, task_ids):
+        """Method to re-read the given tasks, and the rest of their series, into the store
+
+        Does nothing before a window has been loaded; the next load reads them anyway.
+        """
+        if self._prefetch_start is None or not task_ids:
+            return
+        stale_ids, tasks = fetch_tasks_by_ids(
+            self._prefetch_user_id, list(task_ids), self._prefetch_start, self._prefetch_end
+        )
+        for task_id in stale_ids:
+            self._task_store.pop(task_id, None)
+        self._upsert_tasks(tasks)
+
+    def refresh_tasks(self, task_ids: list[int]):
+        """Method to update just the given tasks after they were created or changed elsewhere
+
+        Parameters:
+        task_ids: List of the ids of the created or changed tasks
+        """
+        self._refresh_tasks(task_ids)
+
+    def due_tasks_on(self, day: str) -> list[Task]:
+        """Method to look up the visible tasks due on an ISO date"""
+        return self._tasks_by_due_date.get(day, [])
+
+    def block_tasks_on(self, day: str) -> list[Task]:
+        """Method to look up the visible tasks with a block assigned on an ISO date"""
+        return self._tasks_by_block_date.get(day, [])
 
     def fetch_all_users(self):
         """Method to retrieve all usernames in the database"""
@@ -136,13 +376,15 @@ class UserManagementState(rx.State):
             session.add(new_task)
             session.commit()
 
-    def set_editing_task_id_name(self, task_id: Optional[int]):
-        """Set the ID of the task being edited."""
+    def set_editing_task_id_name(self, task_id: Optional[int], occurrence_date: str = ""):
+        """Set the ID and occurrence of the task being edited."""
         self.editing_task_id_name = task_id
+        self.editing_occurrence = str(occurrence_date or "")[:10]
 
-    def set_editing_task_id_description(self, task_id: Optional[int]):
-        """Set the ID of the task being edited for its description."""
+    def set_editing_task_id_description(self, task_id: Optional[int], occurrence_date: str = ""):
+        """Set the ID and occurrence of the task being edited for its description."""
         self.editing_task_id_description = task_id
+        self.editing_occurrence = str(occurrence_date or "")[:10]
 
     def set_new_task_name(self, value: str):
         """Set the new task name."""
@@ -152,49 +394,9 @@ class UserManagementState(rx.State):
         """Set the new task description."""
         self.new_task_description = value
 
-    def edit_task_name(self, task_id: int, new_name: str):
-        """Update the task name for the given task ID."""
-        with rx.session() as session:
-            task = session.exec(
-                Task.select().where(Task.id == task_id)
-            ).first()
-            if task:
-                task.task_name = new_name
-                session.commit()
-                print(f"Task name updated to '{new_name}' for task ID: {task_id}.")
-            else:
-                print(f"No task found with ID: {task_id}.")
-
-    def edit_task_description(self, task_id: int, new_description: str):
-        """Update the task description for the given task ID."""
-        with rx.session() as session:
-            task = session.exec(
-                Task.select().where(Task.id == task_id)
-            ).first()
-            if task:
-                task.description = new_description
-                session.commit()
-                print(f"Task description updated to '{new_description}' for task ID: {task_id}.")
-            else:
-                print(f"No task found with ID: {task_id}.")
-
-    def delete_task(self, task_id: int):
-        """Marks the task as deleted by setting is_deleted to True if it's not already True."""
-        with rx.session() as session:
-            # Try to get the task with the specified ID
-            task = session.exec(
-                Task.select().where(Task.id == task_id)
-            ).first()
-            if task:
-                if not task.is_deleted:
-                    # Set is_deleted to True and commit
-                    task.is_deleted = True
-                    session.commit()
-                    print(f"Task {task_id} marked as deleted.")
-                else:
-                    print(f"Task {task_id} is already marked as deleted.")
-            else:
-                print(f"No task found with ID: {task_id}")
+    def set_series_scope(self, scope: str):
+        """Set which occurrences of a recurring task the next edit or delete applies to."""
+        self.series_scope = scope
 
 class AddUser(rx.State):
     """Class that enables adding users to the database"""
@@ -214,6 +416,424 @@ class AddUser(rx.State):
         """Initializing user's password"""
         self.password = value
 
+def task_in_window(task: Task, start: date, end: date) -> bool:
+    """
+    Checks whether a task is due or has its block assigned between start and end (inclusive).
+    """
+    if start <= task.due_date <= end:
+        return True
+    return task.assigned_block_date is not None and start <= task.assigned_block_date <= end
+
+def fetch_todo_page(user_id: int, sort: str, offset: int, limit: int) -> tuple[List[Task], int]:
+    """
+    Retrieves one page of a user's live tasks for the to-do list, whatever their due date.
+
+    One-off tasks are read in order with ORDER BY + LIMIT, up to the end of the page.
+    Recurring tasks are listed once per occurrence (so edits and deletes get the occurrence
+    the user picked): their rules are expanded with their exceptions applied, series without
+    an end date up to RECURRENCE_HORIZON_DAYS from today, and merged into the one-off tasks.
+
+    Parameters:
+    user_id (int): the user.
+    sort (str): TODO_SORT_DUE orders by due date (served by the partial live-task due date
+        index), TODO_SORT_PRIORITY by priority level (lower is more urgent) and then due date.
+    offset (int): number of tasks before the page.
+    limit (int): number of tasks per page.
+
+    Returns:
+    tuple: (the page of tasks and occurrences, the number of live tasks and occurrences)
+    """
+    columns = TODO_SORT_COLUMNS.get(sort, TODO_SORT_COLUMNS[TODO_SORT_DUE])
+    order = [getattr(Task, column) for column in columns]
+    key = attrgetter(*columns)
+    live = (Task.user_id == user_id, Task.is_deleted.is_(False))
+    with rx.session() as session:
+        one_off = (*live, Task.recur_frequency == 0)
+        total = session.exec(sqlmodel.select(sqlalchemy.func.count()).select_from(Task).where(*one_off)).one()
+        tasks = session.exec(Task.select().where(*one_off).order_by(*order).limit(offset + limit)).all()
+        rules = session.exec(Task.select().where(*live, Task.recur_frequency != 0)).all()
+        occurrences = []
+        if rules:
+            horizon = date.today() + timedelta(days=RECURRENCE_HORIZON_DAYS)
+            exceptions = session.exec(
+                TaskException.select().where(TaskException.task_id.in_([task.id for task in rules]))
+            ).all()
+            occurrences = sorted(expand_tasks(
+                rules,
+                exceptions,
+                min(task.due_date for task in rules),
+                max(task.recur_end_date or max(horizon, task.due_date) for task in rules),
+            ), key=key)
+    page = list(islice(heapq.merge(tasks, occurrences, key=key), offset, offset + limit))
+    return page, total + len(occurrences)
+
+def index_tasks_by_date(tasks: List[Task]) -> tuple[dict, dict]:
+    """
+    Buckets tasks by ISO due date and by ISO assigned block date in a single pass,
+    so calendar views can look up a day's tasks without scanning the whole list.
+    Each day's blocks are sorted by start time.
+
+    Returns:
+    tuple: (tasks keyed by due date, tasks keyed by assigned block date)
+    """
+    by_due_date = {}
+    by_block_date = {}
+    for task in tasks:
+        by_due_date.setdefault(task.due_date.isoformat(), []).append(task)
+        if task.assigned_block_date is not None:
+            by_block_date.setdefault(task.assigned_block_date.isoformat(), []).append(task)
+    for day_blocks in by_block_date.values():
+        day_blocks.sort(key=lambda task: task.assigned_block_start_time or time.min)
+    return by_due_date, by_block_date
+
+def fetch_tasks_between(user_id: int, start: date, end: date) -> List[Task]:
+    """
+    Retrieves a user's live tasks whose due date or assigned block date falls between start and end.
+    Both branches of the OR are served by the partial live-task indexes.
+
+    Recurring tasks whose series overlaps the window are expanded into one virtual Task per
+    occurrence in the window, with that window's exceptions applied.
+    """
+    with rx.session() as session:
+        tasks = session.exec(
+            Task.select().where(
+                Task.user_id == user_id,
+                Task.is_deleted.is_(False),
+                Task.recur_frequency == 0,
+                sqlalchemy.or_(
+                    Task.due_date.between(start, end),
+                    Task.assigned_block_date.between(start, end),
+                ),
+            )
+        ).all()
+        return tasks + fetch_occurrences_between(session, user_id, start, end)
+
+def fetch_occurrences_between(session, user_id: int, start: date, end: date) -> List[Task]:
+    """
+    Expands a user's live recurring tasks whose series overlaps start..end into one virtual
+    Task per occurrence in that range, with the range's exceptions applied.
+    """
+    rules = session.exec(
+        Task.select().where(
+            Task.user_id == user_id,
+            Task.is_deleted.is_(False),
+            Task.recur_frequency != 0,
+            Task.due_date <= end,
+            sqlalchemy.or_(Task.recur_end_date.is_(None), Task.recur_end_date >= start),
+        )
+    ).all()
+    exceptions = []
+    if rules:
+        exceptions = session.exec(
+            TaskException.select().where(
+                TaskException.task_id.in_([task.id for task in rules]),
+                TaskException.occurrence_date.between(start, end),
+            )
+        ).all()
+    return expand_tasks(rules, exceptions, start, end)
+
+def fetch_task_rows(user_id: int, task_ids: List[int]) -> List[Task]:
+    """
+    Retrieves a user's Task rows by id in one query, deleted ones included.
+    """
+    with rx.session() as session:
+        return session.exec(Task.select().where(Task.user_id == user_id, Task.id.in_(task_ids))).all()
+
+def fetch_tasks_by_ids(user_id: int, task_ids: List[int], start: date, end: date) -> tuple[set, List[Task]]:
+    """
+    Re-reads a user's tasks by id for a targeted store update, together with the other rule
+    rows of any recurring series among them (a series edit can split or end several rules).
+
+    Parameters:
+    user_id (int): the user the tasks must belong to.
+    task_ids (list): ids of the changed tasks.
+    start (date): first day of the range kept in the store.
+    end (date): last day of the range kept in the store.
+
+    Returns:
+    tuple: (ids whose stored entries are stale, live tasks and occurrences in start..end)
+    """
+    with rx.session() as session:
+        rows = session.exec(Task.select().where(Task.user_id == user_id, Task.id.in_(task_ids))).all()
+        series_ids = {task.series_id for task in rows if task.series_id is not None}
+        if series_ids:
+            rows += session.exec(
+                Task.select().where(Task.series_id.in_(series_ids), Task.id.not_in(task_ids))
+            ).all()
+        rules = [task for task in rows if task.recur_frequency and not task.is_deleted]
+        exceptions = []
+        if rules:
+            exceptions = session.exec(
+                TaskException.select().where(
+                    TaskException.task_id.in_([task.id for task in rules]),
+                    TaskException.occurrence_date.between(start, end),
+                )
+            ).all()
+    tasks = [
+        task for task in rows
+        if not task.recur_frequency and not task.is_deleted and task_in_window(task, start, end)
+    ]
+    return set(task_ids) | {task.id for task in rows}, tasks + expand_tasks(rules, exceptions, start, end)
+
+def fetch_day_summary(user_id: int, start: date, end: date) -> dict:
+    """
+    Counts a user's live tasks due on each day between start and end, with the most urgent
+    priority of each day.
+
+    One-off tasks are aggregated in the database with GROUP BY due_date (at most one row per
+    day, served by the partial live-task due date index); occurrences of recurring tasks are
+    expanded from their rule rows and folded in.
+
+    Returns:
+    dict: due date -> (number of tasks, lowest priority_level, i.e. the most urgent)
+    """
+    summary = {}
+    with rx.session() as session:
+        rows = session.exec(
+            sqlmodel.select(Task.due_date, sqlalchemy.func.count(), sqlalchemy.func.min(Task.priority_level))
+            .where(
+                Task.user_id == user_id,
+                Task.is_deleted.is_(False),
+                Task.recur_frequency == 0,
+                Task.due_date.between(start, end),
+            )
+            .group_by(Task.due_date)
+        ).all()
+        for due_date, count, priority in rows:
+            summary[due_date] = (count, priority)
+        for task in fetch_occurrences_between(session, user_id, start, end):
+            count, priority = summary.get(task.due_date, (0, task.priority_level))
+            summary[task.due_date] = (count + 1, min(priority, task.priority_level))
+    return summary
+
+def update_series(user_id: int, task_id: int, occurrence_date: str, scope: str, values: dict) -> bool:
+    """
+    Applies field changes to a task, or to some occurrences of a recurring series, in one transaction.
+
+    Each scope is a constant number of set-based statements, however many occurrences it covers:
+    - SCOPE_THIS: upserts a TaskException for the occurrence.
+    - SCOPE_FOLLOWING: ends the rule holding the occurrence the day before it (continuing the
+      rest of that rule as a new rule in the series, unless deleting), then runs one UPDATE over
+      the series' rules from the occurrence on. The new rule keeps the series' day of the
+      month, so a monthly series split at a clamped date (Feb 28 of a series on the 31st)
+      doesn't drift.
+    - SCOPE_ALL: one UPDATE over every rule of the series.
+
+    Parameters:
+    user_id (int): id of the user the task must belong to.
+    task_id (int): id of the task, or of the rule row the occurrence was expanded from.
+    occurrence_date (str): ISO date of the occurrence; ignored for non-recurring tasks.
+    scope (str): one of SERIES_SCOPES.
+    values (dict): Task fields to set: task_name, description, priority_level or is_deleted.
+
+    Returns:
+    bool: False if the user has no such task.
+    """
+    with rx.session() as session:
+        task = session.exec(Task.select().where(Task.id == task_id, Task.user_id == user_id)).first()
+        if task is None:
+            return False
+        table = Task.__table__
+        owned = table.c.user_id == user_id
+        if not task.recur_frequency or task.series_id is None:
+            session.execute(sqlalchemy.update(table).where(table.c.id == task_id, owned).values(**values))
+            session.commit()
+            return True
+
+        occurrence = date.fromisoformat(str(occurrence_date)[:10]) if occurrence_date else task.due_date
+        if scope == SCOPE_THIS:
+            exception = session.exec(
+                TaskException.select().where(
+                    TaskException.task_id == task_id,
+                    TaskException.occurrence_date == occurrence,
+                )
+            ).first() or TaskException(task_id=task_id, occurrence_date=occurrence)
+            for field, value in values.items():
+                setattr(exception, field, value)
+            session.add(exception)
+        elif scope == SCOPE_FOLLOWING:
+            if task.due_date < occurrence:
+                # Split the rule: it keeps the earlier occurrences, a copy continues from occurrence
+                if not values.get("is_deleted"):
+                    continued = Task(**dict(
+                        {name: getattr(task, name) for name in task.__fields__ if name != "id"},
+                        due_date=occurrence,
+                        recur_month_day=task.recur_month_day or task.due_date.day,
+                        assigned_block_date=None,
+                        assigned_block_start_time=None,
+                        assigned_block_duration=None,
+                    ))
+                    session.add(continued)
+                    session.flush()
+                    exceptions = TaskException.__table__
+                    session.execute(
+                        sqlalchemy.update(exceptions)
+                        .where(exceptions.c.task_id == task_id, exceptions.c.occurrence_date >= occurrence)
+                        .values(task_id=continued.id)
+                    )
+                session.execute(
+                    sqlalchemy.update(table).where(table.c.id == task_id)
+                    .values(recur_end_date=occurrence - timedelta(days=1))
+                )
+            session.execute(
+                sqlalchemy.update(table)
+                .where(table.c.series_id == task.series_id, owned, table.c.due_date >= occurrence)
+                .values(**values)
+            )
+            clear_exception_overrides(session, task.series_id, values, since=occurrence)
+        else:
+            session.execute(sqlalchemy.update(table).where(table.c.series_id == task.series_id, owned).values(**values))
+            clear_exception_overrides(session, task.series_id, values)
+        session.commit()
+    return True
+
+def clear_exception_overrides(session, series_id: int, values: dict, since: Optional[date] = None):
+    """
+    Drops per-occurrence overrides of the fields a series-wide edit just set, so the edit shows
+    on every occurrence it covers. One UPDATE over the series' exceptions.
+    """
+    fields = {field: None for field in values if field in EXCEPTION_FIELDS}
+    if not fields:
+        return
+    exceptions = TaskException.__table__
+    series_rules = sqlalchemy.select(Task.__table__.c.id).where(Task.__table__.c.series_id == series_id)
+    condition = exceptions.c.task_id.in_(series_rules)
+    if since is not None:
+        condition = sqlalchemy.and_(condition, exceptions.c.occurrence_date >= since)
+    session.execute(sqlalchemy.update(exceptions).where(condition).values(**fields))
+
+def assign_blocks(user_id: int, blocks: list) -> set:
+    """
+    Writes scheduled blocks onto a user's tasks in one transaction.
+
+    Loads every affected task with a single IN query restricted to the user, so block
+    assignments for unknown tasks or tasks owned by someone else are skipped. Before
+    anything is written, the blocks are checked against the user's other upcoming blocks
+    with a BlockIndex: conflicting, past or overdue blocks are moved to a free slot, or
+    dropped if there is none.
+
+    Parameters:
+    user_id (int): id of the user the tasks must belong to.
+    blocks (list): dictionaries with task_id, assigned_block_date, assigned_block_start_time
+        and assigned_block_duration.
+
+    Returns:
+    set: ids of the tasks that were updated.
+    """
+    blocks_by_id = {block["task_id"]: block for block in blocks}
+    if not blocks_by_id:
+        return set()
+    now = datetime.now()
+    with rx.session() as session:
+        tasks = session.exec(
+            Task.select().where(Task.user_id == user_id, Task.id.in_(blocks_by_id))
+        ).all()
+        others = session.exec(
+            Task.select().where(
+                Task.user_id == user_id,
+                Task.is_deleted.is_(False),
+                Task.assigned_block_date >= now.date(),
+                Task.id.not_in(blocks_by_id),
+            )
+        ).all()
+        valid_blocks, _, _ = validate_blocks(
+            BlockIndex.from_tasks(others),
+            [blocks_by_id[task.id] for task in tasks],
+            {task.id: task.due_date for task in tasks},
+            now,
+        )
+        blocks_by_id = {block["task_id"]: block for block in valid_blocks}
+        tasks = [task for task in tasks if task.id in blocks_by_id]
+        for task in tasks:
+            block = blocks_by_id[task.id]
+            task.assigned_block_date = block["assigned_block_date"]
+            task.assigned_block_start_time = block["assigned_block_start_time"]
+            task.assigned_block_duration = block["assigned_block_duration"]
+            task.block_inputs = block_inputs(task)
+            session.add(task)
+        session.commit()
+        applied = {task.id for task in tasks}
+    return applied
+
+def fetch_scheduled_tasks(user_id: int, since: date) -> List[Task]:
+    """
+    Retrieves a user's live tasks with a block assigned on or after since, across all dates
+    (not just the visible window). Served by the partial live-task block date index.
+    """
+    with rx.session() as session:
+        return session.exec(
+            Task.select().where(
+                Task.user_id == user_id,
+                Task.is_deleted.is_(False),
+                Task.assigned_block_date >= since,
+            )
+        ).all()
+
+def fetch_user_ids_after(last_id: int, limit: int) -> List[int]:
+    """
+    Retrieves the next page of user ids after last_id (keyset pagination over the primary key).
+    """
+    with rx.session() as session:
+        return session.exec(
+            sqlmodel.select(User.id).where(User.id > last_id).order_by(User.id).limit(limit)
+        ).all()
+
+def fetch_schedulable_tasks(user_ids: List[int], since: date) -> List[Task]:
+    """
+    Retrieves the live, non-recurring tasks due on or after since for a batch of users in one query.
+    """
+    with rx.session() as session:
+        return session.exec(
+            Task.select().where(
+                Task.user_id.in_(user_ids),
+                Task.is_deleted.is_(False),
+                Task.recur_frequency == 0,
+                Task.due_date >= since,
+            )
+        ).all()
+
+def write_blocks(blocks: list) -> int:
+    """
+    Writes scheduled blocks for many users with one executemany UPDATE in one transaction.
+    The blocks are written as given: callers check them with validate_blocks first, as
+    batch_schedule.schedule_user does.
+
+    Parameters:
+    blocks (list): dictionaries with user_id, task_id, assigned_block_date,
+        assigned_block_start_time, assigned_block_duration and block_inputs (the task's
+        scheduler.block_inputs). A block only updates its task if the task belongs to user_id.
+
+    Returns:
+    int: number of blocks written.
+    """
+    if not blocks:
+        return 0
+    table = Task.__table__
+    statement = (
+        sqlalchemy.update(table)
+        .where(table.c.id == sqlalchemy.bindparam("b_task_id"), table.c.user_id == sqlalchemy.bindparam("b_user_id"))
+        .values(
+            assigned_block_date=sqlalchemy.bindparam("b_date"),
+            assigned_block_start_time=sqlalchemy.bindparam("b_start"),
+            assigned_block_duration=sqlalchemy.bindparam("b_duration"),
+            block_inputs=sqlalchemy.bindparam("b_inputs"),
+        )
+    )
+    with rx.session() as session:
+        session.execute(statement, [
+            {
+                "b_task_id": block["task_id"],
+                "b_user_id": block["user_id"],
+                "b_date": block["assigned_block_date"],
+                "b_start": block["assigned_block_start_time"],
+                "b_duration": block["assigned_block_duration"],
+                "b_inputs": block["block_inputs"],
+            }
+            for block in blocks
+        ])
+        session.commit()
+    return len(blocks)
+
 def create_user(username:str, canvas_hash_id:int, password:str):
     """
     Function that creates a User function and calls add_user function with that User object.
@@ -0,0 +1,71 @@
+"""Bookkeeping for long-running background jobs (Canvas syncs, schedule generation).
+
+Reflex background tasks run outside the per-user state lock, so nothing stops the same
+user from starting the same job twice. JOBS records which (job kind, user id) keys are
+in flight for the whole server process so duplicates can be refused, and lets another
+event handler ask a running job to stop.
+"""
+import threading
+
+
+class JobRegistry:
+    """
+    Thread-safe registry of in-flight job keys.
+
+    Attributes:
+    _running (dict): key -> cancel Event for each job currently running.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = {}
+
+    def claim(self, key):
+        """
+        Marks a job as running unless it already is.
+
+        Parameters:
+        key (tuple): identifies the job, e.g. ("canvas_sync", user_id).
+
+        Returns:
+        bool: True if the caller now owns the job, False if it was already running.
+        """
+        with self._lock:
+            if key in self._running:
+                return False
+            self._running[key] = threading.Event()
+            return True
+
+    def release(self, key):
+        """Marks a job as finished."""
+        with self._lock:
+            self._running.pop(key, None)
+
+    def is_running(self, key):
+        """Returns whether a job is currently running."""
+        with self._lock:
+            return key in self._running
+
+    def cancel(self, key):
+        """
+        Asks a running job to stop; the job checks is_cancelled() between steps.
+
+        Returns:
+        bool: True if the job was running.
+        """
+        with self._lock:
+            event = self._running.get(key)
+        if event is None:
+            return False
+        event.set()
+        return True
+
+    def is_cancelled(self, key):
+        """Returns whether a running job has been asked to stop."""
+        with self._lock:
+            event = self._running.get(key)
+        return event is not None and event.is_set()
+
+
+# Shared by every state in the process
+JOBS = JobRegistry()
@@ -0,0 +1,104 @@
+"""Lazy expansion of recurring tasks.
+
+A recurring task is stored as one Task row, the rule: its due_date is the first occurrence,
+recur_frequency says how it repeats (1 daily, 7 weekly, 30 monthly) and recur_end_date
+bounds the series; recur_month_day keeps a monthly series on its original day when it is
+split at a clamped date (e.g. the 28th of February of a series on the 31st). Occurrences are generated on demand for the window a view asks for,
+using RecurFrequency.occurrences_between, so a series costs one row however far it
+reaches. Occurrences that differ from the rule (deleted, done or edited) are stored as
+sparse TaskException rows and applied on top of the generated occurrences.
+"""
+from AIPlanner.classes.RecurFrequency import RecurFrequency
+
+# recur_frequency values stored on Task -> RecurFrequency frequencies
+FREQUENCIES = {1: RecurFrequency.DAILY, 7: RecurFrequency.WEEKLY, 30: RecurFrequency.MONTHLY}
+RECURRENCE_HORIZON_DAYS = 90  # Default length of a new series
+EXCEPTION_FIELDS = ("task_name", "description", "priority_level")
+
+
+def rule_for(task):
+    """
+    Builds the RecurFrequency of a recurring Task row.
+
+    Returns:
+    RecurFrequency: the rule, or None if the task doesn't recur.
+    """
+    frequency = FREQUENCIES.get(task.recur_frequency)
+    if frequency is None:
+        return None
+    days_of_week = [task.due_date.weekday()] if frequency == RecurFrequency.WEEKLY else None
+    return RecurFrequency(
+        frequency,
+        end_date=task.recur_end_date,
+        days_of_week=days_of_week,
+        day_of_month=task.recur_month_day if frequency == RecurFrequency.MONTHLY else None,
+    )
+
+
+def iter_occurrences(task, start, end):
+    """
+    Generates the occurrence dates of a recurring task between start and end (inclusive).
+
+    Parameters:
+    task (Task): the rule row; its due date is the first occurrence.
+    start (date): first day of the window.
+    end (date): last day of the window.
+
+    Yields:
+    date: each occurrence in the window, in order.
+    """
+    rule = rule_for(task)
+    if rule is None:
+        if start <= task.due_date <= end:
+            yield task.due_date
+        return
+    yield from rule.occurrences_between(start, end, anchor=task.due_date)
+
+
+def occurrence_task(task, occurrence, exception=None):
+    """
+    Builds the virtual Task for one occurrence: a copy of the rule with the occurrence's due
+    date and the exception's overrides. The copy keeps the rule's id and is never saved.
+
+    Returns:
+    Task: the occurrence, or None if the exception marks it deleted or done.
+    """
+    if exception is not None and (exception.is_deleted or exception.is_done):
+        return None
+    # Columns only: Model.dict() also follows the user relationship, which loops (task ->
+    # user -> tasks -> ...) while the rule is still attached to its session
+    values = {name: getattr(task, name) for name in task.__fields__}
+    values["due_date"] = occurrence
+    if occurrence != task.due_date:
+        # Blocks are assigned to the rule row, i.e. to its first occurrence
+        values["assigned_block_date"] = None
+        values["assigned_block_start_time"] = None
+        values["assigned_block_duration"] = None
+    if exception is not None:
+        for field in EXCEPTION_FIELDS:
+            if getattr(exception, field) is not None:
+                values[field] = getattr(exception, field)
+    return type(task)(**values)
+
+
+def expand_tasks(rules, exceptions, start, end):
+    """
+    Expands recurring tasks into their occurrences between start and end.
+
+    Parameters:
+    rules (list): recurring Task rows.
+    exceptions (list): TaskException rows of those tasks.
+    start (date): first day of the window.
+    end (date): last day of the window.
+
+    Returns:
+    list: virtual Tasks, one per occurrence that isn't deleted or done.
+    """
+    by_occurrence = {(exception.task_id, exception.occurrence_date): exception for exception in exceptions}
+    expanded = []
+    for task in rules:
+        for occurrence in iter_occurrences(task, start, end):
+            virtual = occurrence_task(task, occurrence, by_occurrence.get((task.id, occurrence)))
+            if virtual is not None:
+                expanded.append(virtual)
+    return expanded
@@ -0,0 +1,187 @@
+"""On-disk cache of AI schedules, keyed by a fingerprint of the task set.
+
+Generating the same schedule twice (same tasks, same day) costs two identical model calls.
+ScheduleCache stores the accepted assignments of each generation in a small SQLite file
+(stdlib sqlite3, separate from the app database) so a repeat click is answered instantly.
+Entries expire after a TTL, and the least recently used entries are evicted once the cache
+holds max_entries. Cached assignments are re-validated against the current time before
+they are reused, so a schedule whose blocks are now in the past counts as a miss.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from AIPlanner.classes.ai_schedule import MODEL, validate_entry
+
+CACHE_PATH_ENV = "AIPLANNER_SCHEDULE_CACHE"
+DEFAULT_CACHE_PATH = "schedule_cache.db"
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_ENTRIES = 256
+
+
+def fingerprint(tasks, now, busy=()):
+    """
+    Builds the cache key for a scheduling request.
+
+    Parameters:
+    tasks (list): task dictionaries being scheduled.
+    now (datetime): the current time; only its date goes into the key.
+    busy (list, optional): (start, end) datetimes of blocks the schedule had to avoid.
+
+    Returns:
+    str: hex digest over the model, today's date, the normalized (id, name, priority, due date)
+        rows and the busy blocks.
+    """
+    rows = sorted(
+        (task['id'], str(task['task_name']).strip(), int(task['priority_level']), str(task['due_date'])[:10])
+        for task in tasks
+    )
+    blocks = sorted((start.isoformat(), end.isoformat()) for start, end in busy)
+    payload = json.dumps([MODEL, now.date().isoformat(), rows, blocks], separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def assignment_entry(assignment):
+    """Converts a BlockAssignment into the JSON entry format the model returns."""
+    return {
+        "task_id": assignment.task_id,
+        "assigned_block_date": assignment.assigned_block_date.isoformat(),
+        "assigned_block_start_time": assignment.assigned_block_start_time.strftime("%H:%M"),
+        "assigned_block_duration": assignment.assigned_block_duration,
+    }
+
+
+class ScheduleCache:
+    """
+    Bounded SQLite cache of accepted schedules with TTL and LRU eviction.
+
+    Attributes:
+    path (str): SQLite file holding the cache.
+    ttl (float): seconds an entry stays valid.
+    max_entries (int): entries kept before the least recently used are evicted.
+    hits (int): lookups answered from the cache.
+    misses (int): lookups that needed a model call.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or os.environ.get(CACHE_PATH_ENV, DEFAULT_CACHE_PATH)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._created = False
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call keeps the cache usable from worker threads
+        connection = sqlite3.connect(self.path, timeout=5)
+        try:
+            if not self._created:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS schedule_cache ("
+                    "key TEXT PRIMARY KEY, assignments TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS ix_schedule_cache_last_used ON schedule_cache (last_used)")
+                self._created = True
+            yield connection
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, tasks, now=None, busy=()):
+        """
+        Looks up the schedule for a task set.
+
+        Parameters:
+        tasks (list): task dictionaries being scheduled.
+        now (datetime, optional): the current time. Defaults to datetime.now().
+        busy (list, optional): (start, end) datetimes of blocks the schedule has to avoid.
+
+        Returns:
+        list: cached BlockAssignments, or None on a miss (absent, expired or no longer valid).
+        """
+        now = now or datetime.now()
+        key = fingerprint(tasks, now, busy)
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT assignments, created_at FROM schedule_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count(hit=False)
+                return None
+
+            tasks_by_id = {task['id']: task for task in tasks}
+            assignments = []
+            for entry in json.loads(row[0]):
+                _, assignment, _ = validate_entry(entry, tasks_by_id, now)
+                if assignment is None:
+                    break
+                assignments.append(assignment)
+            else:
+                if time.time() - row[1] <= self.ttl:
+                    connection.execute("UPDATE schedule_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._count(hit=True)
+                    return assignments
+
+            # Expired, or a block now lies in the past: drop it
+            connection.execute("DELETE FROM schedule_cache WHERE key = ?", (key,))
+        self._count(hit=False)
+        return None
+
+    def put(self, tasks, assignments, now=None, busy=()):
+        """
+        Stores the accepted assignments for a task set, evicting the least recently used
+        entries beyond max_entries.
+
+        Parameters:
+        tasks (list): task dictionaries that were scheduled.
+        assignments (list): accepted BlockAssignments.
+        now (datetime, optional): the current time. Defaults to datetime.now().
+        busy (list, optional): (start, end) datetimes of blocks the schedule had to avoid.
+        """
+        now = now or datetime.now()
+        stamp = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO schedule_cache (key, assignments, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (fingerprint(tasks, now, busy), json.dumps([assignment_entry(a) for a in assignments]), stamp, stamp),
+            )
+            connection.execute("DELETE FROM schedule_cache WHERE created_at < ?", (stamp - self.ttl,))
+            connection.execute(
+                "DELETE FROM schedule_cache WHERE key IN ("
+                "SELECT key FROM schedule_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        """
+        Returns:
+        dict: hits, misses, hit_rate and the number of stored entries.
+        """
+        with self._connect() as connection:
+            entries = connection.execute("SELECT COUNT(*) FROM schedule_cache").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+            }
+
+
+# Shared by every state in the process
+SCHEDULE_CACHE = ScheduleCache()
@@ -0,0 +1,121 @@
+"""Compact, token-budgeted prompts for AI scheduling.
+
+Tasks are sent as a pipe-separated table with short ids (1, 2, 3... instead of database ids)
+and truncated names, which takes a fraction of the tokens of a "key = value" block per task.
+Backlogs whose table would exceed the token budget are split into due-date-range chunks;
+each chunk is scheduled by its own request (in parallel) inside its own range of days, so
+the results merge without overlapping.
+
+Token counts use tiktoken when it is installed and its encoding can be loaded, and fall back
+to the ~4 characters per token rule of thumb otherwise.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import groupby
+
+try:
+    import tiktoken
+except ImportError:  # Optional: only makes the counts exact
+    tiktoken = None
+
+MAX_NAME_CHARS = 40
+DEFAULT_TOKEN_BUDGET = 1500  # Task table tokens per request
+TABLE_HEADER = "id|priority|due|name"
+
+
+@lru_cache(maxsize=1)
+def token_encoding():
+    """
+    Loads the encoding once per process. tiktoken downloads it on first use, so it can't be
+    loaded offline without a cached copy; requests' errors are OSErrors.
+
+    Returns:
+    tiktoken.Encoding: the gpt-4o family encoding, or None if tiktoken is missing or the
+        encoding can't be loaded.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except (OSError, ValueError) as error:  # Offline, unreadable cache or corrupt download
+        print(f"Could not load the tiktoken encoding, estimating token counts: {error!r}")
+        return None
+
+
+def count_tokens(text):
+    """
+    Returns:
+    int: number of prompt tokens in text (exact with tiktoken, estimated without it).
+    """
+    encoding = token_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+def due_day(task):
+    """Returns a task dictionary's due date as a date."""
+    return date.fromisoformat(str(task['due_date'])[:10])
+
+
+def table_row(short_id, task):
+    """Formats one task as a table row: short id, priority, due date and a trimmed name."""
+    name = " ".join(str(task['task_name']).replace("|", "/").split())
+    if len(name) > MAX_NAME_CHARS:
+        name = name[:MAX_NAME_CHARS - 1] + "…"
+    return f"{short_id}|{task['priority_level']}|{due_day(task).isoformat()}|{name}"
+
+
+def task_table(rows):
+    """
+    Parameters:
+    rows (list): (short id, task dictionary) pairs.
+
+    Returns:
+    str: the task table, header first.
+    """
+    return "\n".join([TABLE_HEADER] + [table_row(short_id, task) for short_id, task in rows])
+
+
+def plan_chunks(tasks, today, token_budget=DEFAULT_TOKEN_BUDGET):
+    """
+    Splits tasks into due-date-range chunks whose task tables fit the token budget.
+
+    Tasks due on the same day stay together unless that day alone exceeds the budget. Each
+    chunk gets the days after the previous chunk's last due date up to its own last due date,
+    so chunks scheduled in parallel never compete for the same day.
+
+    Parameters:
+    tasks (list): task dictionaries to schedule.
+    today (date): first day any block can be on.
+    token_budget (int): maximum task table tokens per chunk.
+
+    Returns:
+    list: (task dictionaries, (first day, last day)) per chunk, in due date order. A single
+        chunk has no day range (None).
+    """
+    header_tokens = count_tokens(TABLE_HEADER)
+    chunks = []
+    current, current_tokens = [], header_tokens
+    for _, same_day in groupby(sorted(tasks, key=due_day), key=due_day):
+        for task in same_day:
+            tokens = count_tokens(table_row(len(current) + 1, task)) + 1
+            if current and current_tokens + tokens > token_budget:
+                chunks.append(current)
+                current, current_tokens = [], header_tokens
+            current.append(task)
+            current_tokens += tokens
+    if current:
+        chunks.append(current)
+    if len(chunks) <= 1:
+        return [(chunk, None) for chunk in chunks]
+
+    planned = []
+    first_day = today
+    for index, chunk in enumerate(chunks):
+        last_day = max(due_day(chunk[-1]), first_day)
+        planned.append((chunk, (first_day, last_day)))
+        # A due date split over two chunks shares that day; overlaps there are rejected on merge
+        split_day = index + 1 < len(chunks) and due_day(chunks[index + 1][0]) == due_day(chunk[-1])
+        first_day = last_day if split_day else last_day + timedelta(days=1)
+    return planned
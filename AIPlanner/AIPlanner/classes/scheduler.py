@@ -0,0 +1,230 @@
+"""Local, deterministic scheduling engine: an offline alternative to the OpenAI round trip.
+
+Follows the same rules as the prompt in AIState.send_request: tasks with a higher
+priority (1 is the highest, 3 the lowest) get blocks before lower priority ones, blocks
+fall between 09:00 and 17:00, only after the current time, and before the task's due
+date. Hundreds of tasks are scheduled in milliseconds with no network.
+
+Tasks are taken from a heap ordered by (priority_level, due_date, id). Each gets the
+earliest free one-hour slot that ends before its due date. Free slots are found with a
+"next free slot" union-find over the slot indices, so every lookup is near O(1) no
+matter how many slots are already taken.
+
+For incremental rescheduling, split_incremental keeps the blocks that are still valid and
+returns them as busy intervals, so only new, edited or missed tasks are scheduled around them.
+A block is written with its task's block_inputs (priority, due date and name), so a task
+whose priority, due date or name was edited since is scheduled again.
+"""
+import heapq
+from datetime import date, datetime, time, timedelta
+
+WORK_DAY_START = 9   # 09:00
+WORK_DAY_END = 17    # 17:00
+BLOCK_DURATION = timedelta(hours=1)
+SLOTS_PER_DAY = WORK_DAY_END - WORK_DAY_START
+
+
+def as_date(value):
+    """Accepts a date, a datetime or an ISO date string (as tasks arrive from the frontend)."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def task_value(task, key):
+    """Reads a field from a Task object or a task dictionary."""
+    return task[key] if isinstance(task, dict) else getattr(task, key)
+
+
+def block_inputs(task):
+    """
+    Returns:
+    str: the task's fields the schedulers place it by (priority, due date and name), stored
+        on the task with its block, e.g. "1|2025-03-07|Lab report".
+    """
+    name = " ".join(str(task_value(task, 'task_name')).split())
+    return f"{task_value(task, 'priority_level')}|{as_date(task_value(task, 'due_date')).isoformat()}|{name}"
+
+
+class SlotFinder:
+    """
+    Hands out free one-hour slots between WORK_DAY_START and WORK_DAY_END.
+
+    Slot i starts on day (first_day + i // SLOTS_PER_DAY) at hour
+    (WORK_DAY_START + i % SLOTS_PER_DAY). _next_free[i] points at the next slot that may be
+    free; following it (with path compression) finds the first free slot at or after i.
+
+    Attributes:
+    first_day (date): day of slot 0.
+    first_slot (int): first slot that starts at or after the current time.
+    """
+
+    def __init__(self, now, last_day):
+        self.first_day = now.date()
+        slots_today = max(0, min(SLOTS_PER_DAY, WORK_DAY_END - now.hour - (1 if now.minute or now.second else 0)))
+        self.first_slot = SLOTS_PER_DAY - slots_today
+        days = max(1, (last_day - self.first_day).days + 1)
+        self._size = days * SLOTS_PER_DAY
+        # One extra sentinel slot meaning "nothing free"
+        self._next_free = list(range(self._size + 1))
+
+    def find(self, slot):
+        """
+        Returns:
+        int: the first free slot at or after slot (or the sentinel if none is left).
+        """
+        root = slot
+        while self._next_free[root] != root:
+            root = self._next_free[root]
+        while self._next_free[slot] != root:
+            self._next_free[slot], slot = root, self._next_free[slot]
+        return root
+
+    def take(self, slot):
+        """Marks a slot as taken."""
+        self._next_free[slot] = slot + 1
+
+    def take_interval(self, start, end):
+        """Marks every slot overlapping [start, end) as taken."""
+        first = (start.date() - self.first_day).days * SLOTS_PER_DAY + start.hour - WORK_DAY_START
+        for slot in range(max(0, first), self._size):
+            slot_start = self.slot_start(slot)
+            if slot_start >= end:
+                break
+            if slot_start + BLOCK_DURATION > start:
+                self.take(slot)
+
+    def last_slot_before(self, day):
+        """
+        Returns:
+        int: index of the last slot that ends on or before the end of day (-1 if none).
+        """
+        return min(self._size, ((day - self.first_day).days + 1) * SLOTS_PER_DAY) - 1
+
+    def slot_start(self, slot):
+        """
+        Returns:
+        datetime: when the slot starts.
+        """
+        day = self.first_day + timedelta(days=slot // SLOTS_PER_DAY)
+        return datetime.combine(day, time(WORK_DAY_START + slot % SLOTS_PER_DAY))
+
+
+def schedule_tasks(tasks, now=None, busy=()):
+    """
+    Assigns every task a one-hour block before its due date, highest priority first.
+
+    Parameters:
+    tasks (list): Task objects or task dictionaries with id, priority_level and due_date.
+    now (datetime, optional): schedule only after this time. Defaults to the current time.
+    busy (list, optional): (start, end) datetimes of blocks already taken.
+
+    Returns:
+    list: one dictionary per scheduled task with task_id, assigned_block_date,
+        assigned_block_start_time and assigned_block_duration. Tasks with no free slot
+        before their due date are left out.
+    """
+    now = now or datetime.now()
+    heap = [
+        (task_value(task, 'priority_level'), as_date(task_value(task, 'due_date')), task_value(task, 'id'))
+        for task in tasks
+    ]
+    if not heap:
+        return []
+    heapq.heapify(heap)
+
+    slots = SlotFinder(now, max(due_date for _, due_date, _ in heap))
+    for start, end in busy:
+        slots.take_interval(start, end)
+    assignments = []
+    while heap:
+        _, due_date, task_id = heapq.heappop(heap)
+        # Prefer a block on a day before the due date, fall back to the due date itself
+        latest = slots.last_slot_before(due_date - timedelta(days=1))
+        slot = slots.find(slots.first_slot)
+        if slot > latest:
+            latest = slots.last_slot_before(due_date)
+        if slot > latest:
+            print(f"No free block before the due date of task {task_id}")
+            continue
+
+        slots.take(slot)
+        start = slots.slot_start(slot)
+        assignments.append({
+            "task_id": task_id,
+            "assigned_block_date": start.date(),
+            "assigned_block_start_time": start.time(),
+            "assigned_block_duration": BLOCK_DURATION,
+        })
+    return assignments
+
+
+def block_interval(task):
+    """
+    Returns:
+    tuple: (start, end) datetimes of a Task's assigned block, or None if it has no block.
+    """
+    if task.assigned_block_date is None or task.assigned_block_start_time is None:
+        return None
+    start = datetime.combine(task.assigned_block_date, task.assigned_block_start_time)
+    return start, start + (task.assigned_block_duration or BLOCK_DURATION)
+
+
+def block_still_valid(start, end, due_date, now):
+    """Returns whether a block is in the future, inside working hours and on or before the due date."""
+    return (
+        start >= now
+        and start.date() <= due_date
+        and start.time() >= time(WORK_DAY_START)
+        and end <= datetime.combine(start.date(), time(WORK_DAY_END))
+    )
+
+
+def split_incremental(tasks, scheduled, now=None):
+    """
+    Decides which tasks need scheduling in incremental mode.
+
+    A task keeps its block if the block is still valid for its current due date, the task's
+    block_inputs haven't changed since the block was written and it doesn't overlap a block
+    kept before it. Tasks without a block, with an edited priority, due date or name, or whose
+    block has already passed are scheduled again. Blocks written before block_inputs was
+    recorded (None) are only checked against the due date.
+
+    Parameters:
+    tasks (list): task dictionaries being scheduled.
+    scheduled (list): the user's Task rows that have a block (as stored in the database).
+    now (datetime, optional): the current time. Defaults to datetime.now().
+
+    Returns:
+    tuple: (task dictionaries to schedule, sorted list of (start, end) busy intervals)
+    """
+    now = now or datetime.now()
+    busy = []
+    kept_ids = set()
+    for task in sorted(scheduled, key=lambda task: block_interval(task) or (now, now)):
+        interval = block_interval(task)
+        if interval is None or not block_still_valid(*interval, task.due_date, now):
+            continue
+        if task.block_inputs is not None and task.block_inputs != block_inputs(task):
+            continue  # Edited since it was scheduled
+        if busy and busy[-1][1] > interval[0]:
+            continue  # Overlaps the previous kept block
+        busy.append(interval)
+        kept_ids.add(task.id)
+    pending = [task for task in tasks if task_value(task, 'id') not in kept_ids]
+    return pending, busy
+
+
+def format_busy(busy):
+    """
+    Formats busy intervals compactly for a prompt, one line per day.
+
+    Returns:
+    str: e.g. "2024-12-03: 09:00-10:30, 13:00-14:00"
+    """
+    days = {}
+    for start, end in busy:
+        days.setdefault(start.date().isoformat(), []).append(f"{start:%H:%M}-{end:%H:%M}")
+    return "\n".join(f"{day}: {', '.join(blocks)}" for day, blocks in sorted(days.items()))
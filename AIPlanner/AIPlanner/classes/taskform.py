@@ -1,6 +1,8 @@
 import random
 from datetime import timedelta, datetime
 from AIPlanner.classes.database import *
+from AIPlanner.classes.recurrence import RECURRENCE_HORIZON_DAYS
+from AIPlanner.classes.todo_state import TodoState
 import reflex as rx
 from AIPlanner.pages.login import LoginState
 
@@ -38,7 +40,7 @@ class TaskState(LoginState):
         None
 
         Returns:
-        None: A new task is added to the database, and the fields are reset upon successful completion.
+        EventSpec: Adds the new task to the shown tasks; the fields are reset upon successful completion.
         """
         if not self.task_name.strip():
             self.show_error = True
@@ -57,45 +59,30 @@ class TaskState(LoginState):
             elif self.frequency == "Weekly":
                 recur_frequency = 7
             elif self.frequency == "Monthly":
-                recur_frequency = 30
+                recur_frequency = 30  # Same day each month, see recurrence.py
             else:
                 recur_frequency = 0
 
-            tasks_to_create = []
-            if recur_frequency > 0:  # Recurring task logic
-                current_due_date = due_date
-                while current_due_date <= (due_date + timedelta(days=90)):  # Ensure task is within the 90-day limit
-                    new_task = Task(
-                        recur_frequency=recur_frequency,
-                        due_date=current_due_date,
-                        is_deleted=False,
-                        task_name=self.task_name,
-                        description=self.task_description,
-                        task_id=random.randint(1, 1000000),  # Consider using UUID for unique task IDs
-                        priority_level={"Low": 1, "Medium": 2, "High": 3}[self.priority],
-                        user_id=self.user_id,
-                        stop_date=current_due_date + timedelta(days=90),  # Set stop date 90 days after due date
-                    )
-                    tasks_to_create.append(new_task)
-                    # Increment the due date by the recurrence frequency
-                    current_due_date += timedelta(days=recur_frequency)
-            else:  # Single non-recurring task
-                new_task = Task(
-                    recur_frequency=recur_frequency,
-                    due_date=due_date,
-                    is_deleted=False,
-                    task_name=self.task_name,
-                    description=self.task_description,
-                    task_id=random.randint(1, 1000000),
-                    priority_level={"Low": 1, "Medium": 2, "High": 3}[self.priority],
-                    user_id=self.user_id,
-                    stop_date=due_date + timedelta(days=90),  # Set stop date 90 days after the due date
-                )
-                tasks_to_create.append(new_task)
+            # A recurring task is stored once, as its rule; occurrences are expanded when displayed
+            new_task = Task(
+                recur_frequency=recur_frequency,
+                due_date=due_date,
+                recur_end_date=due_date + timedelta(days=RECURRENCE_HORIZON_DAYS) if recur_frequency > 0 else None,
+                is_deleted=False,
+                task_name=self.task_name,
+                description=self.task_description,
+                task_id=random.randint(1, 1000000),  # Consider using UUID for unique task IDs
+                priority_level={"Low": 1, "Medium": 2, "High": 3}[self.priority],
+                user_id=self.user_id,
+            )
 
             with rx.session() as session:
-                session.add_all(tasks_to_create)
+                session.add(new_task)
+                if recur_frequency > 0:
+                    session.flush()  # Assigns the id, which also identifies the series
+                    new_task.series_id = new_task.id
                 session.commit()  # Save to the database
+                task_id = new_task.id
 
             print(f"Task applied: {self.task_name, self.task_description, self.priority, due_date}")
 
@@ -106,6 +93,8 @@ class TaskState(LoginState):
             self.date_time = datetime.now().strftime("%m/%d/%y")
             self.recurring_checked = False
             self.frequency = ""
+            # Add just the new task to the calendar and to-do list instead of reloading them
+            return [UserManagementState.refresh_tasks([task_id]), TodoState.patch_todo_rows([task_id])]
 
     def toggle_full_task_input(self):
         """
@@ -342,7 +331,7 @@ def task_input_form():
                     ),
                 ),
                 # Apply task button
-                rx.button("Apply Task", on_click=[TaskState.apply_task,UserManagementState.get_user_tasks(LoginState.user_id)], flex=1),
+                rx.button("Apply Task", on_click=TaskState.apply_task, flex=1),
                 spacing="0",
             ),
             rx.cond(
@@ -1,108 +1,177 @@
 import reflex as rx
-from AIPlanner.classes.database import UserManagementState
+from AIPlanner.classes.todo_state import TodoState
 from AIPlanner.pages.login import LoginState
-from AIPlanner.classes.database import Task
+from AIPlanner.classes.database import Task, SCOPE_THIS, SCOPE_FOLLOWING, SCOPE_ALL, SERIES_SCOPES, TODO_SORTS
 
-def todo_component(state=UserManagementState) -> rx.Component:
+def series_scope_select(state, task) -> rx.Component:
     '''
-    Creates a "Todos" component displaying an ordered list of tasks.
+    Creates a dropdown choosing which occurrences of a recurring task an edit applies to.
 
     Returns:
-    Prints heading and user tasks in a stack
+    The dropdown for recurring tasks, nothing for one-off tasks
     '''
-    return rx.vstack(
-        rx.hstack(
-            rx.heading("To Do"),
-            rx.button(rx.icon("refresh-ccw")
-                      ,on_click = UserManagementState.get_user_tasks(LoginState.user_id)),
+    return rx.cond(
+        task.recur_frequency != 0,
+        rx.select(
+            SERIES_SCOPES,
+            value=state.series_scope,
+            on_change=state.set_series_scope,
+            width="170px",
         ),
-        rx.divider(),
-        rx.foreach(
-            state.tasks,
-            lambda task: rx.hstack(
-                rx.vstack(
-                    f"{task.task_name}, Due: {task.due_date}",
-                    f" Description: {task.description}",
-                    style={
-                                "color": 
-                                Task.get_priority_color(task),
-                                "wordWrap": "break-word",  # Enable wrapping of long descriptions
-                                "maxWidth": "400px",
-                            },
+    )
+
+def todo_row(state, task) -> rx.Component:
+    '''
+    Creates one row of the to-do list: the task, its edit inputs and its menu.
+
+    Returns:
+    The row, which the browser skips laying out while it is scrolled out of view
+    '''
+    return rx.hstack(
+        rx.vstack(
+            f"{task.task_name}, Due: {task.due_date}",
+            f" Description: {task.description}",
+            style={
+                        "color": 
+                        Task.get_priority_color(task),
+                        "wordWrap": "break-word",  # Enable wrapping of long descriptions
+                        "maxWidth": "400px",
+                    },
+        ),
+        # Task Names Editing
+        rx.cond(
+            (state.editing_task_id_name == task.id) & (state.editing_occurrence == task.due_date),
+            rx.hstack(
+                rx.input(
+                    value=state.new_task_name,  # Shows the current task name
+                    on_change=lambda value: state.set_new_task_name(value),
+                    width="200px",
                 ),
-                # Task Names Editing
-                rx.cond(
-                    state.editing_task_id_name == task.id,
-                    rx.hstack(
-                        rx.input(
-                            value=state.new_task_name,  # Shows the current task name
-                            on_change=lambda value: state.set_new_task_name(value),
-                            width="200px",
-                        ),
-                        rx.button(
-                            "Apply",
+                series_scope_select(state, task),
+                rx.button(
+                    "Apply",
+                    on_click=lambda: [
+                        state.edit_task_name(task.id, state.new_task_name, task.due_date, state.series_scope),
+                        state.set_editing_task_id_name(None),  # Close the input box
+                    ],
+                ),
+                rx.button(
+                    "X",
+                    on_click=lambda: state.set_editing_task_id_name(None),  # Revert to menu
+                    color="white",
+                ),
+            ),
+            # Task Description Editing
+            rx.cond(
+                (state.editing_task_id_description == task.id) & (state.editing_occurrence == task.due_date),
+                rx.hstack(
+                    rx.input(
+                        value=state.new_task_description,  # Shows the current description
+                        on_change=lambda value: state.set_new_task_description(value),
+                        width="300px",
+                    ),
+                    series_scope_select(state, task),
+                    rx.button(
+                        "Apply",
+                        on_click=lambda: [
+                            state.edit_task_description(task.id, state.new_task_description, task.due_date, state.series_scope),
+                            state.set_editing_task_id_description(None),  # Close the input box
+                        ],
+                    ),
+                    rx.button(
+                        "X",
+                        on_click=lambda: state.set_editing_task_id_description(None),  # Revert to menu
+                        color="white",
+                    ),
+                ),
+                rx.menu.root(
+                    rx.menu.trigger(
+                        rx.button("⋮", variant="soft")  # Three vertical dots button
+                    ),
+                    rx.menu.content(
+                        rx.menu.item(
+                            "Edit Name",
                             on_click=lambda: [
-                                state.edit_task_name(task.id, state.new_task_name),
-                                state.set_editing_task_id_name(None),  # Close the input box
+                                state.set_editing_task_id_name(task.id, task.due_date),
+                                state.set_new_task_name(task.task_name),  # Pre-fill with current name
                             ],
                         ),
-                        rx.button(
-                            "X",
-                            on_click=lambda: state.set_editing_task_id_name(None),  # Revert to menu
-                            color="white",
-                        ),
-                    ),
-                    # Task Description Editing
-                    rx.cond(
-                        state.editing_task_id_description == task.id,
-                        rx.hstack(
-                            rx.input(
-                                value=state.new_task_description,  # Shows the current description
-                                on_change=lambda value: state.set_new_task_description(value),
-                                width="300px",
-                            ),
-                            rx.button(
-                                "Apply",
-                                on_click=lambda: [
-                                    state.edit_task_description(task.id, state.new_task_description),
-                                    state.set_editing_task_id_description(None),  # Close the input box
-                                ],
-                            ),
-                            rx.button(
-                                "X",
-                                on_click=lambda: state.set_editing_task_id_description(None),  # Revert to menu
-                                color="white",
-                            ),
+                        rx.menu.item(
+                            "Edit Description",
+                            on_click=lambda: [
+                                state.set_editing_task_id_description(task.id, task.due_date),
+                                state.set_new_task_description(task.description),  # Pre-fill with current description
+                            ],
                         ),
-                        rx.menu.root(
-                            rx.menu.trigger(
-                                rx.button("⋮", variant="soft")  # Three vertical dots button
-                            ),
-                            rx.menu.content(
+                        rx.menu.separator(),
+                        rx.cond(
+                            task.recur_frequency != 0,
+                            rx.fragment(
                                 rx.menu.item(
-                                    "Edit Name",
-                                    on_click=lambda: [
-                                        state.set_editing_task_id_name(task.id),
-                                        state.set_new_task_name(task.task_name),  # Pre-fill with current name
-                                    ],
+                                    "Delete This Occurrence",
+                                    color="red",
+                                    on_click=lambda: state.delete_task(task.id, task.due_date, SCOPE_THIS),
                                 ),
                                 rx.menu.item(
-                                    "Edit Description",
-                                    on_click=lambda: [
-                                        state.set_editing_task_id_description(task.id),
-                                        state.set_new_task_description(task.description),  # Pre-fill with current description
-                                    ],
+                                    "Delete This and Following",
+                                    color="red",
+                                    on_click=lambda: state.delete_task(task.id, task.due_date, SCOPE_FOLLOWING),
                                 ),
-                                rx.menu.separator(),
                                 rx.menu.item(
-                                    "Delete Task",
+                                    "Delete All Occurrences",
                                     color="red",
-                                    on_click=lambda: state.delete_task(task.id),
+                                    on_click=lambda: state.delete_task(task.id, task.due_date, SCOPE_ALL),
                                 ),
                             ),
+                            rx.menu.item(
+                                "Delete Task",
+                                color="red",
+                                on_click=lambda: state.delete_task(task.id, task.due_date),
+                            ),
                         ),
                     ),
-                )
-            )
+                ),
+            ),
+        ),
+        style={"contentVisibility": "auto", "containIntrinsicSize": "auto 72px"},
+    )
+
+
+def todo_component(state=TodoState) -> rx.Component:
+    '''
+    Creates a "Todos" component displaying an ordered list of tasks.
+
+    Returns:
+    Prints heading and user tasks in a stack
+    '''
+    return rx.vstack(
+        rx.hstack(
+            rx.heading("To Do"),
+            rx.button(rx.icon("refresh-ccw")
+                      ,on_click = [state.get_user_tasks(LoginState.user_id), state.load_todo_page]),
+        ),
+        rx.divider(),
+        rx.hstack(
+            rx.select(
+                TODO_SORTS,
+                value=state.todo_sort,
+                on_change=state.set_todo_sort,
+            ),
+            rx.button("Previous", on_click=state.prev_todo_page, disabled=state.todo_page <= 1),
+            rx.text(f"Page {state.todo_page} of {state.todo_page_count}"),
+            rx.button("Next", on_click=state.next_todo_page, disabled=state.todo_page >= state.todo_page_count),
+            align="center",
+        ),
+        rx.divider(),
+        rx.scroll_area(
+            rx.vstack(
+                rx.foreach(
+                    state.todo_tasks,  # Only the current page is loaded and rendered
+                    lambda task: todo_row(state, task),
+                ),
+            ),
+            type="auto",
+            scrollbars="vertical",
+            style={"maxHeight": "70vh"},
         ),
     )
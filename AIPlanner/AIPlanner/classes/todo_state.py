@@ -0,0 +1,159 @@
+"""State of the to-do list: one page of the logged-in user's tasks, and the edits made from it.
+
+The page is read from the database with fetch_todo_page. Edits, deletes and changes made
+elsewhere patch the page's rows in place; the page is only re-queried when a change can move
+rows across its boundaries or reorder it.
+"""
+from datetime import date
+from operator import attrgetter
+from typing import Optional
+from AIPlanner.pages.login import LoginState
+from AIPlanner.classes.database import (
+    SCOPE_ALL, SCOPE_FOLLOWING, SCOPE_THIS, TODO_PAGE_SIZE, TODO_SORT_COLUMNS, TODO_SORT_DUE,
+    Task, UserManagementState, fetch_task_rows, fetch_todo_page, update_series,
+)
+
+
+def occurrence_in_scope(task: Task, occurrence: Optional[date], scope: str) -> bool:
+    """
+    Checks whether a to-do row (a task or one occurrence of a series) is covered by an edit
+    made with scope at occurrence; a non-recurring task or an edit without a date covers all.
+    """
+    if not task.recur_frequency or occurrence is None or scope == SCOPE_ALL:
+        return True
+    if scope == SCOPE_THIS:
+        return task.due_date == occurrence
+    return task.due_date >= occurrence
+
+
+class TodoState(UserManagementState):
+    """Class that defines the state of the to-do list, paged from the database
+
+    Attributes:
+    todo_tasks: The page of the user's tasks the to-do list renders
+    todo_sort: Order of the to-do list (TODO_SORTS)
+    todo_page: 1-based number of the to-do page shown
+    todo_page_count: Number of to-do pages
+    """
+    todo_tasks: list[Task] = []  # Only one page of the to-do list is sent to the browser
+    todo_sort: str = TODO_SORT_DUE
+    todo_page: int = 1
+    todo_page_count: int = 1
+
+    async def load_todo_page(self):
+        """Method to fill todo_tasks with the current page of the logged-in user's tasks"""
+        login_state = await self.get_state(LoginState)
+        first = (max(self.todo_page, 1) - 1) * TODO_PAGE_SIZE
+        tasks, total = fetch_todo_page(login_state.user_id, self.todo_sort, first, TODO_PAGE_SIZE)
+        self.todo_page_count = max(1, -(-total // TODO_PAGE_SIZE))
+        if self.todo_page > self.todo_page_count:
+            # The list shrank below the page shown (e.g. after deletes): show its last page
+            self.todo_page = self.todo_page_count
+            first = (self.todo_page - 1) * TODO_PAGE_SIZE
+            tasks, _ = fetch_todo_page(login_state.user_id, self.todo_sort, first, TODO_PAGE_SIZE)
+        self.todo_page = max(self.todo_page, 1)
+        self.todo_tasks = tasks
+
+    async def set_todo_sort(self, sort: str):
+        """Method to reorder the to-do list, starting again from its first page"""
+        self.todo_sort = sort
+        self.todo_page = 1
+        await self.load_todo_page()
+
+    async def next_todo_page(self):
+        """Method to show the next page of the to-do list"""
+        self.todo_page = min(self.todo_page + 1, self.todo_page_count)
+        await self.load_todo_page()
+
+    async def prev_todo_page(self):
+        """Method to show the previous page of the to-do list"""
+        self.todo_page = max(self.todo_page - 1, 1)
+        await self.load_todo_page()
+
+    async def edit_task_name(self, task_id: int, new_name: str, occurrence_date: str = "", scope: str = SCOPE_ALL):
+        """Update the task name for the given task ID of the logged-in user.
+
+        For a recurring task, scope picks the occurrences renamed, starting at occurrence_date.
+        """
+        await self._edit_task(task_id, occurrence_date, scope, {"task_name": new_name})
+
+    async def edit_task_description(self, task_id: int, new_description: str, occurrence_date: str = "", scope: str = SCOPE_ALL):
+        """Update the task description for the given task ID of the logged-in user.
+
+        For a recurring task, scope picks the occurrences changed, starting at occurrence_date.
+        """
+        await self._edit_task(task_id, occurrence_date, scope, {"description": new_description})
+
+    async def delete_task(self, task_id: int, occurrence_date: str = "", scope: str = SCOPE_THIS):
+        """Marks the logged-in user's task as deleted by setting is_deleted to True.
+
+        For a recurring task, scope picks the occurrences deleted, starting at occurrence_date;
+        without an occurrence date the whole series is deleted.
+        """
+        if not occurrence_date:
+            scope = SCOPE_ALL
+        await self._edit_task(task_id, occurrence_date, scope, {"is_deleted": True})
+
+    async def _edit_task(self, task_id: int, occurrence_date: str, scope: str, values: dict):
+        """Method to write an edit or delete, then patch the calendar store and the page"""
+        login_state = await self.get_state(LoginState)
+        if not update_series(login_state.user_id, task_id, occurrence_date, scope, values):
+            print(f"No task found with ID: {task_id}.")
+            return
+        print(f"Task {task_id} updated with {values} ({scope}).")
+        self._refresh_tasks([task_id])
+        await self._patch_todo_fields(task_id, occurrence_date, scope, values)
+
+    async def _patch_todo_fields(self, task_id: int, occurrence_date: str, scope: str, values: dict):
+        """Method to apply an edit or delete made from the to-do list to the page's rows
+
+        Names and descriptions don't affect the order, so they are set on the rows in place.
+        Deleting one row of the last page removes it in place. Other deletes shift the
+        following pages, and "This and following" can split a series into a new rule (new
+        ids), so those reload the page.
+        """
+        occurrence = date.fromisoformat(str(occurrence_date)[:10]) if occurrence_date else None
+        matches = [
+            position for position, task in enumerate(self.todo_tasks)
+            if task.id == task_id and occurrence_in_scope(task, occurrence, scope)
+        ]
+        recurring = any(self.todo_tasks[position].recur_frequency for position in matches)
+        if recurring and scope == SCOPE_FOLLOWING:
+            await self.load_todo_page()
+        elif values.get("is_deleted"):
+            last_page = self.todo_page >= self.todo_page_count
+            if len(matches) == 1 and last_page and len(self.todo_tasks) > 1 and (not recurring or scope == SCOPE_THIS):
+                self.todo_tasks = [task for position, task in enumerate(self.todo_tasks) if position != matches[0]]
+            else:
+                await self.load_todo_page()
+        elif matches:
+            tasks = list(self.todo_tasks)
+            for position in matches:
+                columns = {name: getattr(tasks[position], name) for name in tasks[position].__fields__}
+                tasks[position] = Task(**dict(columns, **values))
+            self.todo_tasks = tasks
+
+    async def patch_todo_rows(self, task_ids: list[int]):
+        """Method to swap fresh copies of tasks created or changed elsewhere into the page
+
+        The page is reloaded instead when a task is new, recurring, deleted, not on the page or
+        moved in the sort order, since any of those can change which rows the page holds.
+
+        Parameters:
+        task_ids: List of the ids of the created or changed tasks
+        """
+        if not task_ids:
+            return
+        login_state = await self.get_state(LoginState)
+        rows = {task.id: task for task in fetch_task_rows(login_state.user_id, task_ids)}
+        key = attrgetter(*TODO_SORT_COLUMNS[self.todo_sort])
+        positions = {task.id: position for position, task in enumerate(self.todo_tasks) if not task.recur_frequency}
+        tasks = list(self.todo_tasks)
+        for task_id in task_ids:
+            row = rows.get(task_id)
+            position = positions.get(task_id)
+            if row is None or row.recur_frequency or row.is_deleted or position is None or key(row) != key(tasks[position]):
+                await self.load_todo_page()
+                return
+            tasks[position] = row
+        self.todo_tasks = tasks
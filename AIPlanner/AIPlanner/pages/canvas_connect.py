@@ -1,11 +1,17 @@
 """Page to connect user's Canvas account to system.
 """
 
-from datetime import datetime, date # Used to grab assignment due date specifics
+import asyncio
 import requests
 import reflex as rx
 from AIPlanner.pages.login import LoginState # Grabbing login credentials
-from AIPlanner.classes.database import Task
+from AIPlanner.classes.canvas_sync import run_sync
+from AIPlanner.classes.database import UserManagementState
+from AIPlanner.classes.todo_state import TodoState
+from AIPlanner.classes.jobs import JOBS
+
+# Seconds between automatic re-syncs while auto sync is switched on
+AUTO_SYNC_INTERVAL = 30 * 60
 
 
 class CanvasConnectState(LoginState): # Like extending a class
@@ -18,126 +24,14 @@ class CanvasConnectState(LoginState): # Like extending a class
     canvas_url (str): the Canvas Instance url used to grab assignments from Canvas account.
     is_submitting (bool): flag that tracks if the user has clicked "Enter" for the login form.
         Keeps the user from happy-clicking.
+    canvas_progress (str): progress message of the background Canvas sync.
+    auto_sync (bool): whether Canvas is re-synced every AUTO_SYNC_INTERVAL seconds.
     """
     _api_token: str = ""
     canvas_url:str = 'https://uncw.instructure.com' # 'https://YOUR_CANVAS_INSTANCE_URL'
     is_submitting_Canvas: bool = False
-
-
-    def get_favorite_courses(self):
-        """
-        Gets favorited courses from Canvas with Canvas API.
-        Includes all course info. We'll use the course's id in main to grab the assignments.
-        Checks for pagination with Canvas API (sometimes the API doesn't return all courses bc data is too big).
-
-        Returns:
-        courses (list): Python list of courses.
-        """
-        courses = []
-
-        # url = f'{CANVAS_URL}/api/v1/courses' # Grabbing all current and past courses
-        # Grabbing only favorited courses
-        url = f'{self.canvas_url}/api/v1/users/self/favorites/courses'
-        # url = f'{self.canvas_url}/api/v1/courses'
-        while url:
-            response = requests.get(url, headers=self.get_headers(), timeout=20)
-            response.raise_for_status()
-            courses.extend(response.json())
-            # Check for pagination
-            url = response.links.get('next', {}).get('url')
-        return courses
-
-
-    def get_assignments_for_course(self, course_id):
-        """
-        Iterates through Canvas course and returns all assignments.
-        Makes sure that Canvas API isn't paginating results.
-
-        Parameters:
-        course_id (int): Canvas course id used to identify course.
-
-        Returns:
-        assignments (list): Python list of assignment dictionaries (each assignment is a dictionary).
-        """
-
-        assignments = [] # We can filter for upcoming assignments in main for better run time
-
-        url = f'{self.canvas_url}/api/v1/courses/{course_id}/assignments'
-        try:
-
-            while url:
-                response = requests.get(url, headers=self.get_headers(), timeout=20)
-                response.raise_for_status()
-
-                assignments.extend(response.json())
-
-                # Check for pagination
-                url = response.links.get('next', {}).get('url')
-
-        except requests.exceptions.HTTPError as e:
-            print(f"Error in getting course info for course id: {e}")
-
-        #return upcoming_assignments
-        return assignments
-
-
-    def get_headers(self):
-        """
-        Retreives the headers required for making an API request,
-        initializing the headers with stored API token.
-
-        Returns:
-        dict: A dictionary containing the 'Authorization' header with the Bearer token.
-        """
-        return {
-            'Authorization': f'Bearer {self._api_token}'
-        }
-
-
-    def grab_tasks(self):
-        """
-        Method that calls other methods that check API token and grabs tasks from Canvas.
-
-        Returns:
-        assignment_list (list): list of each assignment from Canvas, which is a dictionary.
-        """
-
-        # Making sure api_token exists
-        if self._api_token == "":
-            return "No api token passed"
-
-        # Setting what the date is now, to use to determine which assignments are current
-        curr_date = datetime.now()
-
-        # Making an empty array so we can transport the assignments into task objects later
-        assignment_list = []
-
-        courses = self.get_favorite_courses() # Grabbing all favorited canvas courses
-        for course in courses:
-            course_id = course['id']
-            assignments = self.get_assignments_for_course(course_id)
-
-            # Error handling course name
-            try:
-                print(f"Upcoming Assignments for course: {course['name']}")
-            except KeyError:
-                print("Error getting name of course...using Id instead")
-                print(f"Upcoming Assignments for course id: {course['id']}")
-
-            # Printing assignments for course
-            for assignment in assignments:
-
-                # Checking that due date isn't None (don't print these assignments)
-                if assignment['due_at'] is not None:
-                    due_date = datetime.strptime(assignment['due_at'], "%Y-%m-%dT%H:%M:%SZ")
-
-                    # If assignment is upcoming, print it
-                    if due_date >= curr_date:
-                        print(f"- {assignment['name']} (Due: {assignment['due_at']})")
-                        assignment_list.append(assignment)
-
-            print("\n")
-        return assignment_list
+    canvas_progress: str = ""
+    auto_sync: bool = False
 
 
     def process_token(self, input_data:dict):
@@ -179,73 +73,108 @@ class CanvasConnectState(LoginState): # Like extending a class
 
         # Only runs if token doesn't have any invalid char's
         if token_valid:
-            # Redirect the user to a processing page so they can't happy-click
-            # Grab all favorited courses and upcoming assignments
-            try:
-                assign_list = self.grab_tasks()
-
-                try:
-
-                    for assignment in assign_list:
-                        # print(assignment)
-
-                        due_at = datetime.strptime(assignment['due_at'], "%Y-%m-%dT%H:%M:%SZ")
-
-                        # Checking if task already in database and assigned to logged-in user
-                        with rx.session() as session:
-                            task_already_exists = session.exec(
-                                Task.select().where(
-                                    Task.user_id == self.user_id, # Making sure user is the same
-                                    Task.task_name == assignment['name'], # Checking if task names are same
-                                    Task.due_date == date(due_at.year, due_at.month, due_at.day), # Checking if due dates are the same
-                                ),
-                            ).first()
-
-                        if task_already_exists:
-                            # Task already in database, so skip it
-                            print(f"Skipping task {assignment['name']} bc already in database.")
-
-                        else:
-                            # Task isn't already in database, so add it to database
-                            print(f"Adding task {assignment['name']} to database.")
-                            new_task = Task(
-                                recur_frequency=0,  # Example for recurring frequency
-                                due_date=date(due_at.year, due_at.month, due_at.day),
-                                is_deleted=False,
-                                task_name=assignment['name'],
-                                description="Task imported from Canvas", #assignment['description'], # For now not doing it
-                                task_id=100,  # Example for unique task_id
-                                priority_level={"Low": 1, "Medium": 2, "High": 3}["Low"],
-                                # assigned_block_date=date(due_at.year, due_at.month, due_at.day),  # Set to today or another relevant date
-                                # assigned_block_start_time=time(due_at.hour - 1, due_at.minute),  # Set a fixed start time (e.g., 2 PM)
-                                # assigned_block_duration=timedelta(hours=1),  # Set your desired duration
-                                user_id=self.user_id # Referencing LoginState user_id attribute (to connect user to tasks)
-                            )
-                            with rx.session() as session:
-                                session.add(new_task)
-                                session.commit()
-
-                except TypeError as e:
-                    print(f"Error with converting Canvas tasks to task objects: {e}")
-                    self.is_submitting_Canvas = False
-                    return rx.toast("Error converting Canvas assignments to system tasks. Please try again.")
-
-            # except requests.exceptions.HTTPError as e:
-            #     print(f"Error with API Key: {e}")
-            #     return rx.toast("Invalid API token. Please regenerate an unexpired API token and try again.")
-
-
-            except requests.exceptions.HTTPError:
-                token_valid = False
-                self.is_submitting_Canvas = False
-                yield rx.toast("Invalid API token. Please regenerate token and try again.")
-
-        # Send user back to home page upon successful connection
-        print("Successful Canvas connection")
+            # The Canvas download runs as a background job so this handler (and the user's
+            # state lock) returns right away; progress shows up in canvas_progress
+            print("Queued Canvas sync")
+            self.canvas_progress = "Canvas sync queued..."
+            self.is_submitting_Canvas = False
+            return [CanvasConnectState.run_canvas_sync, rx.redirect("/")]
+
+        # Send user back to home page
         self.is_submitting_Canvas = False
         return rx.redirect("/")
 
 
+    @rx.background
+    async def run_canvas_sync(self):
+        """
+        Background job that syncs the logged-in user's Canvas assignments into tasks.
+        Only one sync per user runs at a time; a second request while one is in flight is refused.
+        """
+        async with self:
+            user_id = self.user_id
+            api_token = self._api_token
+            canvas_url = self.canvas_url
+            auto_sync = self.auto_sync
+
+        async def report_progress(message):
+            async with self:
+                self.canvas_progress = message
+
+        try:
+            sync = await run_sync(user_id, canvas_url, api_token, report_progress)
+
+        except requests.exceptions.HTTPError:
+            async with self:
+                self.canvas_progress = ""
+            yield rx.toast("Invalid API token. Please regenerate token and try again.")
+            return
+
+        except requests.RequestException as e:
+            # Connection errors, timeouts and other failures talking to Canvas
+            print(f"Error reaching Canvas: {e}")
+            async with self:
+                self.canvas_progress = ""
+            yield rx.toast("Couldn't reach Canvas. Please check the Canvas URL and try again.")
+            return
+
+        except TypeError as e:
+            print(f"Error with converting Canvas tasks to task objects: {e}")
+            async with self:
+                self.canvas_progress = ""
+            yield rx.toast("Error converting Canvas assignments to system tasks. Please try again.")
+            return
+
+        if sync is None:
+            yield rx.toast("A Canvas sync is already running.")
+            return
+
+        print(f"Canvas sync: {sync.inserted} added, {sync.updated} updated, {sync.skipped} up to date, "
+              f"{sync.unchanged_courses} courses unchanged.")
+        async with self:
+            self.canvas_progress = (f"Canvas synced: {sync.inserted} new, {sync.updated} updated, "
+                                    f"{sync.unchanged_courses} courses unchanged.")
+        yield UserManagementState.refresh_tasks(sync.changed_ids)
+        yield TodoState.patch_todo_rows(sync.changed_ids)
+        if auto_sync:
+            yield CanvasConnectState.auto_sync_loop
+
+
+    def toggle_auto_sync(self, checked: bool):
+        """
+        Switches periodic Canvas re-syncs on or off.
+
+        Parameters:
+        checked (bool): checkbox status.
+        """
+        self.auto_sync = checked
+        if checked and self._api_token:
+            return CanvasConnectState.auto_sync_loop
+
+
+    @rx.background
+    async def auto_sync_loop(self):
+        """
+        Background job that queues a Canvas sync every AUTO_SYNC_INTERVAL seconds while
+        auto sync is on. Only one loop per user runs at a time.
+        """
+        async with self:
+            user_id = self.user_id
+        job_key = ("canvas_auto_sync", user_id)
+        if not JOBS.claim(job_key):
+            return
+        try:
+            while True:
+                await asyncio.sleep(AUTO_SYNC_INTERVAL)
+                async with self:
+                    keep_syncing = self.auto_sync and self._api_token != "" and self.user_id == user_id
+                if not keep_syncing:
+                    break
+                yield CanvasConnectState.run_canvas_sync
+        finally:
+            JOBS.release(job_key)
+
+
 def manual_token_input() -> rx.Component:
     """
     Takes the manual token from user and assigns to variable for other classes to use.
@@ -269,6 +198,15 @@ def manual_token_input() -> rx.Component:
                 type="submit",
                 disabled=CanvasConnectState.is_submitting_Canvas,
             ),
+            rx.hstack(
+                rx.checkbox(
+                    checked=CanvasConnectState.auto_sync,
+                    on_change=CanvasConnectState.toggle_auto_sync,
+                ),
+                rx.text("Keep my Canvas tasks up to date"),
+                align_items="center",
+            ),
+            rx.text(CanvasConnectState.canvas_progress),
             on_submit=CanvasConnectState.process_token,
         ),
         width="100%",
@@ -4,6 +4,7 @@ Displays users in the database.
 """
 import reflex as rx
 from AIPlanner.classes.database import *
+from AIPlanner.classes.todo_state import TodoState
 from AIPlanner.pages.login import LoginState
 from AIPlanner.classes.ai import AIState
 
@@ -22,7 +23,7 @@ def display_usernames(state=UserManagementState):
         )
     )
 
-def display_user_tasks(state=UserManagementState):
+def display_user_tasks(state=TodoState):
     """Function to display tasks for the specified user
     
     Returns:
@@ -30,7 +31,7 @@ def display_user_tasks(state=UserManagementState):
     """
     return rx.vstack(
         rx.foreach(
-            state.tasks,
+            state.todo_tasks,
             lambda task: rx.text(
                 f"Task Name: {task.task_name}, Due Date: {task.due_date}, "
                 f"Description: {task.description}, Priority: {task.priority_level}, "
@@ -61,8 +62,8 @@ def userlist(state=UserManagementState) -> rx.Component:
                      on_click=lambda: state.add_test_user()),
         rx.button("Add task to test user with ID 1", on_click=lambda: state.add_test_task(1)),
         rx.button("Show tasks assigned to currently logged in user",
-                  on_click=lambda: state.get_user_tasks(LoginState.user_id)),
-        rx.button("Generate AI schedule for current user", on_click=lambda: AIState.send_request(state.tasks)),
+                  on_click=lambda: [state.get_user_tasks(LoginState.user_id), TodoState.load_todo_page]),
+        rx.button("Generate AI schedule for current user", on_click=AIState.send_request),
         rx.text(AIState.processed_output),
         display_usernames(),
         display_user_tasks(),
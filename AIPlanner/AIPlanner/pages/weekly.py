@@ -4,6 +4,7 @@ import reflex as rx
 
 # Importing pages
 from AIPlanner.classes.database import * # Database
+from AIPlanner.classes.todo_state import TodoState
 from AIPlanner.classes.taskform import task_input_form
 from AIPlanner.pages.login import LoginState # Login State used to get the user's username
 from AIPlanner.pages.signup import SignupState # Sign up state used to redirect the user to the signup page
@@ -14,10 +15,9 @@ from AIPlanner.classes.todo_list import todo_component
 from AIPlanner.classes.CreateCal import GenCalendar
 from AIPlanner.classes.WeeklyCal import GenWeeklyCal
 from AIPlanner.classes.cal_comps import weekly_component
-from AIPlanner.classes.ai import AIState
-from AIPlanner.classes.database import UserManagementState as state
+from AIPlanner.classes.ai import AIState, SCHEDULER_MODES
 
-@rx.page(on_load=[GenCalendar.init_calendar,GenWeeklyCal.init_week])
+@rx.page(on_load=[GenCalendar.init_calendar,GenWeeklyCal.init_week,GenWeeklyCal.load_visible_tasks,TodoState.load_todo_page])
 def weekly() -> rx.Component:
     """Reflex component for base index page
     Returns:
@@ -50,7 +50,13 @@ def weekly() -> rx.Component:
 
         ),
         rx.hstack(
-            rx.button("Generate AI Schedule", on_click=lambda: AIState.send_request(state.tasks)),
+            rx.select(SCHEDULER_MODES, value=AIState.scheduler_mode, on_change=AIState.set_scheduler_mode),
+            rx.checkbox("Only new or changed tasks", checked=AIState.incremental, on_change=AIState.set_incremental),
+            rx.cond(
+                AIState.generating,
+                rx.button("Cancel", on_click=AIState.cancel_request, color_scheme="red"),
+                rx.button("Generate AI Schedule", on_click=AIState.send_request),
+            ),
             rx.text(f"{AIState.messageText}"),
             spacing="5",
             justify="center",
@@ -0,0 +1,98 @@
+"""store recurring tasks as one rule row plus taskexception rows
+
+Revision ID: 3f9b6c2d71e5
+Revises: d51c2e7a8f34
+Create Date: 2026-10-17 15:02:18.415236
+
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9b6c2d71e5'
+down_revision: Union[str, None] = 'd51c2e7a8f34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def as_date(value):
+    # SQLite hands dates back as ISO strings through a raw connection
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def legacy_series(rows):
+    # Rows are ordered by series key, then due date; a series breaks where the spacing
+    # stops matching its frequency (monthly rows were materialized 30 days apart)
+    series = []
+    for row in rows:
+        key = (row.user_id, row.task_name, row.description, row.recur_frequency, row.priority_level)
+        if series and series[-1][0] == key and as_date(row.due_date) - as_date(series[-1][1][-1].due_date) == timedelta(days=row.recur_frequency):
+            series[-1][1].append(row)
+        else:
+            series.append((key, [row]))
+    return [rows for _, rows in series]
+
+
+def upgrade() -> None:
+    op.add_column('task', sa.Column('recur_end_date', sa.Date(), nullable=True))
+    op.create_table('taskexception',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('occurrence_date', sa.Date(), nullable=False),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False),
+    sa.Column('is_done', sa.Boolean(), nullable=False),
+    sa.Column('task_name', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('priority_level', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['task_id'], ['task.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('task_id', 'occurrence_date', name='uq_taskexception_task_id_occurrence_date')
+    )
+
+    # Collapse each materialized series into its first row; deleted occurrences become exceptions
+    connection = op.get_bind()
+    task = sa.table('task',
+        sa.column('id', sa.Integer), sa.column('user_id', sa.Integer), sa.column('task_name', sa.String),
+        sa.column('description', sa.String), sa.column('recur_frequency', sa.Integer),
+        sa.column('priority_level', sa.Integer), sa.column('due_date', sa.Date),
+        sa.column('is_deleted', sa.Boolean), sa.column('recur_end_date', sa.Date),
+    )
+    exception = sa.table('taskexception',
+        sa.column('task_id', sa.Integer), sa.column('occurrence_date', sa.Date),
+        sa.column('is_deleted', sa.Boolean), sa.column('is_done', sa.Boolean),
+    )
+    rows = connection.execute(
+        sa.select(task).where(task.c.recur_frequency != 0).order_by(
+            task.c.user_id, task.c.task_name, task.c.description, task.c.recur_frequency,
+            task.c.priority_level, task.c.due_date, task.c.id,
+        )
+    ).all()
+    for series in legacy_series(rows):
+        rule = series[0]
+        connection.execute(
+            task.update().where(task.c.id == rule.id).values(
+                recur_end_date=as_date(series[-1].due_date),
+                is_deleted=all(row.is_deleted for row in series),
+            )
+        )
+        deleted = [
+            {'task_id': rule.id, 'occurrence_date': as_date(row.due_date), 'is_deleted': True, 'is_done': False}
+            for row in series if row.is_deleted
+        ]
+        if deleted and len(deleted) < len(series):
+            connection.execute(exception.insert(), deleted)
+        extra_ids = [row.id for row in series[1:]]
+        for start in range(0, len(extra_ids), 500):
+            connection.execute(task.delete().where(task.c.id.in_(extra_ids[start:start + 500])))
+
+
+def downgrade() -> None:
+    # Occurrences are not re-materialized: each series keeps only its first row
+    op.drop_table('taskexception')
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_column('recur_end_date')
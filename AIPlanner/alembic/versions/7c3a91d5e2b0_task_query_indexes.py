@@ -0,0 +1,37 @@
+"""add composite indexes for per-user task queries
+
+Revision ID: 7c3a91d5e2b0
+Revises: e2d4a7fc584c
+Create Date: 2026-10-17 10:12:41.508317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3a91d5e2b0'
+down_revision: Union[str, None] = 'e2d4a7fc584c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # get_user_tasks: WHERE user_id = ? AND is_deleted = 0
+    op.create_index('ix_task_user_id_is_deleted', 'task', ['user_id', 'is_deleted'], unique=False)
+    # Canvas import duplicate check: WHERE user_id = ? AND task_name = ? AND due_date = ?
+    op.create_index('ix_task_user_id_task_name_due_date', 'task', ['user_id', 'task_name', 'due_date'], unique=False)
+    # Live tasks only, so deleted rows never bloat the hot index
+    op.create_index(
+        'ix_task_live_user_id_due_date', 'task', ['user_id', 'due_date'], unique=False,
+        sqlite_where=sa.text('is_deleted = 0'),
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_live_user_id_due_date', table_name='task')
+    op.drop_index('ix_task_user_id_task_name_due_date', table_name='task')
+    op.drop_index('ix_task_user_id_is_deleted', table_name='task')
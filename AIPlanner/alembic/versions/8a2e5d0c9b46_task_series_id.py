@@ -0,0 +1,31 @@
+"""add task.series_id for set-based recurring series edits
+
+Revision ID: 8a2e5d0c9b46
+Revises: 3f9b6c2d71e5
+Create Date: 2026-10-17 16:11:43.208514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a2e5d0c9b46'
+down_revision: Union[str, None] = '3f9b6c2d71e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('task', sa.Column('series_id', sa.Integer(), nullable=True))
+    op.create_index('ix_task_series_id_due_date', 'task', ['series_id', 'due_date'], unique=False)
+    # Every existing recurring series is a single rule row (revision 3f9b6c2d71e5)
+    op.execute("UPDATE task SET series_id = id WHERE recur_frequency != 0")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_series_id_due_date', table_name='task')
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_column('series_id')
@@ -0,0 +1,31 @@
+"""add live-task index on assigned block date for windowed loading
+
+Revision ID: b84e0f6d13a7
+Revises: 7c3a91d5e2b0
+Create Date: 2026-10-17 11:03:19.220154
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b84e0f6d13a7'
+down_revision: Union[str, None] = '7c3a91d5e2b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Windowed loading: WHERE user_id = ? AND is_deleted = 0 AND assigned_block_date BETWEEN ? AND ?
+    op.create_index(
+        'ix_task_live_user_id_assigned_block_date', 'task', ['user_id', 'assigned_block_date'], unique=False,
+        sqlite_where=sa.text('is_deleted = 0'),
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_live_user_id_assigned_block_date', table_name='task')
@@ -0,0 +1,28 @@
+"""add task.recur_month_day so split monthly series keep their day of the month
+
+Revision ID: c4e81f27a9d3
+Revises: 8a2e5d0c9b46
+Create Date: 2026-10-17 18:42:05.731902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e81f27a9d3'
+down_revision: Union[str, None] = '8a2e5d0c9b46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL means the rule's due date gives the day, which holds for every existing rule
+    op.add_column('task', sa.Column('recur_month_day', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_column('recur_month_day')
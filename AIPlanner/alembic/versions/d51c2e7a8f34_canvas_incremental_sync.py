@@ -0,0 +1,43 @@
+"""add canvas sync cursors and task.canvas_assignment_id
+
+Revision ID: d51c2e7a8f34
+Revises: b84e0f6d13a7
+Create Date: 2026-10-17 13:26:52.871903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd51c2e7a8f34'
+down_revision: Union[str, None] = 'b84e0f6d13a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('canvascoursesync',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('etag', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('last_modified', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('last_synced_at', sa.DateTime(), nullable=True),
+    sa.Column('seen_assignment_ids', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'course_id', name='uq_canvascoursesync_user_id_course_id')
+    )
+    op.add_column('task', sa.Column('canvas_assignment_id', sa.Integer(), nullable=True))
+    op.create_index('ix_task_user_id_canvas_assignment_id', 'task', ['user_id', 'canvas_assignment_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_user_id_canvas_assignment_id', table_name='task')
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_column('canvas_assignment_id')
+    op.drop_table('canvascoursesync')
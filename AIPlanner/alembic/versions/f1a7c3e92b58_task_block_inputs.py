@@ -0,0 +1,29 @@
+"""add task.block_inputs so incremental scheduling notices edited priorities and names
+
+Revision ID: f1a7c3e92b58
+Revises: c4e81f27a9d3
+Create Date: 2026-10-17 21:06:27.418330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a7c3e92b58'
+down_revision: Union[str, None] = 'c4e81f27a9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL means unknown: existing blocks are kept while they still meet the due date
+    op.add_column('task', sa.Column('block_inputs', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_column('block_inputs')
@@ -0,0 +1,54 @@
+"""Benchmark for downloading every Canvas assignment vs. asking Canvas for upcoming ones only.
+
+"full" reproduces the original behavior: default page size, every assignment (past ones
+included) downloaded and then filtered by parsing due_at. "filtered" is what CanvasClient
+does now: bucket=future, order_by=due_at and per_page=100. Both run against the local
+stub Canvas server with the same concurrency, so the difference is payload and round trips:
+
+    cd AIPlanner
+    python -m benchmarks.canvas_filter_benchmark
+"""
+import time
+from datetime import datetime
+from AIPlanner.classes.canvas_client import CanvasClient
+from benchmarks.canvas_stub_server import CanvasStubServer
+
+
+def fetch_full(client, courses):
+    """
+    Original behavior: download every page of every assignment and filter out past ones locally.
+
+    Returns:
+    int: number of upcoming assignments.
+    """
+    curr_date = datetime.now()
+    upcoming = 0
+    for course in courses:
+        for assignment in client.get_paginated(f"/api/v1/courses/{course['id']}/assignments"):
+            if assignment['due_at'] is not None:
+                if datetime.strptime(assignment['due_at'], "%Y-%m-%dT%H:%M:%SZ") >= curr_date:
+                    upcoming += 1
+    return upcoming
+
+
+def fetch_filtered(client, courses):
+    """
+    Current behavior: Canvas only sends upcoming assignments, in pages of 100.
+
+    Returns:
+    int: number of upcoming assignments.
+    """
+    return sum(len(client.get_assignments_for_course(course['id'])) for course in courses)
+
+
+if __name__ == "__main__":
+    with CanvasStubServer(courses=8, assignments_per_course=120, latency=0.03) as stub:
+        with CanvasClient(stub.url, "stub-token", max_concurrency=1) as client:
+            courses = client.get_favorite_courses()
+            for label, fetch in (("full", fetch_full), ("filtered", fetch_filtered)):
+                stub.reset_counters()
+                started = time.perf_counter()
+                count = fetch(client, courses)
+                elapsed = time.perf_counter() - started
+                print(f"{label:>8}: {count} upcoming assignments, {stub.requests_served} requests, "
+                      f"{stub.bytes_sent / 1024:.1f} KiB, {elapsed:.2f} s")
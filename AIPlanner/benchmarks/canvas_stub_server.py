@@ -0,0 +1,254 @@
+"""Local stub of the Canvas REST API for exercising CanvasClient without a real Canvas instance.
+
+Serves deterministic fixture courses and assignments with Canvas-style Link header
+pagination, the bucket=future / order_by=due_at assignment filters, ETag based
+conditional requests (If-None-Match -> 304) and a fixed per-request latency, so
+round-trip costs can be measured locally. It can also simulate Canvas throttling: a
+per-token leaky bucket reported in X-Rate-Limit-Remaining / X-Request-Cost, with extra
+cost for concurrent requests and 403 "Rate Limit Exceeded" once the bucket is empty,
+plus randomly injected 5xx errors:
+
+    with CanvasStubServer(courses=8, assignments_per_course=60, latency=0.05) as stub:
+        client = CanvasClient(stub.url, "any-token")
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlparse
+
+COURSE_ASSIGNMENTS = re.compile(r"^/api/v1/courses/(\d+)/assignments$")
+FAVORITE_COURSES = "/api/v1/users/self/favorites/courses"
+DEFAULT_PER_PAGE = 10  # Canvas' own default page size
+MAX_PER_PAGE = 100  # Canvas ignores larger page sizes
+
+
+def make_fixture(courses, assignments_per_course, now=None):
+    """
+    Builds the fixture data: half of each course's assignments are past, half upcoming.
+
+    Returns:
+    tuple: (list of course dictionaries, dict of course id -> list of assignment dictionaries)
+    """
+    now = now or datetime.utcnow()
+    course_list = [{"id": 1000 + c, "name": f"CSC {450 + c}"} for c in range(courses)]
+    assignments = {}
+    for course in course_list:
+        items = []
+        for a in range(assignments_per_course):
+            due = now + timedelta(days=a - assignments_per_course // 2, hours=1)
+            items.append({
+                "id": course["id"] * 1000 + a,
+                "name": f"{course['name']} Assignment {a}",
+                "due_at": due.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "updated_at": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "course_id": course["id"],
+                # Canvas assignments carry a lot of fields we never use; pad like the real payload
+                "description": "<p>" + "Lorem ipsum dolor sit amet. " * 20 + "</p>",
+                "points_possible": 10.0,
+                "submission_types": ["online_upload"],
+                "html_url": f"https://canvas.example/courses/{course['id']}/assignments/{a}",
+            })
+        assignments[course["id"]] = items
+    return course_list, assignments
+
+
+class Throttling(NamedTuple):
+    """
+    Per-token rate limit bucket of the stub, modelled on Canvas'.
+
+    Attributes:
+    bucket_size (float): units a token's bucket holds.
+    request_cost (float): units every request takes out of the bucket.
+    concurrency_cost (float): extra units per other request in flight with the same token.
+    refill_rate (float): units per second the bucket refills.
+    """
+    bucket_size: float
+    request_cost: float = 20.0
+    concurrency_cost: float = 50.0
+    refill_rate: float = 100.0
+
+
+class CanvasStubServer:
+    """
+    Threaded HTTP server that imitates the Canvas endpoints CanvasClient uses.
+
+    Attributes:
+    url (str): base url of the running stub, e.g. 'http://127.0.0.1:54321'.
+    latency (float): seconds slept before answering each request.
+    requests_served (int): number of requests answered.
+    bytes_sent (int): total response body bytes sent.
+    throttled (int): requests refused with 403 Rate Limit Exceeded.
+    server_errors (int): injected 5xx responses.
+    """
+
+    def __init__(self, courses=8, assignments_per_course=60, latency=0.05, throttling=None, error_rate=0.0):
+        """
+        Parameters:
+        courses (int): number of favorited courses.
+        assignments_per_course (int): assignments per course, half past and half upcoming.
+        latency (float): seconds slept before answering each request.
+        throttling (Throttling, optional): per-token rate limit bucket; None disables throttling.
+        error_rate (float): probability of answering 503 instead of serving the request.
+        """
+        self.latency = latency
+        self.courses, self.assignments = make_fixture(courses, assignments_per_course)
+        self.throttling = throttling
+        self.error_rate = error_rate
+        self.requests_served = 0
+        self.bytes_sent = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self._buckets = {}  # token -> [used units, last update time, requests in flight]
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counters(self):
+        """Zeroes the counters and empties every rate limit bucket."""
+        with self._lock:
+            self.requests_served = 0
+            self.bytes_sent = 0
+            self.throttled = 0
+            self.server_errors = 0
+            self._buckets = {}
+
+    def start_request(self, token):
+        """
+        Charges a request to the token's bucket.
+
+        Returns:
+        tuple: (whether the request is throttled, remaining units, cost charged)
+        """
+        with self._lock:
+            now = time.monotonic()
+            used, updated, in_flight = self._buckets.get(token, [0.0, now, 0])
+            used = max(0.0, used - (now - updated) * self.throttling.refill_rate)
+            cost = self.throttling.request_cost + self.throttling.concurrency_cost * in_flight
+            throttled = used + cost > self.throttling.bucket_size
+            if throttled:
+                self.throttled += 1
+            else:
+                used += cost
+                in_flight += 1
+            self._buckets[token] = [used, now, in_flight]
+            return throttled, self.throttling.bucket_size - used, cost
+
+    def finish_request(self, token):
+        """Marks one of the token's requests as no longer in flight."""
+        with self._lock:
+            self._buckets[token][2] -= 1
+
+    def count_server_error(self):
+        """Counts an injected 5xx response."""
+        with self._lock:
+            self.server_errors += 1
+
+    def count_response(self, body_bytes):
+        """Counts a response and its body size."""
+        with self._lock:
+            self.requests_served += 1
+            self.bytes_sent += body_bytes
+
+    def items_for(self, path, query):
+        """
+        Returns the full (unpaginated) item list for a request path, or None for unknown paths.
+        """
+        if path == FAVORITE_COURSES:
+            return self.courses
+        match = COURSE_ASSIGNMENTS.match(path)
+        if match:
+            items = self.assignments.get(int(match.group(1)), [])
+            if query.get("bucket") == ["future"]:
+                now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+                items = [item for item in items if item["due_at"] and item["due_at"] > now]
+            if query.get("order_by") == ["due_at"]:
+                items = sorted(items, key=lambda item: item["due_at"] or "")
+            return items
+        return None
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like Canvas
+            disable_nagle_algorithm = True  # Headers and body are separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if stub.error_rate and random.random() < stub.error_rate:
+                    stub.count_server_error()
+                    self.respond(503, {"errors": [{"message": "Service Unavailable"}]}, {})
+                    return
+                if stub.throttling is None:
+                    time.sleep(stub.latency)
+                    self.serve({})
+                    return
+
+                token = self.headers.get("Authorization", "")
+                throttled, remaining, cost = stub.start_request(token)
+                headers = {"X-Rate-Limit-Remaining": f"{remaining:.1f}", "X-Request-Cost": f"{cost:.1f}"}
+                if throttled:
+                    self.respond_raw(403, b"403 Forbidden (Rate Limit Exceeded)", headers, "text/plain")
+                    return
+                try:
+                    time.sleep(stub.latency)
+                    self.serve(headers)
+                finally:
+                    stub.finish_request(token)
+
+            def serve(self, headers):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                items = stub.items_for(parsed.path, query)
+                if items is None:
+                    self.respond(404, [], {})
+                    return
+
+                per_page = min(int(query.get("per_page", [DEFAULT_PER_PAGE])[0]), MAX_PER_PAGE)
+                page = int(query.get("page", ["1"])[0])
+                page_items = items[(page - 1) * per_page:page * per_page]
+                if page * per_page < len(items):
+                    next_query = {key: values[0] for key, values in query.items()}
+                    next_query.update(page=page + 1, per_page=per_page)
+                    next_qs = "&".join(f"{key}={value}" for key, value in next_query.items())
+                    headers["Link"] = f'<{stub.url}{parsed.path}?{next_qs}>; rel="next"'
+                etag = '"' + hashlib.md5(json.dumps(page_items).encode()).hexdigest() + '"'
+                headers["ETag"] = etag
+                if self.headers.get("If-None-Match") == etag:
+                    self.respond(304, None, headers)
+                    return
+                self.respond(200, page_items, headers)
+
+            def respond(self, status, payload, headers):
+                body = b"" if payload is None else json.dumps(payload).encode()
+                self.respond_raw(status, body, headers, "application/json")
+
+            def respond_raw(self, status, body, headers, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+                stub.count_response(len(body))
+
+        return Handler
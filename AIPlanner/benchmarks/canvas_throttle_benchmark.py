@@ -0,0 +1,52 @@
+"""Benchmark for CanvasClient against a throttling Canvas stub.
+
+Several syncs share one token (like many page loads at the start of a semester) against
+a small rate limit bucket that charges extra for concurrent requests and injects a few
+503s. Compares the client with retries disabled against the default rate-limit-aware
+client, and prints the tracker metrics:
+
+    cd AIPlanner
+    python -m benchmarks.canvas_throttle_benchmark
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from AIPlanner.classes.canvas_client import CanvasClient
+from benchmarks.canvas_stub_server import CanvasStubServer, Throttling
+
+PARALLEL_SYNCS = 4
+
+
+def sync_once(base_url, token, max_retries):
+    """
+    Downloads every assignment (past included, so there are many pages) of every course.
+
+    Returns:
+    tuple: (assignments fetched, courses that failed, client metrics)
+    """
+    fetched = failed = 0
+    with CanvasClient(base_url, token, max_concurrency=8, max_retries=max_retries) as client:
+        courses = client.get_favorite_courses()
+        for _, assignments in client.iter_course_assignments(courses, upcoming_only=False):
+            fetched += len(assignments)
+            failed += not assignments
+        return fetched, failed, client.metrics
+
+
+if __name__ == "__main__":
+    throttling = Throttling(bucket_size=700, request_cost=10, concurrency_cost=50, refill_rate=300)
+    with CanvasStubServer(courses=8, assignments_per_course=300, latency=0.1, throttling=throttling,
+                          error_rate=0.02) as stub:
+        for label, retries in (("no retries", 0), ("adaptive", 5)):
+            stub.reset_counters()
+            token = f"token-{label}"
+            started = time.perf_counter()
+            with ThreadPoolExecutor(PARALLEL_SYNCS) as pool:
+                runs = list(pool.map(
+                    lambda _, token=token, retries=retries: sync_once(stub.url, token, retries),
+                    range(PARALLEL_SYNCS),
+                ))
+            elapsed = time.perf_counter() - started
+            metrics = runs[-1][2]
+            print(f"{label:>10}: {sum(r[0] for r in runs)} assignments, {sum(r[1] for r in runs)} failed courses, "
+                  f"{stub.throttled} throttled, {stub.server_errors} 5xx, {elapsed:.2f} s")
+            print(f"{'':>10}  metrics: {metrics}")
@@ -0,0 +1,140 @@
+"""Benchmark for the per-user task indexes (alembic revision 7c3a91d5e2b0).
+
+Builds a throwaway SQLite database with the same task table and indexes as the
+migrations, fills it with 10k, 100k and 1M rows spread over many users, and times
+the two hot queries with and without the indexes:
+
+- get_user_tasks: WHERE user_id = ? AND is_deleted = 0
+- Canvas import duplicate check: WHERE user_id = ? AND task_name = ? AND due_date = ?
+
+Uses only the standard library so it can be run without the Reflex environment:
+
+    cd AIPlanner
+    python benchmarks/task_index_benchmark.py [rows ...]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Same shape as alembic revision e2d4a7fc584c
+CREATE_TASK_TABLE = """
+CREATE TABLE task (
+    id INTEGER NOT NULL PRIMARY KEY,
+    recur_frequency INTEGER NOT NULL,
+    due_date DATE NOT NULL,
+    is_deleted BOOLEAN NOT NULL,
+    task_name VARCHAR NOT NULL,
+    description VARCHAR NOT NULL,
+    task_id INTEGER NOT NULL,
+    priority_level INTEGER NOT NULL,
+    assigned_block_date DATE,
+    assigned_block_start_time TIME,
+    assigned_block_duration DATETIME,
+    user_id INTEGER NOT NULL
+)
+"""
+
+# Same indexes as alembic revision 7c3a91d5e2b0
+CREATE_INDEXES = [
+    "CREATE INDEX ix_task_user_id_is_deleted ON task (user_id, is_deleted)",
+    "CREATE INDEX ix_task_user_id_task_name_due_date ON task (user_id, task_name, due_date)",
+    "CREATE INDEX ix_task_live_user_id_due_date ON task (user_id, due_date) WHERE is_deleted = 0",
+]
+
+USER_TASKS_QUERY = "SELECT * FROM task WHERE user_id = ? AND is_deleted = 0"
+DEDUPE_QUERY = "SELECT id FROM task WHERE user_id = ? AND task_name = ? AND due_date = ? LIMIT 1"
+
+TASKS_PER_USER = 200  # Roughly a few semesters of Canvas imports plus recurring tasks
+QUERY_REPEATS = 200
+
+
+def populate(conn, rows):
+    """
+    Fills the task table with synthetic rows.
+
+    Parameters:
+    conn (sqlite3.Connection): Connection to the benchmark database.
+    rows (int): Number of task rows to insert.
+
+    Returns:
+    int: Number of distinct users the rows were spread over.
+    """
+    users = max(1, rows // TASKS_PER_USER)
+    start = date(2024, 8, 19)
+    rng = random.Random(450)
+
+    def generate():
+        for i in range(rows):
+            user_id = i % users + 1
+            due = start + timedelta(days=rng.randrange(365))
+            yield (
+                0, due.isoformat(), rng.random() < 0.2, f"Assignment {i // users}",
+                "Task imported from Canvas", 100, rng.randint(1, 3), user_id,
+            )
+
+    conn.executemany(
+        "INSERT INTO task (recur_frequency, due_date, is_deleted, task_name, description, "
+        "task_id, priority_level, user_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        generate(),
+    )
+    conn.commit()
+    return users
+
+
+def time_query(conn, sql, param_sets):
+    """
+    Runs a query once per parameter set and reports the mean latency.
+
+    Returns:
+    float: Mean latency in milliseconds.
+    """
+    started = time.perf_counter()
+    for params in param_sets:
+        conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - started) * 1000 / len(param_sets)
+
+
+def run(rows):
+    """
+    Benchmarks both hot queries for a table of the given size.
+
+    Returns:
+    dict: Mean latencies (ms) keyed by "<query>_<scan|indexed>".
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        conn.execute(CREATE_TASK_TABLE)
+        users = populate(conn, rows)
+
+        rng = random.Random(3)
+        user_params = [(rng.randint(1, users),) for _ in range(QUERY_REPEATS)]
+        dedupe_params = [
+            conn.execute("SELECT user_id, task_name, due_date FROM task WHERE id = ?",
+                         (rng.randint(1, rows),)).fetchone()
+            for _ in range(QUERY_REPEATS)
+        ]
+
+        results = {
+            "user_tasks_scan": time_query(conn, USER_TASKS_QUERY, user_params),
+            "dedupe_scan": time_query(conn, DEDUPE_QUERY, dedupe_params),
+        }
+        for statement in CREATE_INDEXES:
+            conn.execute(statement)
+        conn.execute("ANALYZE")
+        results["user_tasks_indexed"] = time_query(conn, USER_TASKS_QUERY, user_params)
+        results["dedupe_indexed"] = time_query(conn, DEDUPE_QUERY, dedupe_params)
+        conn.close()
+    return results
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    print(f"{'rows':>10} | {'get_user_tasks scan':>20} | {'indexed':>9} | {'dedupe scan':>12} | {'indexed':>9}")
+    for size in sizes:
+        r = run(size)
+        print(f"{size:>10} | {r['user_tasks_scan']:>17.3f} ms | {r['user_tasks_indexed']:>6.3f} ms | "
+              f"{r['dedupe_scan']:>9.3f} ms | {r['dedupe_indexed']:>6.3f} ms")
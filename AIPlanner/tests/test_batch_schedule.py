@@ -0,0 +1,41 @@
+"""Tests for per-user error handling in AIPlanner.classes.batch_schedule."""
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("reflex")
+pytest.importorskip("openai")
+
+from AIPlanner.classes import batch_schedule  # pylint: disable=wrong-import-position
+
+NOW = datetime(2025, 3, 3, 8, 0)
+
+
+def task(task_id, user_id, due_date):
+    """Builds a stand-in for a schedulable Task row without a block."""
+    return SimpleNamespace(
+        id=task_id,
+        user_id=user_id,
+        task_name=f"Task {task_id}",
+        priority_level=1,
+        due_date=due_date,
+        assigned_block_date=None,
+        assigned_block_start_time=None,
+        assigned_block_duration=None,
+    )
+
+
+def test_failing_user_is_logged_and_skipped(monkeypatch):
+    tasks = [task(1, 1, date(2025, 3, 7)), task(2, 2, None), task(3, 3, date(2025, 3, 7))]
+    written = []
+    monkeypatch.setattr(batch_schedule, "fetch_user_ids_after", lambda last_id, limit: [1, 2, 3] if last_id == 0 else [])
+    monkeypatch.setattr(batch_schedule, "fetch_schedulable_tasks", lambda user_ids, since: tasks)
+    monkeypatch.setattr(batch_schedule, "write_blocks", lambda blocks: written.extend(blocks) or len(blocks))
+
+    report = batch_schedule.run_batch(now=NOW)
+
+    assert report["failed"] == [2]
+    assert report["users"] == 3
+    assert sorted(block["task_id"] for block in written) == [1, 3]
+    assert {block["user_id"] for block in written} == {1, 3}
@@ -0,0 +1,60 @@
+"""Tests for block conflict repair in AIPlanner.classes.block_index."""
+from datetime import date, datetime, time, timedelta
+
+from AIPlanner.classes.block_index import BlockIndex, validate_blocks
+
+NOW = datetime(2025, 3, 3, 10, 17, 42, 123456)  # A Monday, between slots
+DUE = date(2025, 3, 7)
+
+
+def block(task_id, day, hour, minute=0):
+    """Builds a one-hour block dictionary as the schedulers produce them."""
+    return {
+        "task_id": task_id,
+        "assigned_block_date": day,
+        "assigned_block_start_time": time(hour, minute),
+        "assigned_block_duration": timedelta(hours=1),
+    }
+
+
+def test_repaired_blocks_start_on_slot_boundaries():
+    index = BlockIndex()
+    index.add(datetime(2025, 3, 3, 11, 0), datetime(2025, 3, 3, 11, 30), key=99)
+    past = block(1, date(2025, 3, 3), 8)
+    clashing = block(2, date(2025, 3, 3), 11)
+
+    accepted, repaired, rejected = validate_blocks(index, [past, clashing], {1: DUE, 2: DUE}, NOW)
+
+    assert repaired == 2 and not rejected
+    starts = [datetime.combine(b["assigned_block_date"], b["assigned_block_start_time"]) for b in accepted]
+    assert starts == [datetime(2025, 3, 3, 12, 0), datetime(2025, 3, 3, 13, 0)]
+    assert all(start.minute == start.second == start.microsecond == 0 for start in starts)
+
+
+def test_rescheduled_task_does_not_collide_with_its_old_block():
+    index = BlockIndex()
+    index.add(datetime(2025, 3, 3, 11, 0), datetime(2025, 3, 3, 12, 0), key=1)
+    for hour in range(12, 17):
+        index.add(datetime(2025, 3, 3, hour, 0), datetime(2025, 3, 3, hour + 1, 0), key=100 + hour)
+
+    accepted, repaired, _ = validate_blocks(index, [block(1, date(2025, 3, 3), 8)], {1: DUE}, NOW)
+
+    assert repaired == 1
+    assert accepted[0]["assigned_block_start_time"] == time(11, 0)
+    assert len(index) == 6
+
+
+def test_rejected_task_keeps_its_old_block():
+    index = BlockIndex()
+    index.add(datetime(2025, 3, 3, 11, 0), datetime(2025, 3, 3, 12, 0), key=1)
+    for hour in range(12, 17):
+        index.add(datetime(2025, 3, 3, hour, 0), datetime(2025, 3, 3, hour + 1, 0), key=100 + hour)
+
+    # Due today and two hours long: no gap before the due date fits it
+    long_block = dict(block(1, date(2025, 3, 3), 8), assigned_block_duration=timedelta(hours=2))
+    accepted, _, rejected = validate_blocks(index, [long_block], {1: date(2025, 3, 3)}, NOW)
+
+    assert not accepted and rejected == [1]
+    assert index.overlapping(datetime(2025, 3, 3, 11, 0), datetime(2025, 3, 3, 12, 0)) == [
+        (datetime(2025, 3, 3, 11, 0), datetime(2025, 3, 3, 12, 0), 1)
+    ]
@@ -0,0 +1,60 @@
+"""Tests for the per-token rate limit trackers of CanvasClient."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from AIPlanner.classes import canvas_client
+from AIPlanner.classes.canvas_client import CanvasClient
+
+
+class SlowResponse:
+    """Stand-in for a successful requests.Response with no rate limit headers."""
+    status_code = 200
+    headers = {}
+    text = ""
+
+    def raise_for_status(self):
+        """Successful responses don't raise."""
+
+
+def test_clients_on_one_token_share_a_tracker():
+    with CanvasClient("http://127.0.0.1:9", "shared-token", max_concurrency=1) as slow, \
+            CanvasClient("http://127.0.0.1:9", "shared-token", max_concurrency=8) as fast:
+        assert slow.rate_limit is fast.rate_limit
+        assert fast.metrics["allowed_concurrency"] == 8
+
+
+def test_each_client_keeps_its_own_concurrency():
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_get(*_args, **_kwargs):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.pop()
+        return SlowResponse()
+
+    with CanvasClient("http://127.0.0.1:9", "paced-token", max_concurrency=8), \
+            CanvasClient("http://127.0.0.1:9", "paced-token", max_concurrency=1) as slow:
+        slow.session.get = slow_get
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: slow.get("/api/v1/courses"), range(4)))
+
+    assert max(peak) == 1
+
+
+def test_least_recently_used_trackers_are_dropped(monkeypatch):
+    monkeypatch.setattr(canvas_client, "MAX_TRACKERS", 2)
+    monkeypatch.setattr(canvas_client, "_trackers", canvas_client.OrderedDict())
+    first = canvas_client.tracker_for("first-token", 4)
+    canvas_client.tracker_for("second-token", 4)
+    assert canvas_client.tracker_for("first-token", 4) is first
+
+    canvas_client.tracker_for("third-token", 4)
+
+    assert len(canvas_client._trackers) == 2  # pylint: disable=protected-access
+    assert canvas_client.tracker_for("first-token", 4) is first
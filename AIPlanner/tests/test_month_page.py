@@ -0,0 +1,12 @@
+"""Compiles the monthly calendar, whose day cells index the per-day summary lists."""
+import pytest
+
+pytest.importorskip("reflex")
+
+from AIPlanner.classes.cal_comps import calendar_component  # pylint: disable=wrong-import-position
+
+
+def test_month_page_compiles():
+    component = calendar_component()
+
+    assert component.render()
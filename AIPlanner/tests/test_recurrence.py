@@ -0,0 +1,28 @@
+"""Tests for recurring task expansion in AIPlanner.classes.recurrence."""
+from datetime import date
+from types import SimpleNamespace
+
+from AIPlanner.classes.recurrence import iter_occurrences
+
+
+def monthly_rule(due_date, recur_end_date=None, recur_month_day=None):
+    """Builds a stand-in for a monthly rule row."""
+    return SimpleNamespace(
+        recur_frequency=30,
+        due_date=due_date,
+        recur_end_date=recur_end_date,
+        recur_month_day=recur_month_day,
+    )
+
+
+def test_split_monthly_series_keeps_its_day_of_month():
+    start, end = date(2025, 1, 1), date(2025, 6, 30)
+    whole = list(iter_occurrences(monthly_rule(date(2025, 1, 31)), start, end))
+    # Split at the clamped February occurrence, as update_series does for "this and following"
+    before = monthly_rule(date(2025, 1, 31), recur_end_date=date(2025, 2, 27))
+    continued = monthly_rule(date(2025, 2, 28), recur_month_day=31)
+
+    split = list(iter_occurrences(before, start, end)) + list(iter_occurrences(continued, start, end))
+
+    assert split == whole
+    assert date(2025, 3, 31) in split
@@ -0,0 +1,16 @@
+"""Tests for token counting in AIPlanner.classes.schedule_prompt."""
+from types import SimpleNamespace
+
+from AIPlanner.classes import schedule_prompt
+
+
+def test_unloadable_encoding_falls_back_to_the_estimate(monkeypatch):
+    def offline(_name):
+        raise OSError("Could not reach openaipublic.blob.core.windows.net")
+
+    monkeypatch.setattr(schedule_prompt, "tiktoken", SimpleNamespace(get_encoding=offline))
+    schedule_prompt.token_encoding.cache_clear()
+    try:
+        assert schedule_prompt.count_tokens("id|priority|due|name") == 5
+    finally:
+        schedule_prompt.token_encoding.cache_clear()
@@ -0,0 +1,50 @@
+"""Tests for incremental rescheduling in AIPlanner.classes.scheduler."""
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+from AIPlanner.classes.scheduler import block_inputs, split_incremental
+
+NOW = datetime(2025, 3, 3, 8, 0)
+
+
+def scheduled_task(task_id, hour, priority_level=2, task_name="Essay"):
+    """Builds a stand-in for a Task row whose block was written with its current inputs."""
+    task = SimpleNamespace(
+        id=task_id,
+        task_name=task_name,
+        priority_level=priority_level,
+        due_date=date(2025, 3, 7),
+        assigned_block_date=date(2025, 3, 4),
+        assigned_block_start_time=time(hour),
+        assigned_block_duration=timedelta(hours=1),
+    )
+    task.block_inputs = block_inputs(task)
+    return task
+
+
+def task_dict(task):
+    """Converts a stand-in row into the task dictionary the schedulers take."""
+    return {"id": task.id, "task_name": task.task_name, "priority_level": task.priority_level,
+            "due_date": task.due_date.isoformat()}
+
+
+def test_edited_priority_or_name_is_scheduled_again():
+    unchanged, reprioritized, renamed = scheduled_task(1, 9), scheduled_task(2, 10), scheduled_task(3, 11)
+    reprioritized.priority_level = 1
+    renamed.task_name = "Essay draft"
+    scheduled = [unchanged, reprioritized, renamed]
+
+    pending, busy = split_incremental([task_dict(task) for task in scheduled], scheduled, NOW)
+
+    assert [task["id"] for task in pending] == [2, 3]
+    assert busy == [(datetime(2025, 3, 4, 9), datetime(2025, 3, 4, 10))]
+
+
+def test_blocks_without_recorded_inputs_are_kept():
+    task = scheduled_task(1, 9)
+    task.block_inputs = None
+    task.priority_level = 1
+
+    pending, _ = split_incremental([task_dict(task)], [task], NOW)
+
+    assert not pending
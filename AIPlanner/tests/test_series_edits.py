@@ -0,0 +1,88 @@
+"""Tests for recurring series edits and the to-do page in AIPlanner.classes.database."""
+from datetime import date
+
+import pytest
+
+pytest.importorskip("reflex")
+sqlmodel = pytest.importorskip("sqlmodel")
+
+# pylint: disable=wrong-import-position
+from sqlalchemy.pool import StaticPool
+from AIPlanner.classes import database
+from AIPlanner.classes.database import (
+    SCOPE_ALL, SCOPE_FOLLOWING, SCOPE_THIS, TODO_SORT_DUE, Task, User, fetch_todo_page, update_series,
+)
+from AIPlanner.classes.todo_state import occurrence_in_scope
+
+MONDAYS = [date(2025, 3, 3), date(2025, 3, 10), date(2025, 3, 17), date(2025, 3, 24), date(2025, 3, 31)]
+
+
+@pytest.fixture(name="weekly_series")
+def weekly_series_fixture(monkeypatch):
+    """Points rx.session at an in-memory database holding one user with a weekly series."""
+    engine = sqlmodel.create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    sqlmodel.SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(database.rx, "session", lambda: sqlmodel.Session(engine))
+    with sqlmodel.Session(engine) as session:
+        user = User(username="series", canvas_hash_id=0, password="secret")
+        session.add(user)
+        session.flush()
+        rule = Task(
+            recur_frequency=7,
+            due_date=MONDAYS[0],
+            recur_end_date=MONDAYS[-1],
+            is_deleted=False,
+            task_name="Lab",
+            description="",
+            task_id=0,
+            priority_level=2,
+            assigned_block_date=None,
+            assigned_block_start_time=None,
+            assigned_block_duration=None,
+            user_id=user.id,
+        )
+        session.add(rule)
+        session.flush()
+        rule.series_id = rule.id
+        session.commit()
+        return user.id, rule.id
+
+
+def test_deleting_one_later_occurrence_keeps_the_others(weekly_series):
+    user_id, rule_id = weekly_series
+
+    assert update_series(user_id, rule_id, MONDAYS[2].isoformat(), SCOPE_THIS, {"is_deleted": True})
+
+    tasks, total = fetch_todo_page(user_id, TODO_SORT_DUE, 0, 25)
+    assert [task.due_date for task in tasks] == [MONDAYS[0], MONDAYS[1], MONDAYS[3], MONDAYS[4]]
+    assert total == 4
+
+
+def test_this_and_following_only_changes_later_occurrences(weekly_series):
+    user_id, rule_id = weekly_series
+
+    assert update_series(user_id, rule_id, MONDAYS[3].isoformat(), SCOPE_FOLLOWING, {"task_name": "Lab report"})
+
+    tasks, _ = fetch_todo_page(user_id, TODO_SORT_DUE, 0, 25)
+    assert [(task.due_date, task.task_name) for task in tasks] == [
+        (MONDAYS[0], "Lab"), (MONDAYS[1], "Lab"), (MONDAYS[2], "Lab"),
+        (MONDAYS[3], "Lab report"), (MONDAYS[4], "Lab report"),
+    ]
+
+
+def test_other_users_cannot_edit_the_series(weekly_series):
+    user_id, rule_id = weekly_series
+
+    assert not update_series(user_id + 1, rule_id, MONDAYS[1].isoformat(), SCOPE_THIS, {"is_deleted": True})
+
+
+def test_patched_rows_match_the_rows_the_edit_changed(weekly_series):
+    user_id, rule_id = weekly_series
+    tasks, _ = fetch_todo_page(user_id, TODO_SORT_DUE, 0, 25)
+
+    def patched(scope):
+        return [task.due_date for task in tasks if task.id == rule_id and occurrence_in_scope(task, MONDAYS[2], scope)]
+
+    assert patched(SCOPE_THIS) == [MONDAYS[2]]
+    assert patched(SCOPE_FOLLOWING) == MONDAYS[2:]
+    assert patched(SCOPE_ALL) == MONDAYS